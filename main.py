@@ -2,12 +2,22 @@ import argparse
 import taichi as ti
 from pathlib import Path
 from navierflow.ui.visualization.simulation_interface import GUIManager, SimulationManager
+from navierflow.ui.visualization.frame_scheduler import FrameScheduler
 from navierflow.ui.dashboard.main import Dashboard
 from navierflow.ai.ai_integration import SimulationEnhancer
 from navierflow.utils import setup_logging, create_logger, handle_simulation_error
 
-def run_visualization_mode(width: int = 800, height: int = 800):
-    """Run the application in visualization mode with interactive GUI"""
+def run_visualization_mode(width: int = 800, height: int = 800, target_fps: float = 60.0,
+                           substeps: int = 1, adaptive_substeps: bool = True):
+    """Run the application in visualization mode with interactive GUI
+
+    Args:
+        width: Window width
+        height: Window height
+        target_fps: Frame rate the substep scheduler aims for
+        substeps: Initial solver substeps per rendered frame
+        adaptive_substeps: Adapt substeps to fill the frame budget
+    """
     logger = create_logger("visualization")
     try:
         # Initialize Taichi
@@ -16,6 +26,11 @@ def run_visualization_mode(width: int = 800, height: int = 800):
         gui_manager = GUIManager(width, height)
         start_screen = gui_manager.start_screen
         sim_manager = None
+        scheduler = FrameScheduler({
+            'target_fps': target_fps,
+            'substeps': substeps,
+            'adaptive': adaptive_substeps
+        })
 
         while gui_manager.window.running:
             if not start_screen.start_simulation:
@@ -31,8 +46,13 @@ def run_visualization_mode(width: int = 800, height: int = 800):
                 mouse_pos = (mouse_pos[0] * width, mouse_pos[1] * height)
                 mouse_down = gui_manager.window.is_pressed(ti.ui.LMB)
 
-                sim_manager.update(mouse_pos, mouse_down)
-                gui_manager.render(sim_manager)
+                # Solver substeps and rendering are paced independently; mouse
+                # forcing is applied once per frame, on the first substep
+                scheduler.run_frame(
+                    lambda k: sim_manager.update(mouse_pos, mouse_down and k == 0),
+                    lambda: gui_manager.render(sim_manager, scheduler),
+                    sync=ti.sync
+                )
     except Exception as e:
         handle_simulation_error(e, logger)
         raise
@@ -67,6 +87,23 @@ def main():
         default=800,
         help="Window height for visualization mode"
     )
+    parser.add_argument(
+        "--target-fps",
+        type=float,
+        default=60.0,
+        help="Target render frame rate for visualization mode"
+    )
+    parser.add_argument(
+        "--substeps",
+        type=int,
+        default=1,
+        help="Solver substeps per rendered frame (initial value when adaptive)"
+    )
+    parser.add_argument(
+        "--fixed-substeps",
+        action="store_true",
+        help="Disable adaptive substep control"
+    )
     parser.add_argument(
         "--enable-ai",
         action="store_true",
@@ -91,7 +128,8 @@ def main():
 
         if args.mode == "visualization":
             logger.info("Starting NavierFlow in visualization mode")
-            run_visualization_mode(args.width, args.height)
+            run_visualization_mode(args.width, args.height, args.target_fps,
+                                   args.substeps, not args.fixed_substeps)
         else:
             logger.info("Starting NavierFlow in dashboard mode")
             run_dashboard_mode()
@@ -1,9 +1,12 @@
 import torch
 import torch.nn as nn
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 import logging
 from sklearn.preprocessing import StandardScaler
+from pathlib import Path
+from .export import InferenceModel, export_model, load_inference_model
 
 class FlowAutoencoder(nn.Module):
     """Autoencoder for flow field anomaly detection"""
@@ -34,6 +37,14 @@ class FlowAutoencoder(nn.Module):
             nn.Conv2d(32, input_channels, kernel_size=3, padding=1),
             nn.Sigmoid()
         )
+        
+        # Per-channel input scaling, saved with the weights
+        self.register_buffer('input_mean', torch.zeros(input_channels))
+        self.register_buffer('input_std', torch.ones(input_channels))
+
+    def normalize(self, x: torch.Tensor) -> torch.Tensor:
+        """Scale raw (B, C, H, W) inputs with the stored statistics"""
+        return (x - self.input_mean[:, None, None]) / self.input_std[:, None, None]
 
     def forward(self, x: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
         """Forward pass through autoencoder"""
@@ -47,14 +58,28 @@ class AnomalyDetector:
     def __init__(
         self,
         input_shape: Tuple[int, int],
-        threshold_percentile: float = 95.0
+        threshold_percentile: float = 95.0,
+        history_size: int = 10000,
+        device: Optional[str] = None
     ):
+        """
+        Args:
+            input_shape: Spatial shape (H, W) of the flow fields
+            threshold_percentile: Percentile of training reconstruction
+                errors used as anomaly threshold
+            history_size: Number of recent frames kept in the score and
+                detection histories
+            device: Inference device (default: CPU)
+        """
         self.input_shape = input_shape
         self.threshold_percentile = threshold_percentile
+        self.device = torch.device(device or 'cpu')
         self.logger = logging.getLogger(__name__)
         
-        # Initialize models
-        self.autoencoder = FlowAutoencoder()
+        # Initialize models; channels-last convolutions are markedly faster
+        # for these small-channel inputs
+        self.autoencoder = FlowAutoencoder().to(self.device, memory_format=torch.channels_last)
+        self.inference_model: Optional[InferenceModel] = None
         self.optimizer = torch.optim.Adam(
             self.autoencoder.parameters(),
             lr=1e-4
@@ -67,13 +92,14 @@ class AnomalyDetector:
             'vorticity': StandardScaler()
         }
         
-        # Statistics
+        # Statistics; histories are ring buffers of the latest frames
         self.reconstruction_errors = []
         self.anomaly_threshold = None
         self.stats = {
+            'num_frames': 0,
             'num_anomalies': 0,
-            'anomaly_scores': [],
-            'detection_history': []
+            'anomaly_scores': deque(maxlen=history_size),
+            'detection_history': deque(maxlen=history_size)
         }
 
     def preprocess_data(
@@ -94,6 +120,7 @@ class AnomalyDetector:
             self.scalers['velocity'].fit(np.hstack([u, v]))
             self.scalers['pressure'].fit(p)
             self.scalers['vorticity'].fit(w)
+            self._sync_normalization()
         
         # Apply scaling
         uv_scaled = self.scalers['velocity'].transform(np.hstack([u, v]))
@@ -110,6 +137,43 @@ class AnomalyDetector:
         x = np.stack([u_scaled, v_scaled, p_scaled, w_scaled], axis=0)
         return torch.FloatTensor(x).unsqueeze(0)
 
+    def _sync_normalization(self):
+        """Copy the fitted scaler statistics into the autoencoder buffers"""
+        if not all(hasattr(scaler, 'mean_') for scaler in self.scalers.values()):
+            return
+        mean = np.concatenate([self.scalers[key].mean_ for key in ('velocity', 'pressure', 'vorticity')])
+        std = np.concatenate([self.scalers[key].scale_ for key in ('velocity', 'pressure', 'vorticity')])
+        self.autoencoder.input_mean.copy_(torch.as_tensor(mean))
+        self.autoencoder.input_std.copy_(torch.as_tensor(std))
+
+    def preprocess_batch(
+        self,
+        velocity: Union[np.ndarray, torch.Tensor],
+        pressure: Union[np.ndarray, torch.Tensor],
+        vorticity: Union[np.ndarray, torch.Tensor]
+    ) -> torch.Tensor:
+        """
+        Stack frames into normalized model inputs on the inference device
+        
+        Args:
+            velocity: Velocity frames (B, H, W, 2)
+            pressure: Pressure frames (B, H, W)
+            vorticity: Vorticity frames (B, H, W)
+        
+        Returns:
+            Model inputs (B, 4, H, W)
+        """
+        def load(value):
+            return torch.as_tensor(value, dtype=torch.float32, device=self.device)
+        
+        # Stacked as (B, H, W, 4): the permuted view is channels-last
+        x = torch.cat([
+            load(velocity),
+            load(pressure)[..., None],
+            load(vorticity)[..., None]
+        ], dim=-1).permute(0, 3, 1, 2)
+        return self.autoencoder.normalize(x)
+
     def train(
         self,
         training_data: List[Dict[str, np.ndarray]],
@@ -140,7 +204,7 @@ class AnomalyDetector:
                     )
                     x_batch.append(x)
                 
-                x_batch = torch.cat(x_batch)
+                x_batch = torch.cat(x_batch).to(self.device)
                 
                 # Forward pass
                 self.optimizer.zero_grad()
@@ -174,31 +238,120 @@ class AnomalyDetector:
         vorticity: np.ndarray
     ) -> Tuple[np.ndarray, float]:
         """Detect anomalies in flow field"""
+        masks, scores = self.detect_batch(velocity[None], pressure[None], vorticity[None])
+        return masks[0], float(scores[0])
+
+    def detect_batch(
+        self,
+        velocity: Union[np.ndarray, torch.Tensor],
+        pressure: Union[np.ndarray, torch.Tensor],
+        vorticity: Union[np.ndarray, torch.Tensor],
+        batch_size: int = 8
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Detect anomalies in a stack of frames
+        
+        Args:
+            velocity: Velocity frames (B, H, W, 2)
+            pressure: Pressure frames (B, H, W)
+            vorticity: Vorticity frames (B, H, W)
+            batch_size: Frames per forward pass
+        
+        Returns:
+            Anomaly masks (B, H, W) and anomaly scores (B,)
+        """
+        if self.anomaly_threshold is None:
+            raise ValueError("Anomaly threshold not set; train or load the detector first")
         self.autoencoder.eval()
         
-        # Preprocess input
-        x = self.preprocess_data(velocity, pressure, vorticity)
+        masks, scores = [], []
+        with torch.inference_mode():
+            for i in range(0, len(velocity), batch_size):
+                x = self.preprocess_batch(
+                    velocity[i:i + batch_size],
+                    pressure[i:i + batch_size],
+                    vorticity[i:i + batch_size]
+                )
+                reconstructed = self._reconstruct(x)
+                
+                # Reconstruction error averaged over channels
+                error = (reconstructed - x).square_().mean(dim=1)
+                masks.append((error > self.anomaly_threshold).cpu())
+                scores.append(error.mean(dim=(1, 2)).cpu())
         
-        # Forward pass
-        with torch.no_grad():
-            reconstructed, latent = self.autoencoder(x)
+        masks = torch.cat(masks).numpy()
+        scores = torch.cat(scores).numpy()
         
-        # Compute reconstruction error
-        error = nn.MSELoss(reduction='none')(reconstructed, x).numpy()
-        error = error.mean(axis=1)  # Average over channels
+        # Update statistics
+        self.stats['num_frames'] += len(scores)
+        self.stats['num_anomalies'] += int(masks.sum())
+        self.stats['anomaly_scores'].extend(scores.tolist())
+        self.stats['detection_history'].extend((scores > self.anomaly_threshold).tolist())
         
-        # Compute anomaly score
-        anomaly_score = np.mean(error)
+        return masks, scores
+
+    def _reconstruct(self, x: torch.Tensor) -> torch.Tensor:
+        """Reconstruction by the exported or the eager autoencoder"""
+        if self.inference_model is not None:
+            return self.inference_model(x)[0].to(self.device)
+        reconstructed, _ = self.autoencoder(x)
+        return reconstructed
+
+    def export_inference(self, path: str, batch_size: int = 8) -> Path:
+        """
+        Export the autoencoder for inference in the channels-last layout
         
-        # Generate anomaly mask
-        anomaly_mask = error > self.anomaly_threshold
+        Inputs are normalized before the exported model, so detection
+        thresholds and scalers stay with the detector.
         
-        # Update statistics
-        self.stats['num_anomalies'] += np.sum(anomaly_mask)
-        self.stats['anomaly_scores'].append(anomaly_score)
-        self.stats['detection_history'].append(anomaly_score > self.anomaly_threshold)
+        Args:
+            path: Output directory
+            batch_size: Frames of the example input used to select the runtime
+        """
+        example = torch.rand(batch_size, 4, *self.input_shape)
+        return export_model(self.autoencoder, example, path)
+
+    def load_inference(self, path: str, runtime: str = 'auto'):
+        """Use an exported autoencoder (fastest runtime by default) in detection"""
+        self.inference_model = load_inference_model(path, runtime)
+        self.logger.info(f"Using the {self.inference_model.runtime} runtime for detection")
+
+    def detect_stream(
+        self,
+        snapshots: Iterable[Dict[str, np.ndarray]],
+        batch_size: int = 8
+    ) -> Iterator[Tuple[np.ndarray, float]]:
+        """
+        Detect anomalies in a stream of solver snapshots
+        
+        Snapshots are grouped into batches of `batch_size` frames, so results
+        follow the stream with a delay of at most one batch.
+        
+        Args:
+            snapshots: Iterable of dicts with velocity, pressure and vorticity
+            batch_size: Frames per forward pass
+        
+        Yields:
+            Anomaly mask and score of every snapshot, in order
+        """
+        buffer = []
         
-        return anomaly_mask[0], anomaly_score
+        def flush():
+            masks, scores = self.detect_batch(
+                np.stack([s['velocity'] for s in buffer]),
+                np.stack([s['pressure'] for s in buffer]),
+                np.stack([s['vorticity'] for s in buffer]),
+                batch_size=batch_size
+            )
+            buffer.clear()
+            return zip(masks, scores.tolist())
+        
+        for snapshot in snapshots:
+            buffer.append(snapshot)
+            if len(buffer) == batch_size:
+                yield from flush()
+        if buffer:
+            yield from flush()
 
     def analyze_anomaly(
         self,
@@ -263,13 +416,25 @@ class AnomalyDetector:
 
     def load_model(self, path: str):
         """Load model state"""
-        checkpoint = torch.load(path)
-        self.autoencoder.load_state_dict(checkpoint['model_state_dict'])
+        checkpoint = torch.load(path, map_location=self.device, weights_only=False)
+        
+        # Checkpoints from before the normalization buffers only hold the scalers
+        missing, unexpected = self.autoencoder.load_state_dict(
+            checkpoint['model_state_dict'], strict=False
+        )
+        if unexpected or set(missing) - {'input_mean', 'input_std'}:
+            raise RuntimeError(
+                f"Checkpoint does not match the autoencoder: missing {missing}, unexpected {unexpected}"
+            )
         self.optimizer.load_state_dict(checkpoint['optimizer_state_dict'])
         self.anomaly_threshold = checkpoint['anomaly_threshold']
         self.scalers = checkpoint['scalers']
+        self._sync_normalization()
         self.logger.info(f"Model loaded from {path}")
 
     def get_stats(self) -> Dict:
         """Get detection statistics"""
-        return self.stats.copy() 
\ No newline at end of file
+        return {
+            key: list(value) if isinstance(value, deque) else value
+            for key, value in self.stats.items()
+        } 
\ No newline at end of file
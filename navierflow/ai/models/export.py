@@ -0,0 +1,273 @@
+import copy
+import inspect
+import json
+import logging
+import time
+import warnings
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import torch
+import torch.nn as nn
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+# Runtimes in order of preference when they cannot be timed
+RUNTIMES = ('onnxruntime', 'torchscript')
+
+TORCHSCRIPT_FILE = 'model.pt'
+ONNX_FILE = 'model.onnx'
+META_FILE = 'meta.json'
+
+logger = logging.getLogger(__name__)
+
+def quantize_linear(model: nn.Module) -> nn.Module:
+    """
+    Dynamic int8 quantization of the linear layers of a copy of a model
+
+    Weights are stored as int8 and activations are quantized on the fly, so
+    no calibration data is needed. PyTorch has no dynamically quantized
+    convolutions; convolutional layers are left in float32.
+    """
+    with warnings.catch_warnings():
+        # torch.ao.quantization is deprecated in favour of torchao, which
+        # is not a dependency; the eager API still works
+        warnings.simplefilter('ignore')
+        from torch.ao.quantization import quantize_dynamic
+        return quantize_dynamic(copy.deepcopy(model).eval(), {nn.Linear}, dtype=torch.qint8)
+
+def _has_linear(model: nn.Module) -> bool:
+    return any(isinstance(module, nn.Linear) for module in model.modules())
+
+def _export_torchscript(model: nn.Module, example: torch.Tensor, path: Path):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        traced = torch.jit.trace(model, example, check_trace=False)
+        # Freezing inlines the weights and folds constants
+        frozen = torch.jit.freeze(traced.eval())
+    torch.jit.save(frozen, str(path))
+
+def _export_onnx(
+    model: nn.Module,
+    example: torch.Tensor,
+    path: Path,
+    num_outputs: int,
+    quantize: bool
+) -> bool:
+    """ONNX export, with dynamic int8 MatMul/Gemm weights when quantizing"""
+    try:
+        import onnx  # noqa: F401  (needed by torch.onnx.export)
+    except ImportError:
+        logger.warning("onnx not available. Falling back to TorchScript only.")
+        return False
+
+    # Batch and (for images) spatial dimensions stay dynamic
+    dynamic_axes = {'input': {0: 'batch'}}
+    if example.ndim == 4:
+        dynamic_axes['input'].update({2: 'height', 3: 'width'})
+    output_names = [f'output_{i}' for i in range(num_outputs)]
+    kwargs = {}
+    if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+        # The TorchScript-based exporter needs no onnxscript
+        kwargs['dynamo'] = False
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            torch.onnx.export(
+                model, (example.contiguous(),), str(path),
+                input_names=['input'],
+                output_names=output_names,
+                dynamic_axes={**dynamic_axes, **{name: {0: 'batch'} for name in output_names}},
+                **kwargs
+            )
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            float_path = path.with_name(path.stem + '.float.onnx')
+            path.replace(float_path)
+            # Integer convolutions are slower than float ones on CPU
+            quantize_dynamic(str(float_path), str(path), op_types_to_quantize=['MatMul', 'Gemm'],
+                             weight_type=QuantType.QInt8)
+            float_path.unlink()
+    except Exception as e:
+        logger.warning(f"ONNX export failed ({e}). Falling back to TorchScript only.")
+        if path.exists():
+            path.unlink()
+        return False
+    return True
+
+def export_model(
+    model: nn.Module,
+    example: torch.Tensor,
+    path: Union[str, Path],
+    quantize: bool = True,
+    channels_last: Optional[bool] = None,
+    formats: Sequence[str] = ('torchscript', 'onnx')
+) -> Path:
+    """
+    Export a model for inference
+
+    The model is copied to the CPU in eval mode, so training state is not
+    affected. Linear layers are quantized to int8 (dynamic quantization);
+    convolutional models are exported in the channels-last layout instead,
+    which is what makes them fast on CPU.
+
+    Args:
+        model: Model taking one tensor input
+        example: Example input; its shape is stored for runtime selection
+        path: Output directory
+        quantize: Quantize linear layers to int8
+        channels_last: Channels-last layout (default: for 4D inputs)
+        formats: 'torchscript' and/or 'onnx'
+
+    Returns:
+        Output directory
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    example = example.detach().cpu().float()
+    if channels_last is None:
+        channels_last = example.ndim == 4
+    quantize = quantize and _has_linear(model)
+
+    model = copy.deepcopy(model).cpu().eval()
+    with torch.no_grad():
+        outputs = model(example)
+    num_outputs = len(outputs) if isinstance(outputs, (tuple, list)) else 1
+
+    files = {}
+    if 'torchscript' in formats:
+        scripted = quantize_linear(model) if quantize else model
+        if channels_last:
+            scripted = scripted.to(memory_format=torch.channels_last)
+            traced_example = example.contiguous(memory_format=torch.channels_last)
+        else:
+            traced_example = example
+        _export_torchscript(scripted, traced_example, path / TORCHSCRIPT_FILE)
+        files['torchscript'] = TORCHSCRIPT_FILE
+    if 'onnx' in formats and _export_onnx(model, example, path / ONNX_FILE, num_outputs, quantize):
+        files['onnxruntime'] = ONNX_FILE
+
+    meta = {
+        'model': type(model).__name__,
+        'input_shape': list(example.shape),
+        'num_outputs': num_outputs,
+        'quantized': quantize,
+        'channels_last': channels_last,
+        'files': files
+    }
+    with open(path / META_FILE, 'w') as f:
+        json.dump(meta, f, indent=2)
+    logger.info(f"Exported {meta['model']} to {path} ({', '.join(files)})")
+    return path
+
+class InferenceModel:
+    """
+    Exported model behind a single call interface.
+
+    Takes and returns CPU tensors like the eager model: a tensor, or a
+    tuple of tensors for models with several outputs.
+    """
+    def __init__(self, runtime: str, path: Union[str, Path], meta: Optional[Dict] = None):
+        self.runtime = runtime
+        self.path = Path(path)
+        if meta is None:
+            with open(self.path / META_FILE, 'r') as f:
+                meta = json.load(f)
+        self.meta = meta
+
+        if runtime == 'onnxruntime':
+            if onnxruntime is None:
+                raise RuntimeError("onnxruntime is not installed")
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = torch.get_num_threads()
+            self.session = onnxruntime.InferenceSession(
+                str(self.path / meta['files'][runtime]), options, providers=['CPUExecutionProvider']
+            )
+        elif runtime == 'torchscript':
+            self.module = torch.jit.load(str(self.path / meta['files'][runtime]), map_location='cpu')
+        else:
+            raise ValueError(f"Unknown runtime: {runtime}")
+
+    def __call__(self, x: torch.Tensor) -> Union[torch.Tensor, Tuple[torch.Tensor, ...]]:
+        x = x.detach().cpu().float()
+        if self.runtime == 'onnxruntime':
+            outputs = self.session.run(None, {'input': x.contiguous().numpy()})
+            outputs = tuple(torch.from_numpy(output) for output in outputs)
+        else:
+            if self.meta['channels_last']:
+                x = x.contiguous(memory_format=torch.channels_last)
+            with torch.inference_mode():
+                outputs = self.module(x)
+            if not isinstance(outputs, (tuple, list)):
+                outputs = (outputs,)
+            outputs = tuple(outputs)
+        return outputs[0] if len(outputs) == 1 else outputs
+
+    def time(self, x: torch.Tensor, repeats: int = 5) -> float:
+        """Best latency in seconds over `repeats` calls, after one warm-up"""
+        self(x)
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            self(x)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+def available_runtimes(path: Union[str, Path]) -> List[str]:
+    """Runtimes that are installed and have an exported file in `path`"""
+    with open(Path(path) / META_FILE, 'r') as f:
+        files = json.load(f)['files']
+    return [
+        runtime for runtime in RUNTIMES
+        if runtime in files and (runtime != 'onnxruntime' or onnxruntime is not None)
+    ]
+
+def load_inference_model(
+    path: Union[str, Path],
+    runtime: str = 'auto',
+    repeats: int = 5
+) -> InferenceModel:
+    """
+    Load an exported model with the fastest available runtime
+
+    With runtime='auto', every available runtime is timed on a random input
+    of the exported example shape and the fastest is kept.
+
+    Args:
+        path: Directory written by export_model
+        runtime: 'auto', 'onnxruntime' or 'torchscript'
+        repeats: Timed calls per runtime when selecting automatically
+    """
+    path = Path(path)
+    with open(path / META_FILE, 'r') as f:
+        meta = json.load(f)
+    candidates = available_runtimes(path)
+    if not candidates:
+        raise RuntimeError(f"No usable runtime for the model exported to {path}")
+
+    if runtime != 'auto':
+        if runtime not in candidates:
+            raise ValueError(f"Runtime {runtime} not available for {path} (available: {candidates})")
+        return InferenceModel(runtime, path, meta)
+    if len(candidates) == 1:
+        return InferenceModel(candidates[0], path, meta)
+
+    example = torch.randn(meta['input_shape'])
+    timings = {}
+    for candidate in candidates:
+        try:
+            model = InferenceModel(candidate, path, meta)
+            timings[candidate] = (model.time(example, repeats), model)
+        except Exception as e:
+            logger.warning(f"Runtime {candidate} failed ({e}). Falling back to the other runtimes.")
+    if not timings:
+        raise RuntimeError(f"No runtime could run the model exported to {path}")
+
+    fastest = min(timings, key=lambda name: timings[name][0])
+    logger.info(
+        f"Selected {fastest} for {meta['model']}: " +
+        ", ".join(f"{name} {seconds * 1e3:.2f} ms" for name, (seconds, _) in timings.items())
+    )
+    return timings[fastest][1]
@@ -3,6 +3,9 @@ import torch.nn as nn
 import numpy as np
 from typing import Dict, List, Optional, Tuple
 import logging
+from pathlib import Path
+from .export import InferenceModel, export_model, load_inference_model
+from ...core.numerics.quadtree import QuadtreeMesh, build_quadtree, leaf_cells
 
 class MeshOptimizer:
     """AI-based mesh optimization for adaptive refinement"""
@@ -18,8 +21,10 @@ class MeshOptimizer:
         self.feature_threshold = feature_threshold
         self.logger = logging.getLogger(__name__)
         
-        # Initialize feature detection network
-        self.feature_detector = self._build_feature_detector()
+        # Initialize feature detection network; channels-last convolutions
+        # are markedly faster on CPU for these small-channel inputs
+        self.feature_detector = self._build_feature_detector().to(memory_format=torch.channels_last)
+        self.inference_model: Optional[InferenceModel] = None
         self.optimizer = torch.optim.Adam(
             self.feature_detector.parameters(),
             lr=1e-4
@@ -63,12 +68,30 @@ class MeshOptimizer:
         
         x = torch.FloatTensor(x).unsqueeze(0)  # Add batch dimension
         
-        # Forward pass through feature detector
-        with torch.no_grad():
-            scores = self.feature_detector(x).squeeze()
+        # Forward pass through the exported or the eager feature detector
+        if self.inference_model is not None:
+            return self.inference_model(x).squeeze().numpy()
+        self.feature_detector.eval()
+        with torch.inference_mode():
+            scores = self.feature_detector(x.contiguous(memory_format=torch.channels_last)).squeeze()
         
         return scores.numpy()
 
+    def export_inference(self, path: str, quantize: bool = True) -> Path:
+        """
+        Export the feature detector for inference in the channels-last layout
+        
+        The detector is convolutional, so quantize has no effect unless
+        linear layers are added to it.
+        """
+        example = torch.rand(1, 4, *self.base_resolution)
+        return export_model(self.feature_detector, example, path, quantize=quantize)
+
+    def load_inference(self, path: str, runtime: str = 'auto'):
+        """Use an exported feature detector (fastest runtime by default)"""
+        self.inference_model = load_inference_model(path, runtime)
+        self.logger.info(f"Using the {self.inference_model.runtime} runtime for feature scores")
+
     def determine_refinement_levels(
         self,
         feature_scores: np.ndarray
@@ -86,39 +109,48 @@ class MeshOptimizer:
         self,
         refinement_levels: np.ndarray
     ) -> Tuple[np.ndarray, np.ndarray]:
-        """Generate refined mesh based on refinement levels"""
+        """
+        Generate refined mesh based on refinement levels
+        
+        Grid node (i, j) is replaced by the 2^l x 2^l points subdividing the
+        spacing that follows it. Cells of one level are emitted together by
+        broadcasting into preallocated output arrays; the points keep the
+        node-major order of the per-node loop this replaces.
+        
+        Args:
+            refinement_levels: Refinement level of each grid node (H, W)
+            
+        Returns:
+            Point coordinates x and y
+        """
         height, width = refinement_levels.shape
+        x, y, _, _, finest = leaf_cells(refinement_levels)
         
-        # Initialize mesh coordinates
-        x = np.linspace(0, 1, width)
-        y = np.linspace(0, 1, height)
-        X, Y = np.meshgrid(x, y)
+        # Nodes of the unit grid are linspace(0, 1, n) apart
+        dx = 1.0 / max(width - 1, 1)
+        dy = 1.0 / max(height - 1, 1)
+        return x * (dx / finest), y * (dy / finest)
         
-        # Initialize refined coordinates
-        refined_x = []
-        refined_y = []
+    def generate_quadtree(
+        self,
+        refinement_levels: np.ndarray,
+        extent: Tuple[float, float] = (1.0, 1.0)
+    ) -> QuadtreeMesh:
+        """
+        Generate a quadtree mesh with connectivity from refinement levels
         
-        for i in range(height):
-            for j in range(width):
-                level = refinement_levels[i, j]
-                if level > 0:
-                    # Add refined points
-                    dx = x[1] - x[0]
-                    dy = y[1] - y[0]
-                    
-                    subdivisions = 2 ** level
-                    x_local = np.linspace(X[i,j], X[i,j] + dx, subdivisions+1)[:-1]
-                    y_local = np.linspace(Y[i,j], Y[i,j] + dy, subdivisions+1)[:-1]
-                    
-                    x_grid, y_grid = np.meshgrid(x_local, y_local)
-                    refined_x.extend(x_grid.flatten())
-                    refined_y.extend(y_grid.flatten())
-                else:
-                    # Add original point
-                    refined_x.append(X[i,j])
-                    refined_y.append(Y[i,j])
+        Unlike generate_refined_mesh, each level entry refines a cell of a
+        uniform grid over the domain into 2^l x 2^l leaf cells, which can be
+        converted with QuadtreeMesh.to_mesh or QuadtreeMesh.to_amr.
         
-        return np.array(refined_x), np.array(refined_y)
+        Args:
+            refinement_levels: Refinement level of each base cell (H, W)
+            extent: Domain size (x, y)
+            
+        Returns:
+            Leaf cells, shared vertices and face neighbors across levels
+        """
+        return build_quadtree(refinement_levels, extent)
 
     def train_feature_detector(
         self,
@@ -1,8 +1,11 @@
 import torch
 import torch.nn as nn
+from torch.func import jacrev, jvp, vmap
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
 import logging
+from .export import InferenceModel, export_model, load_inference_model
 
 class FluidPINN(nn.Module):
     """Physics-Informed Neural Network for fluid dynamics"""
@@ -11,10 +14,27 @@ class FluidPINN(nn.Module):
         self,
         hidden_layers: List[int] = [64, 128, 128, 64],
         activation: nn.Module = nn.Tanh(),
-        learning_rate: float = 1e-4
+        learning_rate: float = 1e-4,
+        residual_mode: str = "autograd",
+        compile_residual: bool = False
     ):
+        """
+        Args:
+            hidden_layers: Width of each hidden layer
+            activation: Activation between layers
+            learning_rate: Adam learning rate
+            residual_mode: 'autograd' (one reverse pass per Jacobian row) or
+                'functional' (torch.func forward-over-reverse per sample)
+            compile_residual: Compile the PDE loss with torch.compile
+        """
         super().__init__()
         
+        if residual_mode not in ("autograd", "functional"):
+            raise ValueError(f"Unknown residual mode: {residual_mode}")
+        self.residual_mode = residual_mode
+        self.compile_residual = compile_residual
+        self._compiled_pde_loss = None
+        
         self.input_dim = 3  # (x, y, t)
         self.output_dim = 3  # (u, v, p)
         
@@ -33,69 +53,128 @@ class FluidPINN(nn.Module):
         
         self.network = nn.Sequential(*layers)
         self.optimizer = torch.optim.Adam(self.parameters(), lr=learning_rate)
+        self._accumulated_batches = 0
         
         # Loss weights
         self.lambda_data = 1.0
         self.lambda_pde = 1.0
         self.lambda_bc = 1.0
         
+        # Physical parameters
+        self.rho = 1.0  # Density
+        self.nu = 0.01  # Kinematic viscosity
+        
         # Initialize logger
         self.logger = logging.getLogger(__name__)
+        
+        # Exported network used by predict, see load_inference
+        self.inference_model: Optional[InferenceModel] = None
 
     def forward(self, x: torch.Tensor) -> torch.Tensor:
         """Forward pass through the network"""
         return self.network(x)
 
-    def compute_pde_loss(self, x: torch.Tensor) -> torch.Tensor:
-        """Compute PDE residual loss (Navier-Stokes equations)"""
-        x.requires_grad_(True)
+    def compute_derivatives(self, x: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """
+        Network outputs with the derivatives needed by the residuals
         
-        # Get predictions
+        Args:
+            x: Collocation points of shape (N, 3) as (x, y, t)
+            
+        Returns:
+            y: Outputs (u, v, p) of shape (N, 3)
+            jacobian: (N, 3, 3) with jacobian[:, i, j] = d y_i / d x_j
+            laplacian: (N, 2) spatial Laplacians of u and v
+        """
+        if self.residual_mode == "functional":
+            return self._functional_derivatives(x)
+        return self._autograd_derivatives(x)
+
+    def _autograd_derivatives(self, x: torch.Tensor):
+        """Each Jacobian row from one reverse pass, then four for the Laplacians"""
+        x = x.detach().requires_grad_(True)
         y = self.forward(x)
-        u, v, p = y[:, 0:1], y[:, 1:2], y[:, 2:3]
-        
-        # Compute gradients
-        du_dx = torch.autograd.grad(u.sum(), x, create_graph=True)[0][:, 0:1]
-        du_dy = torch.autograd.grad(u.sum(), x, create_graph=True)[0][:, 1:2]
-        du_dt = torch.autograd.grad(u.sum(), x, create_graph=True)[0][:, 2:3]
-        
-        dv_dx = torch.autograd.grad(v.sum(), x, create_graph=True)[0][:, 0:1]
-        dv_dy = torch.autograd.grad(v.sum(), x, create_graph=True)[0][:, 1:2]
-        dv_dt = torch.autograd.grad(v.sum(), x, create_graph=True)[0][:, 2:3]
-        
-        dp_dx = torch.autograd.grad(p.sum(), x, create_graph=True)[0][:, 0:1]
-        dp_dy = torch.autograd.grad(p.sum(), x, create_graph=True)[0][:, 1:2]
-        
-        # Second derivatives
-        d2u_dx2 = torch.autograd.grad(du_dx.sum(), x, create_graph=True)[0][:, 0:1]
-        d2u_dy2 = torch.autograd.grad(du_dy.sum(), x, create_graph=True)[0][:, 1:2]
-        
-        d2v_dx2 = torch.autograd.grad(dv_dx.sum(), x, create_graph=True)[0][:, 0:1]
-        d2v_dy2 = torch.autograd.grad(dv_dy.sum(), x, create_graph=True)[0][:, 1:2]
-        
-        # Physical parameters
-        rho = 1.0  # Density
-        nu = 0.01  # Kinematic viscosity
+        rows = [
+            torch.autograd.grad(y[:, i].sum(), x, create_graph=True)[0]
+            for i in range(self.output_dim)
+        ]
+        # Differentiate the rows themselves; going through a stacked
+        # Jacobian would add a full-size scatter to every backward pass
+        laplacian = [
+            torch.autograd.grad(rows[i][:, 0].sum(), x, create_graph=True)[0][:, 0] +
+            torch.autograd.grad(rows[i][:, 1].sum(), x, create_graph=True)[0][:, 1]
+            for i in range(2)
+        ]
+        return y, torch.stack(rows, dim=1), torch.stack(laplacian, dim=1)
+
+    def _functional_derivatives(self, x: torch.Tensor):
+        """Per-sample forward-over-reverse along the two spatial directions"""
+        def value_and_jacobian(point):
+            jacobian, value = jacrev(lambda p: (self.forward(p),) * 2, has_aux=True)(point)
+            return jacobian, (jacobian, value)
+
+        spatial = torch.eye(self.input_dim, dtype=x.dtype, device=x.device)[:2]
+
+        def per_sample(point):
+            def along(tangent):
+                _, djacobian, (jacobian, value) = jvp(
+                    value_and_jacobian, (point,), (tangent,), has_aux=True)
+                return value, jacobian, djacobian
+            value, jacobian, djacobian = vmap(along)(spatial)
+            # djacobian[k, i, j] = d^2 y_i / (dx_k dx_j)
+            laplacian = djacobian[0, :2, 0] + djacobian[1, :2, 1]
+            return value[0], jacobian[0], laplacian
+
+        return vmap(per_sample)(x)
+
+    def compute_residuals(self, x: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """Continuity and momentum residuals of the Navier-Stokes equations"""
+        y, jacobian, laplacian = self.compute_derivatives(x)
+        u, v = y[:, 0], y[:, 1]
+        du_dx, du_dy, du_dt = jacobian[:, 0, 0], jacobian[:, 0, 1], jacobian[:, 0, 2]
+        dv_dx, dv_dy, dv_dt = jacobian[:, 1, 0], jacobian[:, 1, 1], jacobian[:, 1, 2]
+        dp_dx, dp_dy = jacobian[:, 2, 0], jacobian[:, 2, 1]
         
-        # Navier-Stokes residuals
         continuity = du_dx + dv_dy
         
         momentum_x = (
             du_dt + u * du_dx + v * du_dy +
-            (1/rho) * dp_dx - nu * (d2u_dx2 + d2u_dy2)
+            (1/self.rho) * dp_dx - self.nu * laplacian[:, 0]
         )
         
         momentum_y = (
             dv_dt + u * dv_dx + v * dv_dy +
-            (1/rho) * dp_dy - nu * (d2v_dx2 + d2v_dy2)
+            (1/self.rho) * dp_dy - self.nu * laplacian[:, 1]
         )
         
+        return continuity, momentum_x, momentum_y
+
+    def pointwise_residual(self, x: torch.Tensor) -> torch.Tensor:
+        """Residual norm at each point, e.g. for adaptive collocation sampling"""
+        continuity, momentum_x, momentum_y = self.compute_residuals(x)
+        return torch.sqrt(continuity**2 + momentum_x**2 + momentum_y**2).detach()
+
+    def _pde_loss(self, x: torch.Tensor) -> torch.Tensor:
+        continuity, momentum_x, momentum_y = self.compute_residuals(x)
         return torch.mean(
             continuity**2 +
             momentum_x**2 +
             momentum_y**2
         )
 
+    def compute_pde_loss(self, x: torch.Tensor) -> torch.Tensor:
+        """Compute PDE residual loss (Navier-Stokes equations)"""
+        if not self.compile_residual:
+            return self._pde_loss(x)
+        if self._compiled_pde_loss is None:
+            self._compiled_pde_loss = torch.compile(self._pde_loss)
+        try:
+            return self._compiled_pde_loss(x)
+        except Exception as e:
+            self.logger.warning(f"torch.compile failed ({e}). Falling back to the eager residual.")
+            self.compile_residual = False
+            return self._pde_loss(x)
+
     def compute_bc_loss(self, x_bc: torch.Tensor, bc_values: torch.Tensor) -> torch.Tensor:
         """Compute boundary condition loss"""
         y_pred = self.forward(x_bc)
@@ -112,10 +191,19 @@ class FluidPINN(nn.Module):
         x_bc: torch.Tensor,
         bc_values: torch.Tensor,
         x_data: Optional[torch.Tensor] = None,
-        y_data: Optional[torch.Tensor] = None
+        y_data: Optional[torch.Tensor] = None,
+        loss_scale: float = 1.0,
+        step: bool = True
     ) -> Dict[str, float]:
-        """Execute one training step"""
-        self.optimizer.zero_grad()
+        """
+        Execute one training step
+        
+        For gradient accumulation, pass loss_scale = 1 / accumulation_steps
+        and step=False on all but the last micro-batch; gradients are only
+        cleared once the optimizer has stepped.
+        """
+        if self._accumulated_batches == 0:
+            self.optimizer.zero_grad()
         
         # Compute PDE loss
         pde_loss = self.compute_pde_loss(x_pde)
@@ -138,8 +226,11 @@ class FluidPINN(nn.Module):
         )
         
         # Backpropagation
-        total_loss.backward()
-        self.optimizer.step()
+        (total_loss * loss_scale).backward()
+        self._accumulated_batches += 1
+        if step:
+            self.optimizer.step()
+            self._accumulated_batches = 0
         
         return {
             'total_loss': total_loss.item(),
@@ -148,12 +239,31 @@ class FluidPINN(nn.Module):
             'data_loss': data_loss.item()
         }
 
-    def predict(self, x: torch.Tensor) -> np.ndarray:
+    def predict(self, x: Union[np.ndarray, torch.Tensor]) -> np.ndarray:
         """Make prediction at given points"""
+        if self.inference_model is not None:
+            return self.inference_model(torch.as_tensor(x, dtype=torch.float32)).numpy()
         self.eval()
-        with torch.no_grad():
-            y_pred = self.forward(x)
-        return y_pred.numpy()
+        device = next(self.parameters()).device
+        with torch.inference_mode():
+            y_pred = self.forward(torch.as_tensor(x, dtype=torch.float32, device=device))
+        return y_pred.cpu().numpy()
+
+    def export_inference(self, path: str, quantize: bool = True, batch_size: int = 4096) -> Path:
+        """
+        Export the network for inference with int8 linear layers
+        
+        Args:
+            path: Output directory
+            quantize: Dynamic int8 quantization of the linear layers
+            batch_size: Points of the example input used to select the runtime
+        """
+        return export_model(self.network, torch.rand(batch_size, self.input_dim), path, quantize=quantize)
+
+    def load_inference(self, path: str, runtime: str = 'auto'):
+        """Use an exported network (fastest runtime by default) in predict"""
+        self.inference_model = load_inference_model(path, runtime)
+        self.logger.info(f"Using the {self.inference_model.runtime} runtime for predictions")
 
     def save_model(self, path: str):
         """Save model state"""
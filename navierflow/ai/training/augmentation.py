@@ -0,0 +1,216 @@
+import math
+import numpy as np
+import torch
+import torch.nn.functional as F
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+# How each field transforms under rotations and reflections of the domain
+VECTOR_KEYS = ('velocity',)                 # Components rotate with the domain
+SCALAR_KEYS = ('pressure', 'cell_sizes')
+PSEUDOSCALAR_KEYS = ('vorticity',)          # Changes sign under reflections
+MASK_KEYS = ('refinement_mask', 'anomaly_mask')  # Nearest-neighbour resampling
+
+def batch_seed(seed: int, epoch: int, step: int) -> int:
+    """Seed of one batch, independent of devices and loader workers"""
+    return int(np.random.SeedSequence([seed, epoch, step]).generate_state(1)[0])
+
+class BatchAugmentor:
+    """
+    Augmentation of whole batches on the device they live on.
+
+    Fields are (B, H, W) scalars or (B, H, W, 2) vectors with the x
+    component along W and the y component along H. Rotation and flips are
+    combined into one orthogonal map A per sample and applied with a single
+    resampling pass: scalars become p(A^-1 x), vectors A u(A^-1 x), and the
+    vorticity det(A) w(A^-1 x). Velocity and vorticity are scaled by s and
+    pressure by s^2, followed by per-sample crops and normalization.
+
+    Random parameters are drawn on the CPU from a generator seeded with
+    (seed, epoch, step), so augmentations are reproducible across runs and
+    devices without storing augmented copies.
+    """
+    def __init__(self, config: Dict = None):
+        self.config = {
+            'rotation': True,
+            'max_angle': 180.0,             # Degrees, uniform in [-max, max]
+            'flips': True,
+            'scale_range': (0.8, 1.2),      # None disables scaling
+            'crop_size': None,              # (h, w); centered when not training
+            'stats_file': None,             # statistics.npz for normalization
+            'padding_mode': 'zeros',        # grid_sample padding outside the domain
+            'seed': 0
+        }
+        if config:
+            self.config.update(config)
+        self.stats = self._load_stats(self.config['stats_file'])
+
+    @staticmethod
+    def _load_stats(stats_file: Optional[Union[str, Path]]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        if stats_file is None:
+            return {}
+        with np.load(stats_file) as f:
+            return {
+                key: (f[f'{key}_mean'], f[f'{key}_std'])
+                for key in VECTOR_KEYS + SCALAR_KEYS + PSEUDOSCALAR_KEYS
+                if f'{key}_mean' in f
+            }
+
+    def __call__(
+        self,
+        batch: Dict,
+        epoch: int = 0,
+        step: int = 0,
+        train: bool = True
+    ) -> Dict:
+        """
+        Augment and normalize a collated batch
+
+        Args:
+            batch: Collated batch; keys that are not batched tensors are
+                passed through unchanged
+            epoch: Epoch, part of the batch seed
+            step: Batch index within the epoch, part of the batch seed
+            train: Apply random augmentation (otherwise only the center crop
+                and normalization)
+        """
+        fields = {
+            key: value for key, value in batch.items()
+            if key in VECTOR_KEYS + SCALAR_KEYS + PSEUDOSCALAR_KEYS + MASK_KEYS
+            and isinstance(value, torch.Tensor)
+        }
+        if not fields:
+            return batch
+        # Crop offsets and sizes refer to the resolution of the velocity
+        reference = fields.get('velocity', next(iter(fields.values())))
+        size = len(reference)
+        height, width = reference.shape[1:3]
+        generator = torch.Generator().manual_seed(batch_seed(self.config['seed'], epoch, step))
+
+        if train:
+            transform = self._random_transform(size, generator)
+            if transform is not None:
+                fields = self._resample(fields, transform.to(reference.device))
+            if self.config['scale_range'] is not None:
+                low, high = self.config['scale_range']
+                scale = (low + (high - low) * torch.rand(size, generator=generator)).to(reference.device)
+                fields = self._scale(fields, scale)
+
+        if self.config['crop_size'] is not None:
+            h, w = self.config['crop_size']
+            if train:
+                top = (torch.rand(size, generator=generator) * (height - h + 1)).long()
+                left = (torch.rand(size, generator=generator) * (width - w + 1)).long()
+            else:
+                top = torch.full((size,), (height - h) // 2)
+                left = torch.full((size,), (width - w) // 2)
+            fields = self._crop(fields, top.to(reference.device), left.to(reference.device),
+                                h, w, (height, width))
+
+        fields = self._normalize(fields)
+        return {**batch, **fields}
+
+    def _random_transform(self, size: int, generator: torch.Generator) -> Optional[torch.Tensor]:
+        """Per-sample orthogonal maps (B, 2, 2): rotation after flips"""
+        if not (self.config['rotation'] or self.config['flips']):
+            return None
+        transform = torch.eye(2).repeat(size, 1, 1)
+        if self.config['flips']:
+            signs = torch.where(torch.rand(size, 2, generator=generator) < 0.5, -1.0, 1.0)
+            transform = transform * signs[:, None, :]
+        if self.config['rotation']:
+            max_angle = math.radians(self.config['max_angle'])
+            angle = (2.0 * torch.rand(size, generator=generator) - 1.0) * max_angle
+            cos, sin = torch.cos(angle), torch.sin(angle)
+            rotation = torch.stack([torch.stack([cos, -sin], -1), torch.stack([sin, cos], -1)], -2)
+            transform = rotation @ transform
+        return transform
+
+    def _resample(self, fields: Dict[str, torch.Tensor], transform: torch.Tensor) -> Dict[str, torch.Tensor]:
+        """Apply the maps A to positions (and to vector components)"""
+        # Fields of one kind and resolution are resampled in one pass
+        groups: Dict[Tuple, List[str]] = {}
+        for key, value in fields.items():
+            mode = 'nearest' if key in MASK_KEYS else 'bilinear'
+            groups.setdefault((mode, tuple(value.shape[1:3])), []).append(key)
+
+        out = {}
+        for (mode, (height, width)), keys in groups.items():
+            # grid_sample maps output to input positions in normalized
+            # coordinates; the scaling S keeps rotations undistorted on
+            # non-square grids: theta = S^-1 A^T S
+            scale = torch.tensor([width / 2.0, height / 2.0], device=transform.device)
+            theta = transform.transpose(1, 2) * scale[None, None, :] / scale[None, :, None]
+            theta = torch.cat([theta, torch.zeros(len(theta), 2, 1, device=theta.device)], dim=2)
+
+            channels = [fields[key].reshape(fields[key].shape[:3] + (-1,)) for key in keys]
+            stacked = torch.cat(channels, dim=-1).permute(0, 3, 1, 2)
+            dtype = stacked.dtype
+            stacked = stacked.float()
+            grid = F.affine_grid(theta, list(stacked.shape), align_corners=False)
+            sampled = F.grid_sample(stacked, grid, mode=mode,
+                                    padding_mode=self.config['padding_mode'], align_corners=False)
+            sampled = sampled.to(dtype).permute(0, 2, 3, 1)
+
+            offset = 0
+            for key, channel in zip(keys, channels):
+                count = channel.shape[-1]
+                value = sampled[..., offset:offset + count].reshape(fields[key].shape)
+                offset += count
+                if key in VECTOR_KEYS:
+                    value = torch.einsum('bij,bhwj->bhwi', transform.to(value.dtype), value)
+                elif key in PSEUDOSCALAR_KEYS:
+                    value = value * torch.det(transform).to(value.dtype).view(-1, *[1] * (value.ndim - 1))
+                out[key] = value
+        return out
+
+    @staticmethod
+    def _scale(fields: Dict[str, torch.Tensor], scale: torch.Tensor) -> Dict[str, torch.Tensor]:
+        """Velocity and vorticity scale with s, pressure with s^2"""
+        out = dict(fields)
+        for key, value in fields.items():
+            factor = scale.to(value.dtype).view(-1, *[1] * (value.ndim - 1))
+            if key in VECTOR_KEYS + PSEUDOSCALAR_KEYS:
+                out[key] = value * factor
+            elif key == 'pressure':
+                out[key] = value * factor ** 2
+        return out
+
+    @staticmethod
+    def _crop(
+        fields: Dict[str, torch.Tensor],
+        top: torch.Tensor,
+        left: torch.Tensor,
+        h: int,
+        w: int,
+        resolution: Tuple[int, int]
+    ) -> Dict[str, torch.Tensor]:
+        """
+        Per-sample crops as one gather per field
+
+        Offsets and sizes refer to `resolution`; fields at other
+        resolutions (e.g. coarse refinement masks) are cropped to the same
+        region, which must fall on their grid.
+        """
+        out = {}
+        for key, value in fields.items():
+            height, width = value.shape[1:3]
+            ratio_y, ratio_x = height / resolution[0], width / resolution[1]
+            if not all(float(n * r).is_integer() for n, r in ((h, ratio_y), (w, ratio_x))):
+                raise ValueError(f"Crop of {key} does not fall on its {height}x{width} grid")
+            device = value.device
+            rows = ((top * ratio_y).long()[:, None] + torch.arange(int(h * ratio_y), device=device))[:, :, None]
+            cols = ((left * ratio_x).long()[:, None] + torch.arange(int(w * ratio_x), device=device))[:, None, :]
+            samples = torch.arange(len(value), device=device)[:, None, None]
+            out[key] = value[samples, rows, cols]
+        return out
+
+    def _normalize(self, fields: Dict[str, torch.Tensor]) -> Dict[str, torch.Tensor]:
+        out = dict(fields)
+        for key, (mean, std) in self.stats.items():
+            if key in fields:
+                value = fields[key]
+                mean = torch.as_tensor(mean, dtype=value.dtype, device=value.device)
+                std = torch.as_tensor(std, dtype=value.dtype, device=value.device)
+                out[key] = (value - mean) / std
+        return out
@@ -0,0 +1,210 @@
+import numpy as np
+from scipy.stats import qmc
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+import warnings
+
+# Boundary conditions of the unit (x, y, t) domain: the x coordinate of the
+# boundary and the prescribed (u, v, p) values
+BOUNDARY_CONDITIONS: Dict[str, Tuple[float, Tuple[float, float, float]]] = {
+    'wall': (0.0, (0.0, 0.0, 0.0)),     # No-slip wall at x=0
+    'inlet': (0.0, (1.0, 0.0, 0.0)),    # Unit x-velocity inlet
+    'outlet': (1.0, (0.0, 0.0, 0.0))    # Zero pressure gradient, handled in the loss
+}
+
+def sample_boundary(
+    n: int,
+    rng: np.random.Generator,
+    conditions: Optional[Dict[str, Tuple[float, Tuple[float, ...]]]] = None,
+    weights: Optional[List[float]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized boundary point sampling
+
+    Args:
+        n: Number of points
+        rng: Random generator
+        conditions: Boundary table (default BOUNDARY_CONDITIONS)
+        weights: Selection probability of each boundary (default uniform)
+
+    Returns:
+        Points (n, 3) and prescribed values (n, 3)
+    """
+    conditions = conditions or BOUNDARY_CONDITIONS
+    positions = np.array([position for position, _ in conditions.values()])
+    values = np.array([value for _, value in conditions.values()], dtype=np.float64)
+
+    kind = rng.choice(len(conditions), size=n, p=weights)
+    x_bc = np.empty((n, 3))
+    x_bc[:, 0] = positions[kind]
+    x_bc[:, 1:] = rng.random((n, 2))
+    return x_bc, values[kind]
+
+class CollocationSampler:
+    """
+    Persistent pool of PDE collocation points with adaptive refinement.
+
+    The pool is drawn once from a uniform, Sobol, Halton or Latin-hypercube
+    sequence and kept across epochs. Batches are drawn from the pool, and
+    `refine` adapts it to the current model from its pointwise PDE
+    residual:
+    - 'rar': residual-based adaptive refinement, adding the candidates with
+      the largest residuals to the pool
+    - 'importance': batches are drawn with probability proportional to
+      residual^power / mean + floor, re-estimated on every refinement
+    """
+    def __init__(self, config: Dict = None):
+        self.config = {
+            'pool_size': 10000,
+            'batch_size': None,         # Points per sample() (default: whole pool)
+            'method': 'sobol',          # 'uniform', 'sobol', 'halton', 'lhs'
+            'lower': (0.0, 0.0, 0.0),   # Domain bounds of (x, y, t)
+            'upper': (1.0, 1.0, 1.0),
+            'adaptive': 'rar',          # None, 'rar' or 'importance'
+            'candidates': 10000,        # Candidate points evaluated per refinement
+            'rar_points': 500,          # Points added per RAR refinement
+            'max_pool_size': 50000,
+            'importance_power': 1.0,
+            'importance_floor': 1.0,    # Keeps every point selectable
+            'residual_batch': 4096,     # Points per residual evaluation
+            'seed': None
+        }
+        if config:
+            self.config.update(config)
+        if self.config['method'] not in ('uniform', 'sobol', 'halton', 'lhs'):
+            raise ValueError(f"Unknown sampling method: {self.config['method']}")
+
+        self.rng = np.random.default_rng(self.config['seed'])
+        self.lower = np.asarray(self.config['lower'], dtype=np.float64)
+        self.upper = np.asarray(self.config['upper'], dtype=np.float64)
+        self.dim = len(self.lower)
+        self._engine = self._create_engine()
+        self.logger = logging.getLogger(__name__)
+
+        self.pool = self.generate(self.config['pool_size'])
+        self.weights: Optional[np.ndarray] = None
+        self.refinements = 0
+
+    def _create_engine(self) -> Optional[qmc.QMCEngine]:
+        method = self.config['method']
+        seed = self.rng.integers(2 ** 32)
+        if method == 'sobol':
+            return qmc.Sobol(d=self.dim, scramble=True, seed=seed)
+        if method == 'halton':
+            return qmc.Halton(d=self.dim, scramble=True, seed=seed)
+        if method == 'lhs':
+            return qmc.LatinHypercube(d=self.dim, seed=seed)
+        return None
+
+    def generate(self, n: int) -> np.ndarray:
+        """
+        New points from the configured sequence
+
+        Sobol and Halton engines continue their sequence across calls, so
+        successive draws stay low-discrepancy as a whole.
+        """
+        if n <= 0:
+            return np.empty((0, self.dim))
+        if self._engine is None:
+            unit = self.rng.random((n, self.dim))
+        else:
+            with warnings.catch_warnings():
+                # Sobol warns for draws that are not powers of two; the
+                # continued sequence is still low-discrepancy
+                warnings.simplefilter('ignore', UserWarning)
+                unit = self._engine.random(n)
+        return qmc.scale(unit, self.lower, self.upper)
+
+    def __len__(self) -> int:
+        return len(self.pool)
+
+    def reseed(self, seed: int):
+        """
+        Restart the batch and boundary draws from a new seed
+
+        DataLoader workers receive copies of the sampler; without reseeding
+        they would all draw the same points, and re-created workers would
+        repeat the previous epoch. The QMC engine is left alone, since
+        refinements run in the main process.
+        """
+        self.rng = np.random.default_rng(seed)
+
+    def sample_indices(self, n: Optional[int] = None) -> np.ndarray:
+        """Pool indices of one batch (importance-weighted when enabled)"""
+        n = n or self.config['batch_size']
+        if n is None or (n >= len(self.pool) and self.weights is None):
+            return np.arange(len(self.pool))
+        if self.weights is not None:
+            return self.rng.choice(len(self.pool), size=n, p=self.weights)
+        return self.rng.choice(len(self.pool), size=n, replace=False)
+
+    def sample(self, n: Optional[int] = None) -> np.ndarray:
+        """Collocation points of one batch"""
+        return self.pool[self.sample_indices(n)]
+
+    def sample_boundary(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Boundary points and prescribed values"""
+        return sample_boundary(n, self.rng)
+
+    def evaluate(self, residual_fn: Callable[[np.ndarray], np.ndarray],
+                 points: np.ndarray) -> np.ndarray:
+        """Absolute pointwise residual, evaluated in batches"""
+        batch = self.config['residual_batch']
+        return np.concatenate([
+            np.abs(np.asarray(residual_fn(points[i:i + batch]))).reshape(-1)
+            for i in range(0, len(points), batch)
+        ]) if len(points) else np.empty(0)
+
+    def refine(self, residual_fn: Callable[[np.ndarray], np.ndarray]) -> Dict[str, float]:
+        """
+        Adapt the pool to the current model
+
+        Args:
+            residual_fn: Maps points (M, 3) to pointwise residuals (M,)
+
+        Returns:
+            Residual statistics of the evaluated points
+        """
+        mode = self.config['adaptive']
+        if mode is None:
+            return {}
+
+        if mode == 'rar':
+            candidates = self.generate(self.config['candidates'])
+            residuals = self.evaluate(residual_fn, candidates)
+            room = self.config['max_pool_size'] - len(self.pool)
+            count = min(self.config['rar_points'], max(room, 0))
+            if count > 0:
+                top = np.argpartition(residuals, -count)[-count:]
+                self.pool = np.concatenate([self.pool, candidates[top]])
+        elif mode == 'importance':
+            residuals = self.evaluate(residual_fn, self.pool)
+            density = residuals ** self.config['importance_power']
+            density = density / max(density.mean(), 1e-12) + self.config['importance_floor']
+            self.weights = density / density.sum()
+        else:
+            raise ValueError(f"Unknown adaptive sampling mode: {mode}")
+
+        self.refinements += 1
+        stats = {
+            'residual_mean': float(residuals.mean()),
+            'residual_max': float(residuals.max()),
+            'pool_size': len(self.pool)
+        }
+        self.logger.info(f"Collocation refinement {self.refinements}: {stats}")
+        return stats
+
+    def state_dict(self) -> Dict:
+        return {
+            'pool': self.pool,
+            'weights': self.weights,
+            'refinements': self.refinements,
+            'rng': self.rng.bit_generator.state
+        }
+
+    def load_state_dict(self, state: Dict):
+        self.pool = np.asarray(state['pool'])
+        self.weights = None if state.get('weights') is None else np.asarray(state['weights'])
+        self.refinements = state.get('refinements', 0)
+        if 'rng' in state:
+            self.rng.bit_generator.state = state['rng']
@@ -43,6 +43,11 @@ class ModelConfig:
     device: str = "cuda"
     num_workers: int = 4
     pin_memory: bool = True
+    persistent_workers: bool = True
+    prefetch_factor: int = 2
+    
+    # Optimizer steps every N batches (gradient accumulation)
+    gradient_accumulation_steps: int = 1
 
 @dataclass
 class PINNConfig(ModelConfig):
@@ -57,6 +62,12 @@ class PINNConfig(ModelConfig):
     num_pde_points: int = 10000
     num_bc_points: int = 1000
     
+    # Collocation sampling
+    sampling_method: str = "sobol"  # uniform, sobol, halton, lhs
+    collocation_pool_size: int = 40000
+    adaptive_sampling: Optional[str] = "rar"  # None, rar, importance
+    refinement_interval: int = 5  # Epochs between refinements
+    
     # Loss weights
     pde_weight: float = 1.0
     bc_weight: float = 1.0
@@ -113,17 +124,22 @@ class DataConfig:
     # Preprocessing
     normalize: bool = True
     stats_file: Optional[Path] = None
+    preprocess_workers: int = 4
+    compression: str = "blosc"  # none, gzip, lzf, lz4, zstd, blosc
     
-    # Augmentation
+    # Augmentation (applied on the fly to whole batches)
     use_augmentation: bool = True
-    augmentation_factor: int = 2
+    augmentation_factor: int = 2  # Stored copies per sample (DataAugmentor only)
+    use_rotations: bool = True
+    max_rotation: float = 180.0  # Degrees
+    scale_range: Optional[tuple] = (0.8, 1.2)
     
     # Transforms
     crop_size: Optional[tuple] = None
     use_flips: bool = True
     
     # Cache settings
-    cache_size: int = 100
+    cache_mb: int = 256  # Sample cache shared by loader workers (0 disables)
     prefetch_factor: int = 2
 
 @dataclass
@@ -7,6 +7,14 @@ import logging
 from pathlib import Path
 import json
 
+try:
+    import hdf5plugin  # Filters of lz4/zstd/blosc-compressed preprocessed files
+except ImportError:
+    hdf5plugin = None
+
+from .collocation import CollocationSampler
+from .sample_cache import SharedSampleCache
+
 class FluidDataset(Dataset):
     """Base dataset class for fluid simulation data"""
     
@@ -14,8 +22,19 @@ class FluidDataset(Dataset):
         self,
         data_dir: Union[str, Path],
         split: str = 'train',
-        transform: Optional[callable] = None
+        transform: Optional[callable] = None,
+        cache: Optional[SharedSampleCache] = None,
+        cache_bytes: int = 256 * 2 ** 20
     ):
+        """
+        Args:
+            data_dir: Dataset directory
+            split: Dataset split
+            transform: Optional sample transform
+            cache: Sample cache, shareable between datasets
+            cache_bytes: Budget of the cache created when none is given
+                (0 disables caching)
+        """
         self.data_dir = Path(data_dir)
         self.split = split
         self.transform = transform
@@ -24,9 +43,10 @@ class FluidDataset(Dataset):
         # Load data index
         self.index = self._load_index()
         
-        # Initialize cache
-        self.cache = {}
-        self.cache_size = 100  # Number of samples to keep in memory
+        # Raw samples are cached in memory shared by all loader workers
+        if cache is None and cache_bytes > 0:
+            cache = SharedSampleCache({'capacity_bytes': cache_bytes})
+        self.cache = cache
 
     def _load_index(self) -> List[Dict]:
         """Load data index from JSON file"""
@@ -49,32 +69,32 @@ class FluidDataset(Dataset):
 
     def __getitem__(self, idx: int) -> Dict[str, np.ndarray]:
         """Get a data sample"""
-        if idx in self.cache:
-            return self.cache[idx]
+        sample = self.cache.get(idx) if self.cache is not None else None
+        if sample is None:
+            sample = self._load_sample(idx)
+            if self.cache is not None:
+                self.cache.put(idx, sample)
         
-        # Load data from file
+        # Transforms may be random, so they are applied after the cache
+        if self.transform is not None:
+            sample = self.transform(sample)
+        return sample
+
+    def _load_sample(self, idx: int) -> Dict[str, np.ndarray]:
+        """Load a sample from file"""
         sample_info = self.index[idx]
         data_path = self.data_dir / sample_info['file']
         
         with h5py.File(data_path, 'r') as f:
-            sample = {
+            return {
                 'velocity': f['velocity'][:],
                 'pressure': f['pressure'][:],
                 'vorticity': f['vorticity'][:]
             }
-        
-        # Apply transform if specified
-        if self.transform is not None:
-            sample = self.transform(sample)
-        
-        # Update cache
-        if len(self.cache) >= self.cache_size:
-            # Remove oldest item
-            oldest_key = next(iter(self.cache))
-            del self.cache[oldest_key]
-        
-        self.cache[idx] = sample
-        return sample
+
+    def cache_stats(self) -> Dict[str, float]:
+        """Hit/miss counters of the sample cache across all workers"""
+        return self.cache.stats() if self.cache is not None else {}
 
 class PINNDataset(FluidDataset):
     """Dataset for Physics-Informed Neural Networks"""
@@ -85,17 +105,41 @@ class PINNDataset(FluidDataset):
         split: str = 'train',
         num_pde_points: int = 10000,
         num_bc_points: int = 1000,
-        transform: Optional[callable] = None
+        transform: Optional[callable] = None,
+        sampler: Optional[CollocationSampler] = None,
+        sampler_config: Optional[Dict] = None,
+        cache: Optional[SharedSampleCache] = None,
+        cache_bytes: int = 256 * 2 ** 20
     ):
-        super().__init__(data_dir, split, transform)
+        """
+        Args:
+            data_dir: Dataset directory
+            split: Dataset split
+            num_pde_points: Collocation points per sample
+            num_bc_points: Boundary points per sample
+            transform: Optional sample transform
+            sampler: Shared collocation sampler; its point pool persists
+                across samples and epochs
+            sampler_config: Configuration of the sampler created when none
+                is given
+            cache: Sample cache, shareable between datasets
+            cache_bytes: Budget of the cache created when none is given
+        """
+        super().__init__(data_dir, split, transform, cache, cache_bytes)
         self.num_pde_points = num_pde_points
         self.num_bc_points = num_bc_points
+        
+        if sampler is None:
+            config = {'pool_size': num_pde_points * 4}
+            config.update(sampler_config or {})
+            sampler = CollocationSampler(config)
+        self.sampler = sampler
 
     def __getitem__(self, idx: int) -> Dict[str, torch.Tensor]:
         """Get a data sample with PDE points and boundary conditions"""
         sample = super().__getitem__(idx)
         
-        # Generate PDE collocation points
+        # Draw PDE collocation points from the persistent pool
         x_pde = self._generate_pde_points()
         
         # Generate boundary points
@@ -110,47 +154,19 @@ class PINNDataset(FluidDataset):
         }
 
     def _generate_pde_points(self) -> np.ndarray:
-        """Generate random points for PDE residual computation"""
-        # Generate points in [0,1]^3 space (x, y, t)
-        x_pde = np.random.rand(self.num_pde_points, 3)
-        return x_pde
+        """Collocation points (x, y, t) for PDE residual computation"""
+        return self.sampler.sample(self.num_pde_points)
+
+    def reseed(self, seed: int):
+        """Give this copy of the dataset its own collocation draws"""
+        self.sampler.reseed(seed)
 
     def _generate_boundary_points(
         self,
         sample: Dict[str, np.ndarray]
     ) -> Tuple[np.ndarray, np.ndarray]:
-        """Generate boundary condition points"""
-        # Initialize arrays
-        x_bc = np.zeros((self.num_bc_points, 3))
-        bc_values = np.zeros((self.num_bc_points, 3))  # u, v, p
-        
-        # Randomly sample boundary points
-        for i in range(self.num_bc_points):
-            # Randomly choose boundary type
-            boundary_type = np.random.choice(['wall', 'inlet', 'outlet'])
-            
-            if boundary_type == 'wall':
-                # No-slip boundary condition
-                y = np.random.rand()
-                t = np.random.rand()
-                x_bc[i] = [0.0, y, t]  # Wall at x=0
-                bc_values[i] = [0.0, 0.0, 0.0]  # Zero velocity
-                
-            elif boundary_type == 'inlet':
-                # Inlet flow condition
-                y = np.random.rand()
-                t = np.random.rand()
-                x_bc[i] = [0.0, y, t]
-                bc_values[i] = [1.0, 0.0, 0.0]  # Unit x-velocity
-                
-            else:  # outlet
-                # Zero pressure gradient
-                y = np.random.rand()
-                t = np.random.rand()
-                x_bc[i] = [1.0, y, t]
-                bc_values[i] = [0.0, 0.0, 0.0]  # To be handled in loss function
-        
-        return x_bc, bc_values
+        """Generate boundary condition points (wall, inlet and outlet)"""
+        return self.sampler.sample_boundary(self.num_bc_points)
 
 class MeshDataset(FluidDataset):
     """Dataset for mesh optimization"""
@@ -196,19 +212,110 @@ class AnomalyDataset(FluidDataset):
             'anomaly_mask': torch.FloatTensor(anomaly_mask) if anomaly_mask is not None else None
         }
 
+# Point sets that are concatenated into one set per batch instead of stacked
+CONCAT_KEYS = ('x_pde', 'x_bc', 'bc_values')
+
+def collate_batch(samples: List[Dict]) -> Dict[str, Optional[Union[torch.Tensor, List]]]:
+    """
+    Collate samples into preallocated batch tensors
+    
+    Each batch tensor is allocated once (in shared memory inside loader
+    workers, so it reaches the main process without a copy) and filled in
+    place. Point sets in CONCAT_KEYS are concatenated along their first
+    axis, since PINN losses treat all points of a batch alike; other arrays
+    are stacked. Keys with mixed shapes or missing values stay lists.
+    """
+    in_worker = torch.utils.data.get_worker_info() is not None
+    batch = {}
+    for key in samples[0]:
+        values = [sample[key] for sample in samples]
+        if all(value is None for value in values):
+            batch[key] = None
+            continue
+        if any(value is None for value in values):
+            batch[key] = values
+            continue
+        
+        tensors = [torch.as_tensor(value) for value in values]
+        first = tensors[0]
+        if key in CONCAT_KEYS:
+            shape = (sum(len(t) for t in tensors),) + tuple(first.shape[1:])
+        elif all(t.shape == first.shape for t in tensors):
+            shape = (len(tensors),) + tuple(first.shape)
+        else:
+            batch[key] = tensors
+            continue
+        
+        out = torch.empty(shape, dtype=first.dtype)
+        if in_worker:
+            out.share_memory_()
+        if key in CONCAT_KEYS:
+            offset = 0
+            for t in tensors:
+                out[offset:offset + len(t)].copy_(t)
+                offset += len(t)
+        else:
+            for i, t in enumerate(tensors):
+                out[i].copy_(t)
+        batch[key] = out
+    return batch
+
+def seed_worker(worker_id: int):
+    """Seed numpy and the dataset's own generators in loader workers"""
+    # Otherwise forked workers share the parent's numpy state and draw the
+    # same per-sample transforms
+    np.random.seed(torch.initial_seed() % 2 ** 32)
+    # The worker seed differs per worker and per epoch (unless persistent)
+    info = torch.utils.data.get_worker_info()
+    reseed = getattr(info.dataset, 'reseed', None)
+    if callable(reseed):
+        reseed(info.seed)
+
 def create_dataloader(
     dataset: Dataset,
     batch_size: int = 16,
     shuffle: bool = True,
-    num_workers: int = 4
+    num_workers: int = 4,
+    persistent_workers: bool = True,
+    prefetch_factor: Optional[int] = 2,
+    pin_memory: Optional[bool] = None,
+    drop_last: bool = False,
+    seed: Optional[int] = None
 ) -> DataLoader:
-    """Create a DataLoader for the dataset"""
+    """
+    Create a DataLoader for the dataset
+    
+    Args:
+        dataset: Map-style dataset (a list of sample dicts also works)
+        batch_size: Samples per batch
+        shuffle: Reshuffle every epoch
+        num_workers: Loader processes (0 loads in the main process)
+        persistent_workers: Keep workers alive between epochs
+        prefetch_factor: Batches loaded in advance per worker
+        pin_memory: Page-locked batches for faster host-to-GPU copies
+            (default: when CUDA is available; ignored without CUDA)
+        drop_last: Drop the last incomplete batch
+        seed: Seed of the shuffle order and worker seeds (reproducible runs)
+    """
+    pin_memory = pin_memory is not False and torch.cuda.is_available()
+    worker_options = {}
+    if num_workers > 0:
+        # Only valid with worker processes
+        worker_options = {
+            'persistent_workers': persistent_workers,
+            'prefetch_factor': prefetch_factor
+        }
     return DataLoader(
         dataset,
         batch_size=batch_size,
         shuffle=shuffle,
         num_workers=num_workers,
-        pin_memory=True
+        collate_fn=collate_batch,
+        pin_memory=pin_memory,
+        drop_last=drop_last,
+        worker_init_fn=seed_worker,
+        generator=torch.Generator().manual_seed(seed) if seed is not None else None,
+        **worker_options
     )
 
 class DataTransform:
@@ -287,10 +394,13 @@ class RandomFlip(DataTransform):
             flipped = {}
             for key, value in sample.items():
                 if isinstance(value, np.ndarray):
-                    flipped[key] = np.flip(value, axis=1)
+                    flipped[key] = np.flip(value, axis=1).copy()
                     if key == 'velocity' and value.ndim == 3:
                         # Flip x-component of velocity
                         flipped[key][..., 0] *= -1
+                    elif key == 'vorticity':
+                        # Reflections reverse the sense of rotation
+                        flipped[key] = -flipped[key]
             sample = flipped
         
         # Vertical flip
@@ -298,10 +408,12 @@ class RandomFlip(DataTransform):
             flipped = {}
             for key, value in sample.items():
                 if isinstance(value, np.ndarray):
-                    flipped[key] = np.flip(value, axis=0)
+                    flipped[key] = np.flip(value, axis=0).copy()
                     if key == 'velocity' and value.ndim == 3:
                         # Flip y-component of velocity
                         flipped[key][..., 1] *= -1
+                    elif key == 'vorticity':
+                        flipped[key] = -flipped[key]
             sample = flipped
         
         return sample
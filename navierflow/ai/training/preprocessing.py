@@ -2,22 +2,186 @@ import numpy as np
 from typing import Dict, List, Optional, Tuple, Union
 import h5py
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import json
 import logging
+import os
 from sklearn.model_selection import train_test_split
 from tqdm import tqdm
 
+try:
+    import hdf5plugin  # Registers the lz4, zstd and blosc HDF5 filters
+except ImportError:
+    hdf5plugin = None
+
+STAT_FIELDS = ('velocity', 'pressure', 'vorticity')
+OPTIONAL_FIELDS = ('refinement_mask', 'cell_sizes', 'anomaly_mask')
+COMPRESSORS = ('none', 'gzip', 'lzf', 'lz4', 'zstd', 'blosc')
+
+def compression_options(name: str, level: Optional[int] = None) -> Dict:
+    """
+    h5py dataset options of an output compressor
+    
+    Args:
+        name: One of COMPRESSORS; lz4, zstd and blosc need hdf5plugin
+        level: Compression level (compressor default when omitted)
+    """
+    if name not in COMPRESSORS:
+        raise ValueError(f"Unknown compressor: {name}")
+    if name == 'none':
+        return {}
+    if name == 'gzip':
+        return {'compression': 'gzip', 'compression_opts': 4 if level is None else level}
+    if name == 'lzf':
+        return {'compression': 'lzf'}
+    if hdf5plugin is None:
+        logging.warning(f"hdf5plugin not available for {name} compression. Falling back to lzf.")
+        return {'compression': 'lzf'}
+    if name == 'lz4':
+        return dict(hdf5plugin.LZ4())
+    if name == 'zstd':
+        return dict(hdf5plugin.Zstd(clevel=3 if level is None else level))
+    return dict(hdf5plugin.Blosc(
+        cname='lz4', clevel=5 if level is None else level, shuffle=hdf5plugin.Blosc.SHUFFLE
+    ))
+
+class RunningMoments:
+    """
+    Per-component count, mean and sum of squared deviations (M2).
+    
+    Chunks and partial results of other workers are combined with the
+    parallel update of Chan et al., which is exact for any split of the
+    data and numerically stable.
+    """
+    def __init__(self, count: int = 0, mean=None, m2=None):
+        self.count = count
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float64)
+        self.m2 = None if m2 is None else np.asarray(m2, dtype=np.float64)
+
+    def update(self, values: np.ndarray):
+        """Add samples (N, components)"""
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        mean = values.mean(axis=0)
+        self.merge(RunningMoments(len(values), mean, ((values - mean) ** 2).sum(axis=0)))
+
+    def merge(self, other: 'RunningMoments'):
+        """Combine with moments of disjoint data"""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean.copy(), other.m2.copy()
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.count / count
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+
+    @property
+    def std(self) -> Optional[np.ndarray]:
+        """Population standard deviation"""
+        return None if self.count == 0 else np.sqrt(self.m2 / self.count)
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'mean': None if self.mean is None else self.mean.tolist(),
+            'm2': None if self.m2 is None else self.m2.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'RunningMoments':
+        return cls(state['count'], state['mean'], state['m2'])
+
+def _process_file(
+    file: Path,
+    output_file: Path,
+    compression: Dict,
+    chunk_bytes: int
+) -> Optional[Tuple[Dict, Dict[str, Dict]]]:
+    """
+    Copy the fields of one simulation file in slabs and compute their moments
+    
+    Runs in pool workers. The output is written to a temporary file and
+    renamed once complete, so an interrupted run never leaves a partial
+    output behind.
+    
+    Returns:
+        Index entry and moments per statistics field, or None on failure
+    """
+    tmp_file = output_file.with_name(output_file.name + '.tmp')
+    try:
+        moments = {}
+        shapes = {}
+        with h5py.File(file, 'r') as src, h5py.File(tmp_file, 'w') as dst:
+            fields = list(STAT_FIELDS) + [f for f in OPTIONAL_FIELDS if f in src]
+            for key in fields:
+                source = src[key]
+                shapes[key] = source.shape
+                if source.ndim == 0:
+                    dst.create_dataset(key, data=source[()])
+                    continue
+                target = dst.create_dataset(
+                    key, shape=source.shape, dtype=source.dtype, chunks=True, **compression
+                )
+                
+                # Slabs along the first axis bound the memory of large fields
+                row_bytes = max(source.dtype.itemsize * int(np.prod(source.shape[1:])), 1)
+                rows = max(1, chunk_bytes // row_bytes)
+                stats = RunningMoments() if key in STAT_FIELDS else None
+                for start in range(0, source.shape[0], rows):
+                    slab = source[start:start + rows]
+                    target[start:start + rows] = slab
+                    if stats is not None:
+                        components = slab.shape[-1] if source.ndim > 2 else 1
+                        stats.update(slab.reshape(-1, components))
+                if stats is not None:
+                    moments[key] = stats.to_dict()
+        os.replace(tmp_file, output_file)
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Error processing {file}: {str(e)}")
+        if tmp_file.exists():
+            tmp_file.unlink()
+        return None
+    
+    entry = {
+        'file': output_file.name,
+        'original_file': str(file),
+        'shape': shapes
+    }
+    return entry, moments
+
 class DataPreprocessor:
-    """Preprocessor for fluid simulation data"""
+    """
+    Preprocessor for fluid simulation data.
     
+    Files are processed by a pool of worker processes, each streaming its
+    fields in slabs and returning partial statistics that are merged in the
+    main process. Completed files are recorded in a manifest, so an
+    interrupted run resumes where it stopped.
+    """
+
     def __init__(
         self,
         data_dir: Union[str, Path],
         output_dir: Union[str, Path],
         val_split: float = 0.1,
         test_split: float = 0.1,
-        seed: int = 42
+        seed: int = 42,
+        config: Optional[Dict] = None
     ):
+        """
+        Args:
+            data_dir: Directory of simulation .h5 files
+            output_dir: Directory of processed files, indices and statistics
+            val_split: Validation fraction
+            test_split: Test fraction
+            seed: Seed of the split
+            config: Processing options (num_workers, compression,
+                compression_level, chunk_bytes, resume)
+        """
         self.data_dir = Path(data_dir)
         self.output_dir = Path(output_dir)
         self.val_split = val_split
@@ -25,20 +189,27 @@ class DataPreprocessor:
         self.seed = seed
         self.logger = logging.getLogger(__name__)
         
+        self.config = {
+            'num_workers': os.cpu_count() or 1,   # 0 processes files in this process
+            'compression': 'blosc',
+            'compression_level': None,
+            'chunk_bytes': 64 * 2 ** 20,          # Slab size for reading fields
+            'resume': True
+        }
+        if config:
+            self.config.update(config)
+        
         # Create output directory
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.output_dir / 'manifest.json'
         
         # Initialize statistics
-        self.stats = {
-            'velocity': {'mean': None, 'std': None},
-            'pressure': {'mean': None, 'std': None},
-            'vorticity': {'mean': None, 'std': None}
-        }
+        self.stats = {key: RunningMoments() for key in STAT_FIELDS}
 
     def process_dataset(self):
         """Process the entire dataset"""
-        # Find all data files
-        data_files = list(self.data_dir.glob('*.h5'))
+        # Find all data files; sorted so the seeded split is reproducible
+        data_files = sorted(self.data_dir.glob('*.h5'))
         self.logger.info(f"Found {len(data_files)} data files")
         
         # Split data into train/val/test
@@ -54,15 +225,23 @@ class DataPreprocessor:
             random_state=self.seed
         )
         
+        manifest = self._load_manifest()
+        
         # Process each split
         self.logger.info("Processing training data...")
-        train_index = self._process_split(train_files, 'train')
+        train_index = self._process_split(train_files, 'train', manifest)
         
         self.logger.info("Processing validation data...")
-        val_index = self._process_split(val_files, 'val')
+        val_index = self._process_split(val_files, 'val', manifest)
         
         self.logger.info("Processing test data...")
-        test_index = self._process_split(test_files, 'test')
+        test_index = self._process_split(test_files, 'test', manifest)
+        
+        # Merge the per-file statistics, including files of resumed runs
+        for index in (train_index, val_index, test_index):
+            for entry in index:
+                for key, state in manifest['files'][entry['file']]['stats'].items():
+                    self.stats[key].merge(RunningMoments.from_dict(state))
         
         # Save data splits
         self._save_splits(train_index, val_index, test_index)
@@ -70,100 +249,68 @@ class DataPreprocessor:
         # Save statistics
         self._save_statistics()
 
+    def _load_manifest(self) -> Dict:
+        """Manifest of completed files (empty unless resuming)"""
+        manifest = {'files': {}}
+        if self.config['resume'] and self.manifest_path.exists():
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+            # Outputs removed since the interrupted run are processed again
+            manifest['files'] = {
+                name: record for name, record in manifest['files'].items()
+                if (self.output_dir / name).exists()
+            }
+            self.logger.info(f"Resuming: {len(manifest['files'])} files already processed")
+        return manifest
+
+    def _save_manifest(self, manifest: Dict):
+        """Atomically write the manifest"""
+        tmp_path = self.manifest_path.with_name(self.manifest_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
     def _process_split(
         self,
         files: List[Path],
-        split: str
+        split: str,
+        manifest: Dict
     ) -> List[Dict]:
         """Process files for a data split"""
-        index = []
+        outputs = [self.output_dir / f"{split}_{file.stem}.h5" for file in files]
+        compression = compression_options(
+            self.config['compression'], self.config['compression_level']
+        )
+        tasks = [
+            (file, output, compression, self.config['chunk_bytes'])
+            for file, output in zip(files, outputs)
+            if output.name not in manifest['files']
+        ]
+        if len(tasks) < len(files):
+            self.logger.info(f"Skipping {len(files) - len(tasks)} completed {split} files")
+
+        def record(result):
+            # The manifest is updated after every file, so an interruption
+            # loses at most the files in flight
+            if result is not None:
+                entry, moments = result
+                manifest['files'][entry['file']] = {'entry': entry, 'stats': moments}
+                self._save_manifest(manifest)
         
-        for file in tqdm(files):
-            # Load and process file
-            processed = self._process_file(file)
-            
-            if processed is not None:
-                # Save processed data
-                output_file = self.output_dir / f"{split}_{file.stem}.h5"
-                self._save_processed_data(processed, output_file)
-                
-                # Update index
-                index.append({
-                    'file': output_file.name,
-                    'original_file': str(file),
-                    'shape': {
-                        key: value.shape
-                        for key, value in processed.items()
-                        if isinstance(value, np.ndarray)
-                    }
-                })
+        if self.config['num_workers'] > 0 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=self.config['num_workers']) as executor:
+                futures = [executor.submit(_process_file, *task) for task in tasks]
+                for future in tqdm(as_completed(futures), total=len(futures)):
+                    record(future.result())
+        else:
+            for task in tqdm(tasks):
+                record(_process_file(*task))
         
-        return index
-
-    def _process_file(self, file: Path) -> Optional[Dict[str, np.ndarray]]:
-        """Process a single data file"""
-        try:
-            with h5py.File(file, 'r') as f:
-                data = {
-                    'velocity': f['velocity'][:],
-                    'pressure': f['pressure'][:],
-                    'vorticity': f['vorticity'][:]
-                }
-                
-                # Load optional fields if available
-                for field in ['refinement_mask', 'cell_sizes', 'anomaly_mask']:
-                    if field in f:
-                        data[field] = f[field][:]
-                
-                # Update statistics
-                self._update_statistics(data)
-                
-                return data
-                
-        except Exception as e:
-            self.logger.warning(f"Error processing {file}: {str(e)}")
-            return None
-
-    def _update_statistics(self, data: Dict[str, np.ndarray]):
-        """Update running statistics"""
-        for key in ['velocity', 'pressure', 'vorticity']:
-            if key in data:
-                values = data[key].reshape(-1, data[key].shape[-1] if data[key].ndim > 2 else 1)
-                
-                # Update mean
-                if self.stats[key]['mean'] is None:
-                    self.stats[key]['mean'] = values.mean(axis=0)
-                    self.stats[key]['std'] = values.std(axis=0)
-                else:
-                    # Online mean and variance updates
-                    n = len(self.stats[key]['mean'])
-                    m = len(values)
-                    
-                    # Update mean
-                    delta = values.mean(axis=0) - self.stats[key]['mean']
-                    self.stats[key]['mean'] += delta * m / (n + m)
-                    
-                    # Update std
-                    old_ssd = self.stats[key]['std'] ** 2 * n
-                    new_ssd = values.std(axis=0) ** 2 * m
-                    combined_ssd = old_ssd + new_ssd + \
-                        (delta ** 2) * n * m / (n + m)
-                    self.stats[key]['std'] = np.sqrt(combined_ssd / (n + m))
-
-    def _save_processed_data(
-        self,
-        data: Dict[str, np.ndarray],
-        output_file: Path
-    ):
-        """Save processed data to file"""
-        with h5py.File(output_file, 'w') as f:
-            for key, value in data.items():
-                f.create_dataset(
-                    key,
-                    data=value,
-                    compression='gzip',
-                    compression_opts=9
-                )
+        # Index in file order, independent of completion order
+        return [
+            manifest['files'][output.name]['entry']
+            for output in outputs if output.name in manifest['files']
+        ]
 
     def _save_splits(
         self,
@@ -192,15 +339,21 @@ class DataPreprocessor:
         stats_file = self.output_dir / 'statistics.npz'
         
         save_dict = {}
-        for key in self.stats:
-            save_dict[f'{key}_mean'] = self.stats[key]['mean']
-            save_dict[f'{key}_std'] = self.stats[key]['std']
+        for key, moments in self.stats.items():
+            if moments.count:
+                save_dict[f'{key}_mean'] = moments.mean
+                save_dict[f'{key}_std'] = moments.std
         
         np.savez(stats_file, **save_dict)
         self.logger.info(f"Saved dataset statistics to {stats_file}")
 
 class DataAugmentor:
-    """Data augmentation for fluid simulation data"""
+    """
+    Data augmentation for fluid simulation data, stored as extra files.
+    
+    Training augments on the fly with augmentation.BatchAugmentor instead;
+    this class is kept for exporting augmented datasets.
+    """
     
     def __init__(
         self,
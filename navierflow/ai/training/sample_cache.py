@@ -0,0 +1,186 @@
+import multiprocessing
+import os
+import pickle
+import tempfile
+import weakref
+from typing import Any, Dict, Optional
+import numpy as np
+
+# Header counters of the cache file
+_CLOCK, _HITS, _MISSES, _EVICTIONS, _BYTES_USED, _ENTRIES = range(6)
+_HEADER_SIZE = 8
+
+_SLOT = np.dtype([
+    ('key', np.int64),          # -1 marks a free slot
+    ('offset', np.int64),
+    ('nbytes', np.int64),
+    ('last_used', np.int64)
+])
+
+def _remove(path: str, pid: int):
+    # Only the creating process removes the file; forked workers inherit
+    # the finalizer but must not delete a cache that is still in use
+    if os.getpid() == pid and os.path.exists(path):
+        os.unlink(path)
+
+class SharedSampleCache:
+    """
+    Sample cache shared by all DataLoader worker processes.
+
+    Samples are pickled into one memory-mapped file (in /dev/shm where
+    available), which holds a header with the hit/miss counters, a slot
+    table and a byte arena. Every worker maps the same file, so a sample
+    loaded by one worker is a hit for all others and memory is not
+    multiplied by the worker count. Eviction is least-recently-used and
+    bounded by a byte budget; the slot table only caps the number of
+    entries. The cache is passed to workers by pickling, which transfers
+    the file path and the lock.
+    """
+    def __init__(self, config: Dict = None):
+        self.config = {
+            'capacity_bytes': 256 * 2 ** 20,
+            'max_entries': 4096,
+            'directory': '/dev/shm' if os.path.isdir('/dev/shm') else None
+        }
+        if config:
+            self.config.update(config)
+
+        fd, self.path = tempfile.mkstemp(prefix='navierflow-cache-', dir=self.config['directory'])
+        os.ftruncate(fd, self._file_size())
+        os.close(fd)
+        self._finalizer = weakref.finalize(self, _remove, self.path, os.getpid())
+        # A spawn-context lock can be inherited by forked workers as well as
+        # pickled to spawned ones
+        self._lock = multiprocessing.get_context('spawn').Lock()
+        self._map()
+        self._table['key'] = -1
+
+    def _file_size(self) -> int:
+        return (_HEADER_SIZE * 8 + self.config['max_entries'] * _SLOT.itemsize
+                + self.config['capacity_bytes'])
+
+    def _map(self):
+        max_entries = self.config['max_entries']
+        self._header = np.memmap(self.path, dtype=np.int64, mode='r+', shape=(_HEADER_SIZE,))
+        self._table = np.memmap(self.path, dtype=_SLOT, mode='r+', offset=_HEADER_SIZE * 8,
+                                shape=(max_entries,))
+        self._arena = np.memmap(self.path, dtype=np.uint8, mode='r+',
+                                offset=_HEADER_SIZE * 8 + max_entries * _SLOT.itemsize,
+                                shape=(self.config['capacity_bytes'],))
+
+    def __getstate__(self) -> Dict:
+        return {'config': self.config, 'path': self.path, 'lock': self._lock}
+
+    def __setstate__(self, state: Dict):
+        self.config = state['config']
+        self.path = state['path']
+        self._lock = state['lock']
+        self._finalizer = None
+        self._map()
+
+    def _find(self, key: int) -> Optional[int]:
+        slots = np.flatnonzero(self._table['key'] == key)
+        return int(slots[0]) if len(slots) else None
+
+    def _touch(self, slot: int):
+        self._header[_CLOCK] += 1
+        self._table['last_used'][slot] = self._header[_CLOCK]
+
+    def get(self, key: int) -> Optional[Any]:
+        """Cached sample, or None on a miss"""
+        with self._lock:
+            slot = self._find(key)
+            if slot is None:
+                self._header[_MISSES] += 1
+                return None
+            offset, nbytes = int(self._table['offset'][slot]), int(self._table['nbytes'][slot])
+            data = self._arena[offset:offset + nbytes].tobytes()
+            self._touch(slot)
+            self._header[_HITS] += 1
+        return pickle.loads(data)
+
+    def put(self, key: int, sample: Any) -> bool:
+        """
+        Store a sample, evicting least recently used ones as needed
+
+        Returns:
+            Whether the sample was stored (it may exceed the whole budget)
+        """
+        data = np.frombuffer(pickle.dumps(sample, protocol=pickle.HIGHEST_PROTOCOL), dtype=np.uint8)
+        if len(data) > self.config['capacity_bytes']:
+            return False
+
+        with self._lock:
+            slot = self._find(key)
+            if slot is not None:
+                self._touch(slot)
+                return True
+            while True:
+                free = np.flatnonzero(self._table['key'] < 0)
+                offset = self._find_gap(len(data)) if len(free) else None
+                if offset is not None:
+                    break
+                self._evict_lru()
+
+            slot = int(free[0])
+            self._arena[offset:offset + len(data)] = data
+            self._table['key'][slot] = key
+            self._table['offset'][slot] = offset
+            self._table['nbytes'][slot] = len(data)
+            self._touch(slot)
+            self._header[_BYTES_USED] += len(data)
+            self._header[_ENTRIES] += 1
+        return True
+
+    def _find_gap(self, nbytes: int) -> Optional[int]:
+        # First fit between the used extents, sorted by offset
+        used = self._table[self._table['key'] >= 0]
+        used = used[np.argsort(used['offset'])]
+        position = 0
+        for offset, size in zip(used['offset'], used['nbytes']):
+            if offset - position >= nbytes:
+                return position
+            position = int(offset + size)
+        if self.config['capacity_bytes'] - position >= nbytes:
+            return position
+        return None
+
+    def _evict_lru(self):
+        valid = np.flatnonzero(self._table['key'] >= 0)
+        slot = valid[np.argmin(self._table['last_used'][valid])]
+        self._header[_BYTES_USED] -= self._table['nbytes'][slot]
+        self._header[_ENTRIES] -= 1
+        self._header[_EVICTIONS] += 1
+        self._table['key'][slot] = -1
+
+    def __contains__(self, key: int) -> bool:
+        with self._lock:
+            return self._find(key) is not None
+
+    def __len__(self) -> int:
+        return int(self._header[_ENTRIES])
+
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        with self._lock:
+            self._table['key'] = -1
+            self._header[:] = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Counters of all processes, for sizing the budget"""
+        with self._lock:
+            hits, misses = int(self._header[_HITS]), int(self._header[_MISSES])
+            return {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': hits / max(hits + misses, 1),
+                'evictions': int(self._header[_EVICTIONS]),
+                'entries': int(self._header[_ENTRIES]),
+                'bytes_used': int(self._header[_BYTES_USED]),
+                'capacity_bytes': self.config['capacity_bytes']
+            }
+
+    def close(self):
+        """Remove the cache file (creating process only)"""
+        if self._finalizer is not None:
+            self._finalizer()
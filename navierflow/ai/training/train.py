@@ -7,12 +7,12 @@ import wandb
 from typing import Dict, Optional
 
 from .config import ConfigManager, TrainingConfig
+from .augmentation import BatchAugmentor
 from .data_loader import (
     PINNDataset, MeshDataset, AnomalyDataset,
-    create_dataloader, Normalize, RandomCrop, RandomFlip,
-    ComposeTransforms
+    create_dataloader
 )
-from .preprocessing import DataPreprocessor, DataAugmentor
+from .preprocessing import DataPreprocessor
 from .metrics import PINNMetrics, MeshMetrics, AnomalyMetrics
 from .trainer import ModelTrainer
 
@@ -40,39 +40,26 @@ def prepare_data(config: TrainingConfig) -> Dict[str, torch.utils.data.DataLoade
             data_dir=config.data.data_dir,
             output_dir=config.data.output_dir,
             val_split=config.data.val_split,
-            test_split=config.data.test_split
+            test_split=config.data.test_split,
+            config={
+                'num_workers': config.data.preprocess_workers,
+                'compression': config.data.compression
+            }
         )
         preprocessor.process_dataset()
     
-    # Augment data if enabled
-    if config.data.use_augmentation:
-        logger.info("Augmenting dataset...")
-        augmentor = DataAugmentor(
-            input_dir=config.data.output_dir,
-            output_dir=config.data.output_dir,
-            augmentation_factor=config.data.augmentation_factor
-        )
-        augmentor.augment_dataset()
-    
-    # Create transforms
-    transforms = []
-    if config.data.normalize:
-        transforms.append(
-            Normalize(config.data.output_dir / 'statistics.npz')
-        )
-    if config.data.crop_size:
-        transforms.append(RandomCrop(config.data.crop_size))
-    if config.data.use_flips:
-        transforms.append(RandomFlip())
-    
-    transform = ComposeTransforms(transforms) if transforms else None
-    
     # Create datasets based on model type
     if config.model.model_type == "pinn":
         dataset_class = PINNDataset
         dataset_params = {
             'num_pde_points': config.model.num_pde_points,
-            'num_bc_points': config.model.num_bc_points
+            'num_bc_points': config.model.num_bc_points,
+            'sampler_config': {
+                'method': config.model.sampling_method,
+                'pool_size': config.model.collocation_pool_size,
+                'adaptive': config.model.adaptive_sampling,
+                'seed': config.seed
+            }
         }
     elif config.model.model_type == "mesh_optimizer":
         dataset_class = MeshDataset
@@ -81,13 +68,20 @@ def prepare_data(config: TrainingConfig) -> Dict[str, torch.utils.data.DataLoade
         dataset_class = AnomalyDataset
         dataset_params = {}
     
-    # Create data loaders
+    # Create data loaders. Samples are loaded untransformed: augmentation
+    # and normalization run on whole batches in the trainer (see
+    # create_augmentor), so no augmented copies are stored. Adaptive
+    # collocation refines the sampler pool in the main process, so PINN
+    # workers are re-created each epoch to see it
+    persistent_workers = config.model.persistent_workers and not (
+        config.model.model_type == "pinn" and config.model.adaptive_sampling
+    )
     dataloaders = {}
     for split in ['train', 'val', 'test']:
         dataset = dataset_class(
             data_dir=config.data.output_dir,
             split=split,
-            transform=transform,
+            cache_bytes=config.data.cache_mb * 2 ** 20,
             **dataset_params
         )
         
@@ -95,11 +89,32 @@ def prepare_data(config: TrainingConfig) -> Dict[str, torch.utils.data.DataLoade
             dataset,
             batch_size=config.model.batch_size,
             shuffle=(split == 'train'),
-            num_workers=config.model.num_workers
+            num_workers=config.model.num_workers,
+            persistent_workers=persistent_workers,
+            prefetch_factor=config.model.prefetch_factor,
+            pin_memory=config.model.pin_memory,
+            seed=config.seed
         )
     
     return dataloaders
 
+def create_augmentor(config: TrainingConfig) -> Optional[BatchAugmentor]:
+    """Batched augmentation and normalization from the data configuration"""
+    augment = config.data.use_augmentation
+    if not (augment or config.data.normalize or config.data.crop_size):
+        return None
+    return BatchAugmentor({
+        'rotation': augment and config.data.use_rotations,
+        'max_angle': config.data.max_rotation,
+        'flips': augment and config.data.use_flips,
+        'scale_range': config.data.scale_range if augment else None,
+        'crop_size': config.data.crop_size,
+        'stats_file': (
+            config.data.stats_file or config.data.output_dir / 'statistics.npz'
+        ) if config.data.normalize else None,
+        'seed': config.seed
+    })
+
 def train_model(
     config: TrainingConfig,
     dataloaders: Dict[str, torch.utils.data.DataLoader]
@@ -115,9 +130,14 @@ def train_model(
         use_wandb=config.use_wandb
     )
     
+    trainer.augmentor = create_augmentor(config)
+    
     # Initialize metrics
     if config.model.model_type == "pinn":
         metrics = PINNMetrics()
+        # Refinements update the training pool; loader workers are
+        # re-created each epoch and pick up the refined pool
+        trainer.collocation_sampler = dataloaders['train'].dataset.sampler
     elif config.model.model_type == "mesh_optimizer":
         metrics = MeshMetrics()
     else:  # anomaly_detector
@@ -1,7 +1,9 @@
 import torch
 import numpy as np
+from torch.utils.data import DataLoader
 from typing import Dict, List, Optional, Tuple, Union
 import logging
+import time
 import wandb
 from datetime import datetime
 from pathlib import Path
@@ -10,6 +12,7 @@ import json
 from ..models.pinn import FluidPINN
 from ..models.mesh_optimizer import MeshOptimizer
 from ..models.anomaly_detector import AnomalyDetector
+from .data_loader import CONCAT_KEYS, create_dataloader
 
 class ModelTrainer:
     """Trainer for NavierFlow AI models"""
@@ -29,6 +32,17 @@ class ModelTrainer:
         
         # Initialize model
         self.model = self._create_model()
+        device = self.config.get('device', 'cpu')
+        self.device = torch.device(device if torch.cuda.is_available() else 'cpu')
+        if self.model_type == "pinn":
+            self.model.to(self.device)
+        
+        # Adaptive collocation sampler of the PINN training set, if any
+        self.collocation_sampler = None
+        
+        # Batched field augmentation and normalization, if any
+        self.augmentor = None
+        self.current_epoch = 0
         
         # Training metrics
         self.metrics = {
@@ -68,26 +82,53 @@ class ModelTrainer:
 
     def train(
         self,
-        train_data: List[Dict[str, np.ndarray]],
-        val_data: Optional[List[Dict[str, np.ndarray]]] = None,
+        train_data: Union[DataLoader, List[Dict[str, np.ndarray]]],
+        val_data: Optional[Union[DataLoader, List[Dict[str, np.ndarray]]]] = None,
         num_epochs: int = 100,
         batch_size: int = 16,
         checkpoint_dir: str = "checkpoints",
         save_best: bool = True
     ):
-        """Train the model"""
+        """
+        Train the model
+        
+        Args:
+            train_data: Training DataLoader, or a list of samples that is
+                wrapped in one using the loader settings of the config
+                (num_workers, persistent_workers, prefetch_factor)
+            val_data: Optional validation DataLoader or list of samples
+            num_epochs: Number of epochs
+            batch_size: Batch size when wrapping sample lists
+            checkpoint_dir: Directory for checkpoints and history
+            save_best: Keep the checkpoint with the best validation loss
+        """
         # Create checkpoint directory
         checkpoint_dir = Path(checkpoint_dir)
         checkpoint_dir.mkdir(parents=True, exist_ok=True)
         
+        train_loader = self._make_loader(train_data, batch_size, shuffle=True)
+        val_loader = (
+            self._make_loader(val_data, batch_size, shuffle=False)
+            if val_data is not None else None
+        )
+        if (self.collocation_sampler is not None and self.config.get('refinement_interval')
+                and getattr(train_loader, 'persistent_workers', False)):
+            self.logger.warning(
+                "Persistent loader workers keep their own copy of the collocation pool; "
+                "refinements only reach workers that are re-created each epoch."
+            )
+        
         # Training loop
         for epoch in range(num_epochs):
+            # Seeds the augmentation of this epoch, continuing after resumes
+            self.current_epoch = self.metrics['epochs_trained'] + epoch
+            
             # Training step
-            train_metrics = self._train_epoch(train_data, batch_size)
+            train_metrics = self._train_epoch(train_loader)
             
             # Validation step
-            if val_data is not None:
-                val_metrics = self._validate(val_data, batch_size)
+            if val_loader is not None:
+                val_metrics = self._validate(val_loader)
             else:
                 val_metrics = {}
             
@@ -101,6 +142,12 @@ class ModelTrainer:
                     self.metrics['best_val_loss'] = val_metrics['loss']
                     self.save_checkpoint(checkpoint_dir / "best_model.pt")
             
+            # Adapt PINN collocation points to the current residual
+            interval = self.config.get('refinement_interval', 0)
+            if (self.collocation_sampler is not None and interval
+                    and (epoch + 1) % interval == 0):
+                train_metrics.update(self.collocation_sampler.refine(self._pde_residual))
+            
             # Log metrics
             self._log_metrics(epoch + 1, train_metrics, val_metrics)
             
@@ -118,99 +165,144 @@ class ModelTrainer:
         # Save training history
         self.save_history(checkpoint_dir / "training_history.json")
 
-    def _train_epoch(
+    def _make_loader(
         self,
-        train_data: List[Dict[str, np.ndarray]],
-        batch_size: int
-    ) -> Dict[str, float]:
-        """Execute one training epoch"""
+        data: Union[DataLoader, List[Dict[str, np.ndarray]]],
+        batch_size: int,
+        shuffle: bool
+    ) -> DataLoader:
+        """Use a DataLoader as is, or wrap a list of samples in one"""
+        if isinstance(data, DataLoader):
+            return data
+        return create_dataloader(
+            data,
+            batch_size=batch_size,
+            shuffle=shuffle,
+            num_workers=self.config.get('num_workers', 0),
+            persistent_workers=self.config.get('persistent_workers', True),
+            prefetch_factor=self.config.get('prefetch_factor', 2),
+            pin_memory=self.config.get('pin_memory', None)
+        )
+
+    @staticmethod
+    def _num_samples(batch: Dict) -> int:
+        """Number of samples in a collated batch"""
+        for key, value in batch.items():
+            if key in CONCAT_KEYS or value is None:
+                continue
+            return len(value)
+        return 1
+
+    def _train_epoch(self, loader: DataLoader, train: bool = True) -> Dict[str, float]:
+        """Execute one training epoch and measure its throughput"""
+        start = time.perf_counter()
         if self.model_type == "pinn":
-            return self._train_pinn_epoch(train_data, batch_size)
+            metrics = self._train_pinn_epoch(loader)
         elif self.model_type == "mesh_optimizer":
-            return self._train_mesh_optimizer_epoch(train_data, batch_size)
+            metrics = self._train_mesh_optimizer_epoch(loader, train)
         else:  # anomaly_detector
-            return self._train_anomaly_detector_epoch(train_data, batch_size)
+            metrics = self._train_anomaly_detector_epoch(loader, train)
+        elapsed = time.perf_counter() - start
+        metrics['epoch_time'] = elapsed
+        metrics['samples_per_second'] = metrics.pop('num_samples') / max(elapsed, 1e-12)
+        cache_stats = getattr(loader.dataset, 'cache_stats', dict)()
+        if cache_stats:
+            metrics['cache_hit_rate'] = cache_stats['hit_rate']
+        return metrics
 
-    def _train_pinn_epoch(
-        self,
-        train_data: List[Dict[str, np.ndarray]],
-        batch_size: int
-    ) -> Dict[str, float]:
-        """Train PINN for one epoch"""
+    def _augment(self, batch: Dict, step: int, train: bool) -> Dict:
+        """Augment (training) or only normalize (validation) field batches"""
+        if self.augmentor is None:
+            return batch
+        return self.augmentor(batch, epoch=self.current_epoch, step=step, train=train)
+
+    def _pinn_batch(self, batch: Dict) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """Move the PINN point sets of a batch to the training device"""
+        return tuple(
+            batch[key].to(self.device, dtype=torch.float32, non_blocking=True)
+            for key in ('x_pde', 'x_bc', 'bc_values')
+        )
+
+    def _train_pinn_epoch(self, loader: DataLoader) -> Dict[str, float]:
+        """Train PINN for one epoch, with optional gradient accumulation"""
         total_loss = 0.0
         num_batches = 0
+        num_samples = 0
+        accumulation = max(1, int(self.config.get('gradient_accumulation_steps', 1)))
+        total_batches = len(loader)
         
-        for i in range(0, len(train_data), batch_size):
-            batch = train_data[i:i+batch_size]
-            
-            # Prepare batch data
-            x_pde = torch.cat([sample['x_pde'] for sample in batch])
-            x_bc = torch.cat([sample['x_bc'] for sample in batch])
-            bc_values = torch.cat([sample['bc_values'] for sample in batch])
+        for i, batch in enumerate(loader):
+            x_pde, x_bc, bc_values = self._pinn_batch(batch)
             
-            # Training step
-            metrics = self.model.training_step(x_pde, x_bc, bc_values)
+            # Step once every `accumulation` batches and at the end of the epoch;
+            # the last group may be shorter and is averaged over its own size
+            group_size = min(accumulation, total_batches - (i - i % accumulation))
+            step = (i + 1) % accumulation == 0 or i + 1 == total_batches
+            metrics = self.model.training_step(
+                x_pde, x_bc, bc_values,
+                loss_scale=1.0 / group_size,
+                step=step
+            )
             total_loss += metrics['total_loss']
             num_batches += 1
+            num_samples += self._num_samples(batch)
         
-        return {'loss': total_loss / num_batches}
+        return {'loss': total_loss / max(num_batches, 1), 'num_samples': num_samples}
 
-    def _train_mesh_optimizer_epoch(
-        self,
-        train_data: List[Dict[str, np.ndarray]],
-        batch_size: int
-    ) -> Dict[str, float]:
+    def _pde_residual(self, points: np.ndarray) -> np.ndarray:
+        """Pointwise PDE residual of the PINN at the given points"""
+        x = torch.as_tensor(points, dtype=torch.float32, device=self.device)
+        return self.model.pointwise_residual(x).cpu().numpy()
+
+    def _train_mesh_optimizer_epoch(self, loader: DataLoader, train: bool = True) -> Dict[str, float]:
         """Train mesh optimizer for one epoch"""
         total_loss = 0.0
         num_batches = 0
+        num_samples = 0
         
-        for i in range(0, len(train_data), batch_size):
-            batch = train_data[i:i+batch_size]
+        for i, batch in enumerate(loader):
+            batch = self._augment(batch, i, train)
+            size = self._num_samples(batch)
             
             # Training step
             feature_scores = []
-            for sample in batch:
+            for b in range(size):
                 scores = self.model.compute_feature_scores(
-                    sample['velocity'],
-                    sample['pressure'],
-                    sample['vorticity']
+                    batch['velocity'][b].numpy(),
+                    batch['pressure'][b].numpy(),
+                    batch['vorticity'][b].numpy()
                 )
                 feature_scores.append(scores)
             
             # Compute loss against target refinement
-            target_refinement = np.stack([
-                sample['refinement_mask'] for sample in batch
-            ])
+            target_refinement = np.asarray(batch['refinement_mask'])
             loss = np.mean((np.stack(feature_scores) - target_refinement) ** 2)
             
             total_loss += loss
             num_batches += 1
+            num_samples += size
         
-        return {'loss': total_loss / num_batches}
+        return {'loss': total_loss / max(num_batches, 1), 'num_samples': num_samples}
 
-    def _train_anomaly_detector_epoch(
-        self,
-        train_data: List[Dict[str, np.ndarray]],
-        batch_size: int
-    ) -> Dict[str, float]:
+    def _train_anomaly_detector_epoch(self, loader: DataLoader, train: bool = True) -> Dict[str, float]:
         """Train anomaly detector for one epoch"""
         total_loss = 0.0
         num_batches = 0
+        num_samples = 0
         
-        for i in range(0, len(train_data), batch_size):
-            batch = train_data[i:i+batch_size]
+        for i, batch in enumerate(loader):
+            batch = self._augment(batch, i, train)
+            size = self._num_samples(batch)
             
             # Prepare batch data
-            x_batch = []
-            for sample in batch:
-                x = self.model.preprocess_data(
-                    sample['velocity'],
-                    sample['pressure'],
-                    sample['vorticity']
+            x_batch = torch.cat([
+                self.model.preprocess_data(
+                    batch['velocity'][b].numpy(),
+                    batch['pressure'][b].numpy(),
+                    batch['vorticity'][b].numpy()
                 )
-                x_batch.append(x)
-            
-            x_batch = torch.cat(x_batch)
+                for b in range(size)
+            ]).to(self.model.device)
             
             # Forward pass
             reconstructed, _ = self.model.autoencoder(x_batch)
@@ -220,17 +312,30 @@ class ModelTrainer:
             
             total_loss += loss.item()
             num_batches += 1
+            num_samples += size
         
-        return {'loss': total_loss / num_batches}
+        return {'loss': total_loss / max(num_batches, 1), 'num_samples': num_samples}
 
-    def _validate(
-        self,
-        val_data: List[Dict[str, np.ndarray]],
-        batch_size: int
-    ) -> Dict[str, float]:
+    def _validate(self, loader: DataLoader) -> Dict[str, float]:
         """Validate model performance"""
+        if self.model_type == "pinn":
+            return self._validate_pinn(loader)
         with torch.no_grad():
-            return self._train_epoch(val_data, batch_size)
+            return self._train_epoch(loader, train=False)
+
+    def _validate_pinn(self, loader: DataLoader) -> Dict[str, float]:
+        """PINN losses without parameter updates (derivatives still need autograd)"""
+        total_loss = 0.0
+        num_batches = 0
+        for batch in loader:
+            x_pde, x_bc, bc_values = self._pinn_batch(batch)
+            loss = (
+                self.model.lambda_pde * self.model.compute_pde_loss(x_pde) +
+                self.model.lambda_bc * self.model.compute_bc_loss(x_bc, bc_values)
+            )
+            total_loss += loss.item()
+            num_batches += 1
+        return {'loss': total_loss / max(num_batches, 1)}
 
     def _log_metrics(
         self,
@@ -241,6 +346,8 @@ class ModelTrainer:
         """Log training metrics"""
         # Console logging
         log_str = f"Epoch {epoch}: train_loss={train_metrics['loss']:.4f}"
+        if 'samples_per_second' in train_metrics:
+            log_str += f", {train_metrics['samples_per_second']:.1f} samples/s"
         if val_metrics:
             log_str += f", val_loss={val_metrics['loss']:.4f}"
         self.logger.info(log_str)
@@ -249,8 +356,12 @@ class ModelTrainer:
         if self.use_wandb:
             log_dict = {
                 'epoch': epoch,
-                'train_loss': train_metrics['loss']
+                'train_loss': train_metrics['loss'],
+                'samples_per_second': train_metrics.get('samples_per_second', 0.0),
+                'epoch_time': train_metrics.get('epoch_time', 0.0)
             }
+            if 'cache_hit_rate' in train_metrics:
+                log_dict['cache_hit_rate'] = train_metrics['cache_hit_rate']
             if val_metrics:
                 log_dict['val_loss'] = val_metrics['loss']
             wandb.log(log_dict)
@@ -289,7 +400,7 @@ class ModelTrainer:
             'model_type': self.model_type,
             'config': self.config,
             'metrics': {
-                k: v if isinstance(v, (int, float)) else v.tolist()
+                k: v if isinstance(v, (int, float)) else [float(x) for x in v]
                 for k, v in self.metrics.items()
             },
             'timestamp': datetime.now().isoformat()
@@ -4,6 +4,7 @@ import numpy as np
 from typing import Dict, Optional, Tuple
 from ..physics_core import MultiPhysicsSolver, PhysicsModel
 from ..compute_engine import OptimizedComputeEngine, ComputeBackend
+from ..fields import FieldPool
 
 @ti.data_oriented
 class CoreEulerianSolver:
@@ -39,7 +40,9 @@ class CoreEulerianSolver:
         self.velocity = self.physics_solver.velocity
         self.pressure = self.physics_solver.pressure
         self.density = self.physics_solver.density
-        self.divergence = ti.field(dtype=ti.f32, shape=(width, height))
+        self.fields = FieldPool()
+        self.divergence = self.fields.field(ti.f32, (width, height))
+        self.fields.finalize()
         
         # Mouse interaction
         self.prev_mouse_pos = ti.Vector([0.0, 0.0])
@@ -56,6 +59,12 @@ class CoreEulerianSolver:
             self.density[i, j] = 0.0
             self.divergence[i, j] = 0.0
 
+    @ti.kernel
+    def load_velocity(self, src: ti.template(), scale: ti.f32):
+        """Impose a velocity field of shape (width, height) scaled by scale"""
+        for i, j in self.velocity:
+            self.velocity[i, j] = src[i, j] * scale
+
     @ti.kernel
     def add_force_and_density(self, pos_x: float, pos_y: float, vel_x: float, vel_y: float):
         """Add force and density at mouse position"""
@@ -189,6 +198,11 @@ class CoreEulerianSolver:
             print(f"Error in get_state: {str(e)}")
             return {}
 
+    def release(self):
+        """Free the Taichi fields; the solver is unusable afterwards"""
+        self.fields.release()
+        self.physics_solver.release()
+
     def update_config(self, config: Dict):
         """Update solver configuration"""
         self.config.update(config) 
\ No newline at end of file
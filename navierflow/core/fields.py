@@ -0,0 +1,49 @@
+import taichi as ti
+from typing import Optional, Tuple, Union
+
+_AXES = {1: ti.i, 2: ti.ij, 3: ti.ijk}
+
+class FieldPool:
+    """
+    Taichi fields of one owner, placed in their own SNode tree.
+
+    Fields created with ti.field(shape=...) live under ti.root and are never
+    freed, even after their owner is garbage collected. A pool places its
+    fields through a ti.FieldsBuilder instead, so release() returns their
+    memory. Declare all fields, call finalize() before the first kernel or
+    element access, and call release() once the owner is discarded; the
+    fields must not be accessed afterwards.
+    """
+    def __init__(self):
+        self._builder = ti.FieldsBuilder()
+        self._tree = None
+        self.released = False
+
+    def field(self, dtype, shape: Union[int, Tuple[int, ...]] = (), n: Optional[int] = None):
+        """
+        Declare a field of the pool
+
+        Args:
+            dtype: Element type
+            shape: Field shape; () for a single element
+            n: Vector components (scalar field when omitted)
+        """
+        if self._tree is not None:
+            raise RuntimeError("Fields cannot be added to a finalized pool")
+        field = ti.field(dtype) if n is None else ti.Vector.field(n, dtype)
+        shape = (shape,) if isinstance(shape, int) else tuple(shape)
+        if shape:
+            self._builder.dense(_AXES[len(shape)], shape).place(field)
+        else:
+            self._builder.place(field)
+        return field
+
+    def finalize(self):
+        """Allocate the declared fields"""
+        self._tree = self._builder.finalize()
+
+    def release(self):
+        """Free the fields; later calls do nothing"""
+        if self._tree is not None and not self.released:
+            self._tree.destroy()
+            self.released = True
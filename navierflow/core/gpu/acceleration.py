@@ -4,6 +4,7 @@ import torch
 from typing import Optional, Union, List, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from ...utils.fft_backend import get_fft_backend
 
 class GPUMode(Enum):
     """GPU acceleration modes"""
@@ -33,6 +34,7 @@ class GPUAccelerator:
             config: GPU configuration parameters
         """
         self.config = config or GPUConfig()
+        self.fft = get_fft_backend('torch')
         self._setup_device()
         self._setup_cudnn()
         self._setup_tensor_cores()
@@ -223,44 +225,24 @@ class GPUAccelerator:
         
     def compute_fft(self,
                    field: torch.Tensor,
-                   inverse: bool = False) -> torch.Tensor:
+                   inverse: bool = False,
+                   shape: Optional[Tuple[int, int]] = None) -> torch.Tensor:
         """
         Compute FFT using GPU acceleration
         
         Args:
-            field: Input field
+            field: Input field, batched over leading dimensions
             inverse: Whether to compute inverse FFT
+            shape: Real output size of the last two axes for the inverse
             
         Returns:
             FFT of the field
         """
-        if self.config.mode == GPUMode.TENSOR:
-            return self._compute_fft_tensor(field, inverse)
-        else:
-            return self._compute_fft_cuda(field, inverse)
-            
-    def _compute_fft_tensor(self,
-                          field: torch.Tensor,
-                          inverse: bool) -> torch.Tensor:
-        """Compute FFT using Tensor Cores"""
-        with torch.cuda.amp.autocast():
-            if inverse:
-                return torch.fft.irfftn(field, dim=(-2, -1))
-            else:
-                return torch.fft.rfftn(field, dim=(-2, -1))
-                
-    def _compute_fft_cuda(self,
-                         field: torch.Tensor,
-                         inverse: bool) -> torch.Tensor:
-        """Compute FFT using CUDA kernels"""
         if inverse:
-            return torch.from_numpy(
-                cp.asnumpy(cp.fft.irfftn(field.cpu().numpy()))
-            ).cuda()
-        else:
-            return torch.from_numpy(
-                cp.asnumpy(cp.fft.rfftn(field.cpu().numpy()))
-            ).cuda()
+            if shape is None:
+                shape = (field.shape[-2], 2 * (field.shape[-1] - 1))
+            return self.fft.irfftn(field, shape, axes=(-2, -1))
+        return self.fft.rfftn(field, axes=(-2, -1))
             
     def _get_gradient_kernel(self,
                            dx: float,
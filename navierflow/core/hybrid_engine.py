@@ -1,15 +1,12 @@
 import taichi as ti
 import numpy as np
 import torch
-import modulus
-from modulus.geometry import Rectangle, Circle
-from modulus.models.fourier_net import FourierNetArch
-from modulus.domain import Domain
-from modulus.physics.navier_stokes import NavierStokes
 from typing import Dict, List, Optional, Tuple
 from enum import Enum
 import logging
 
+from .stage_scheduler import Stage, StageScheduler
+
 class PhysicsBackend(Enum):
     TAICHI = "taichi"
     PHYSX = "physx"
@@ -23,28 +20,48 @@ class SolverMode(Enum):
 
 @ti.data_oriented
 class HybridPhysicsEngine:
-    def __init__(self, width: int, height: int, backend: PhysicsBackend = PhysicsBackend.HYBRID):
+    """
+    Hybrid physics engine running fluid, rigid-body and ML stages concurrently.
+
+    The stages run on a thread pool that lives as long as the engine; call
+    shutdown() when done, or use the engine as a context manager.
+    """
+    def __init__(self, width: int, height: int, backend: PhysicsBackend = PhysicsBackend.HYBRID,
+                 config: Dict = None):
         self.width = width
         self.height = height
         self.backend = backend
+        self.config = {
+            'device': 'auto',           # 'auto', 'cpu' or 'cuda'
+            'max_workers': 3,
+            'ml_lag': True,             # ML reads the previous step's fluid state
+            'mixed_precision': True     # Autocast ML inference on CUDA
+        }
+        if config:
+            self.config.update(config)
         
         # Initialize different physics backends
         self.taichi_solver = None
         self.physx_solver = None
         self.modulus_solver = None
         
-        # CUDA streams for parallel execution
-        self.streams = {
-            'fluid': torch.cuda.Stream(),
-            'rigid_body': torch.cuda.Stream(),
-            'ml': torch.cuda.Stream()
-        }
+        # Concurrent stage execution (threads on CPU, streams on CUDA)
+        self.scheduler = StageScheduler({
+            'device': self.config['device'],
+            'max_workers': self.config['max_workers']
+        })
+        self.device = self.scheduler.device
+        self.step_count = 0
+        self._fluid_state: Dict = {}
+        self._fluid_state_step = -1
         
-        # Performance metrics
+        # Performance metrics (ms)
         self.performance_metrics = {
             'fluid_time': 0.0,
             'rigid_body_time': 0.0,
-            'ml_inference_time': 0.0
+            'ml_inference_time': 0.0,
+            'step_time': 0.0,
+            'overlap_efficiency': 0.0
         }
         
         self._initialize_solvers()
@@ -89,6 +106,11 @@ class HybridPhysicsEngine:
     def _init_modulus_solver(self):
         """Initialize NVIDIA Modulus for physics-informed neural networks"""
         try:
+            from modulus.geometry import Rectangle
+            from modulus.models.fourier_net import FourierNetArch
+            from modulus.domain import Domain
+            from modulus.physics.navier_stokes import NavierStokes
+            
             # Create Modulus domain for fluid simulation
             geometry = Rectangle((0, 0), (self.width, self.height))
             
@@ -110,56 +132,50 @@ class HybridPhysicsEngine:
         except ImportError:
             logging.warning("NVIDIA Modulus not available. Falling back to Taichi solver.")
 
-    @torch.cuda.amp.autocast()
     def step(self, dt: float, mode: SolverMode = SolverMode.HYBRID):
-        """Execute one time step of the hybrid physics simulation"""
-        results = {}
+        """
+        Execute one time step of the hybrid physics simulation
         
-        with torch.cuda.stream(self.streams['fluid']):
-            # Fluid dynamics with Taichi/Modulus
-            if self.backend in [PhysicsBackend.TAICHI, PhysicsBackend.HYBRID]:
-                fluid_start = torch.cuda.Event(enable_timing=True)
-                fluid_end = torch.cuda.Event(enable_timing=True)
-                
-                fluid_start.record()
-                fluid_results = self._step_fluid_dynamics(dt)
-                fluid_end.record()
-                
-                fluid_end.synchronize()
-                self.performance_metrics['fluid_time'] = fluid_start.elapsed_time(fluid_end)
-                results.update(fluid_results)
+        Fluid and rigid-body stages are independent and run concurrently.
+        The ML stage reads the fluid state: with `ml_lag` it uses the state
+        of the previous step and overlaps with the fluid stage, otherwise it
+        waits for the current fluid results.
+        """
+        stages = []
+        if self.backend in [PhysicsBackend.TAICHI, PhysicsBackend.HYBRID]:
+            stages.append(Stage('fluid', lambda inputs: self._step_fluid_dynamics(dt)))
+        if self.backend in [PhysicsBackend.PHYSX, PhysicsBackend.HYBRID]:
+            stages.append(Stage('rigid_body', lambda inputs: self._step_rigid_body_dynamics(dt)))
+        if self.backend in [PhysicsBackend.MODULUS, PhysicsBackend.HYBRID]:
+            has_fluid = any(stage.name == 'fluid' for stage in stages)
+            if self.config['ml_lag'] or not has_fluid:
+                state, state_step = self._fluid_state, self._fluid_state_step
+                stages.append(Stage(
+                    'ml', lambda inputs: self._step_ml_predictions(dt, state, state_step)))
+            else:
+                stages.append(Stage(
+                    'ml', lambda inputs: self._step_ml_predictions(dt, inputs['fluid'], self.step_count),
+                    depends_on=('fluid',)))
         
-        with torch.cuda.stream(self.streams['rigid_body']):
-            # Rigid body dynamics with PhysX
-            if self.backend in [PhysicsBackend.PHYSX, PhysicsBackend.HYBRID]:
-                rigid_start = torch.cuda.Event(enable_timing=True)
-                rigid_end = torch.cuda.Event(enable_timing=True)
-                
-                rigid_start.record()
-                rigid_results = self._step_rigid_body_dynamics(dt)
-                rigid_end.record()
-                
-                rigid_end.synchronize()
-                self.performance_metrics['rigid_body_time'] = rigid_start.elapsed_time(rigid_end)
-                results.update(rigid_results)
+        outputs = self.scheduler.run(stages)
         
-        with torch.cuda.stream(self.streams['ml']):
-            # ML-enhanced predictions with Modulus
-            if self.backend in [PhysicsBackend.MODULUS, PhysicsBackend.HYBRID]:
-                ml_start = torch.cuda.Event(enable_timing=True)
-                ml_end = torch.cuda.Event(enable_timing=True)
-                
-                ml_start.record()
-                ml_results = self._step_ml_predictions(dt)
-                ml_end.record()
-                
-                ml_end.synchronize()
-                self.performance_metrics['ml_inference_time'] = ml_start.elapsed_time(ml_end)
-                results.update(ml_results)
+        results = {}
+        for name in ('fluid', 'rigid_body', 'ml'):
+            if name in outputs:
+                results.update(outputs[name])
+        if 'fluid' in outputs:
+            self._fluid_state = outputs['fluid']
+            self._fluid_state_step = self.step_count
         
-        # Synchronize all CUDA streams
-        torch.cuda.synchronize()
+        metrics = self.scheduler.metrics
+        times = metrics['stage_times']
+        self.performance_metrics['fluid_time'] = times.get('fluid', 0.0)
+        self.performance_metrics['rigid_body_time'] = times.get('rigid_body', 0.0)
+        self.performance_metrics['ml_inference_time'] = times.get('ml', 0.0)
+        self.performance_metrics['step_time'] = metrics['step_time']
+        self.performance_metrics['overlap_efficiency'] = metrics['overlap_efficiency']
         
+        self.step_count += 1
         return results
 
     def _step_fluid_dynamics(self, dt: float) -> Dict:
@@ -177,14 +193,26 @@ class HybridPhysicsEngine:
             return self._get_physx_state()
         return {}
 
-    def _step_ml_predictions(self, dt: float) -> Dict:
-        """Execute ML-enhanced predictions"""
+    def _step_ml_predictions(self, dt: float, fluid_state: Optional[Dict] = None,
+                             state_step: int = -1) -> Dict:
+        """
+        Execute ML-enhanced predictions
+        
+        Args:
+            dt: Time step
+            fluid_state: Fluid results the prediction is conditioned on
+                (empty before the first fluid step)
+            state_step: Step index of `fluid_state` (-1 before the first step)
+        """
         if self.modulus_solver:
-            with torch.no_grad():
-                predictions = self.modulus_solver.forward(dt)
+            # Autocast is thread-local, so it is entered in the stage's own thread
+            use_amp = self.config['mixed_precision'] and self.device.type == 'cuda'
+            with torch.no_grad(), torch.autocast(device_type=self.device.type, enabled=use_amp):
+                predictions = self.modulus_solver.forward(dt, fluid_state or {})
             return {
-                'ml_velocity': predictions['velocity'].cpu().numpy(),
-                'ml_pressure': predictions['pressure'].cpu().numpy()
+                'ml_velocity': predictions['velocity'].float().cpu().numpy(),
+                'ml_pressure': predictions['pressure'].float().cpu().numpy(),
+                'ml_state_step': state_step
             }
         return {}
 
@@ -247,6 +275,16 @@ class HybridPhysicsEngine:
         """Get performance metrics for different components"""
         return self.performance_metrics.copy()
 
+    def shutdown(self):
+        """Stop the stage worker threads"""
+        self.scheduler.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
 class PhysXEventCallback:
     """Callback handler for PhysX simulation events"""
     def onContact(self, pairHeader, pairs):
@@ -2,6 +2,14 @@ import taichi as ti
 import numpy as np
 from typing import Dict, List, Optional, Tuple
 from scipy.spatial import cKDTree
+from .kernels import (
+    peskin_phi_4,
+    smoothed_delta as vectorized_delta,
+    spread_forces,
+    ti_smoothed_delta,
+    KERNEL_SUPPORT
+)
+from .cut_cell import CutCellGeometry
 
 @ti.data_oriented
 class ImmersedBoundaryMethod:
@@ -25,6 +33,8 @@ class ImmersedBoundaryMethod:
             'enable_adaptive_mesh': True,
             'max_boundary_points': 10000,
             'smoothing_width': 2.0,
+            'delta_kernel': '4point',  # '3point', '4point'
+            'cut_cell_band_width': 2.0,
             'rigidity_coefficient': 1.0,
             'damping_coefficient': 0.1,
             'refinement_levels': 3,
@@ -57,6 +67,10 @@ class ImmersedBoundaryMethod:
             self.cell_volume_fraction = ti.field(dtype=ti.f32, shape=(width, height))
             self.cell_center_distance = ti.field(dtype=ti.f32, shape=(width, height))
             self.cell_normal = ti.Vector.field(2, dtype=ti.f32, shape=(width, height))
+            self.cell_face_aperture = ti.Vector.field(4, dtype=ti.f32, shape=(width, height))
+            self.cut_cell_geometry = CutCellGeometry(width, height, {
+                'band_width': self.config['cut_cell_band_width']
+            })
             
         # Adaptive mesh fields
         if self.config['enable_adaptive_mesh']:
@@ -93,6 +107,7 @@ class ImmersedBoundaryMethod:
                 self.cell_volume_fraction[i, j] = 1.0
                 self.cell_center_distance[i, j] = 1e10
                 self.cell_normal[i, j] = ti.Vector([0.0, 0.0])
+                self.cell_face_aperture[i, j] = ti.Vector([1.0, 1.0, 1.0, 1.0])
                 
         if self.config['enable_adaptive_mesh']:
             for i, j in self.refinement_level:
@@ -111,6 +126,11 @@ class ImmersedBoundaryMethod:
         # Build KD-tree for efficient neighbor searches
         self.boundary_tree = cKDTree(points[:n_points])
         
+        # Static geometry: precompute every cut cell once
+        if self.config['method'] == 'cut_cell':
+            self.cut_cell_geometry.set_boundary(points[:n_points], normals[:n_points])
+            self._upload_cut_cells()
+        
     @ti.kernel
     def compute_direct_forcing(self, fluid_velocity: ti.template()):
         """Compute direct forcing method"""
@@ -148,31 +168,26 @@ class ImmersedBoundaryMethod:
                 # Update forces
                 self.boundary_forces[i] = lambda_momentum + lambda_incompress
                 
-    @ti.kernel
     def update_cut_cells(self):
-        """Update cut-cell geometry information"""
+        """Update cut-cell geometry information for cells near moved markers"""
         if self.config['method'] != 'cut_cell':
             return
             
-        for i, j in self.cell_volume_fraction:
-            min_dist = 1e10
-            closest_normal = ti.Vector([0.0, 0.0])
+        active = self.boundary_active.to_numpy() == 1
+        geometry = self.cut_cell_geometry
+        geometry.sync(self.boundary_points.to_numpy()[active],
+                      self.boundary_normals.to_numpy()[active])
+        if geometry.update() > 0:
+            self._upload_cut_cells()
             
-            # Find closest boundary point
-            cell_center = ti.Vector([float(i) + 0.5, float(j) + 0.5])
-            for b in range(self.config['max_boundary_points']):
-                if self.boundary_active[b] == 1:
-                    dist = (cell_center - self.boundary_points[b]).norm()
-                    if dist < min_dist:
-                        min_dist = dist
-                        closest_normal = self.boundary_normals[b]
-                        
-            # Update cell properties
-            self.cell_center_distance[i, j] = min_dist
-            self.cell_normal[i, j] = closest_normal
-            self.cell_volume_fraction[i, j] = self.compute_volume_fraction(
-                cell_center, min_dist, closest_normal
-            )
+    def _upload_cut_cells(self):
+        """Copy cached cut-cell geometry into the Taichi fields"""
+        geometry = self.cut_cell_geometry
+        self.cell_volume_fraction.from_numpy(geometry.volume_fraction.astype(np.float32))
+        self.cell_center_distance.from_numpy(
+            np.minimum(np.abs(geometry.distance), 1e10).astype(np.float32))
+        self.cell_normal.from_numpy(geometry.normals.astype(np.float32))
+        self.cell_face_aperture.from_numpy(geometry.face_apertures.astype(np.float32))
             
     @ti.kernel
     def update_fsi(self, dt: ti.f32):
@@ -252,46 +267,42 @@ class ImmersedBoundaryMethod:
             
     def spread_boundary_force(self, fluid_force: np.ndarray):
         """Spread boundary forces to fluid grid"""
-        n_points = np.sum(self.boundary_active.to_numpy())
-        points = self.boundary_points.to_numpy()[:n_points]
-        forces = self.boundary_forces.to_numpy()[:n_points]
+        active = self.boundary_active.to_numpy() == 1
+        points = self.boundary_points.to_numpy()[active]
+        forces = self.boundary_forces.to_numpy()[active]
         
-        # Use smoothed delta function
-        width = self.config['smoothing_width']
-        for i, (point, force) in enumerate(zip(points, forces)):
-            # Find affected fluid cells
-            x_min = max(0, int(point[0] - width))
-            x_max = min(self.width, int(point[0] + width + 1))
-            y_min = max(0, int(point[1] - width))
-            y_max = min(self.height, int(point[1] + width + 1))
-            
-            for x in range(x_min, x_max):
-                for y in range(y_min, y_max):
-                    r = np.array([x + 0.5 - point[0], y + 0.5 - point[1]])
-                    delta = self.smoothed_delta(r, width)
-                    fluid_force[x, y] += force * delta
+        # Use smoothed delta function, all points in one scatter
+        spread_forces(points, forces, fluid_force,
+                      self.config['smoothing_width'] / KERNEL_SUPPORT[self.config['delta_kernel']],
+                      self.config['delta_kernel'])
+                      
+    @ti.kernel
+    def spread_boundary_force_field(self, fluid_force: ti.template()):
+        """Spread boundary forces to a Taichi fluid force field on device"""
+        width = ti.static(self.config['smoothing_width'])
+        scale = ti.static(width / KERNEL_SUPPORT[self.config['delta_kernel']])
+        reach = ti.static(int(np.ceil(width)))
+        for b in range(self.config['max_boundary_points']):
+            if self.boundary_active[b] == 1:
+                point = self.boundary_points[b]
+                base = ti.floor(point - 0.5, ti.i32)
+                for di, dj in ti.ndrange((-reach, reach + 1), (-reach, reach + 1)):
+                    i = base.x + di
+                    j = base.y + dj
+                    if 0 <= i < self.width and 0 <= j < self.height:
+                        r = ti.Vector([i + 0.5, j + 0.5]) - point
+                        delta = ti_smoothed_delta(r, scale, self.config['delta_kernel'])
+                        fluid_force[i, j] += self.boundary_forces[b] * delta
                     
     @staticmethod
-    def smoothed_delta(r: np.ndarray, width: float) -> float:
-        """Smoothed delta function for force spreading"""
-        x, y = r
-        if abs(x) > width or abs(y) > width:
-            return 0.0
-            
-        phi_x = ImmersedBoundaryMethod.phi(x/width)
-        phi_y = ImmersedBoundaryMethod.phi(y/width)
-        return phi_x * phi_y / (width * width)
+    def smoothed_delta(r: np.ndarray, width: float) -> np.ndarray:
+        """Smoothed delta function for force spreading (accepts (..., 2) offsets)"""
+        return vectorized_delta(r, width / KERNEL_SUPPORT['4point'])
         
     @staticmethod
-    def phi(r: float) -> float:
+    def phi(r: np.ndarray) -> np.ndarray:
         """1D kernel function for smoothed delta function"""
-        r = abs(r)
-        if r > 2.0:
-            return 0.0
-        elif r > 1.0:
-            return (2 - r) * (4 - 4*r + r*r) / 8
-        else:
-            return (3 - 2*r + sqrt(1 + 4*r - 4*r*r)) / 8
+        return peskin_phi_4(r)
             
     def get_boundary_points(self) -> np.ndarray:
         """Return active boundary points"""
@@ -308,7 +319,13 @@ class ImmersedBoundaryMethod:
     def get_volume_fractions(self) -> Optional[np.ndarray]:
         """Return cut-cell volume fractions"""
         if self.config['method'] == 'cut_cell':
-            return self.cell_volume_fraction.to_numpy()
+            return self.cut_cell_geometry.volume_fraction
+        return None
+        
+    def get_face_apertures(self) -> Optional[np.ndarray]:
+        """Return cut-cell face apertures (left, right, bottom, top)"""
+        if self.config['method'] == 'cut_cell':
+            return self.cut_cell_geometry.face_apertures
         return None
         
     def get_refinement_levels(self) -> Optional[np.ndarray]:
@@ -4,6 +4,7 @@ import numpy as np
 from typing import Dict, Optional, Tuple
 from ..physics_core import MultiPhysicsSolver, PhysicsModel
 from ..compute_engine import OptimizedComputeEngine, ComputeBackend
+from ..fields import FieldPool
 
 @ti.data_oriented
 class CoreLBMSolver:
@@ -44,31 +45,33 @@ class CoreLBMSolver:
         self.cs2 = 1.0 / 3.0
         self.viscosity = self.cs2 * (self.tau - 0.5)
         
-        # Fields
-        self.f = ti.field(dtype=ti.f32, shape=(width, height, 9))
-        self.f_temp = ti.field(dtype=ti.f32, shape=(width, height, 9))
+        # Fields; freed by release(), see FieldPool
+        self.fields = FieldPool()
+        self.f = self.fields.field(ti.f32, (width, height, 9))
+        self.f_temp = self.fields.field(ti.f32, (width, height, 9))
         self.rho = self.physics_solver.density
         self.vel = self.physics_solver.velocity
-        self.solid_mask = ti.field(dtype=ti.i32, shape=(width, height))
+        self.solid_mask = self.fields.field(ti.i32, (width, height))
         
         # Multiphase fields
         if self.config['enable_multiphase']:
-            self.phase_field = ti.field(dtype=ti.f32, shape=(width, height))
-            self.chemical_potential = ti.field(dtype=ti.f32, shape=(width, height))
+            self.phase_field = self.fields.field(ti.f32, (width, height))
+            self.chemical_potential = self.fields.field(ti.f32, (width, height))
         
         # Ball properties
-        self.ball_pos = ti.Vector.field(2, dtype=ti.f32, shape=())
-        self.ball_vel = ti.Vector.field(2, dtype=ti.f32, shape=())
-        self.ball_force = ti.Vector.field(2, dtype=ti.f32, shape=())
+        self.ball_pos = self.fields.field(ti.f32, n=2)
+        self.ball_vel = self.fields.field(ti.f32, n=2)
+        self.ball_force = self.fields.field(ti.f32, n=2)
+        
+        # D2Q9 lattice constants
+        self.c = self.fields.field(ti.i32, 9, n=2)
+        self.w = self.fields.field(ti.f32, 9)
+        self.fields.finalize()
         
         # Initialize ball position and velocity
         self.ball_pos[None] = ti.Vector([width // 2, height // 2])
         self.ball_vel[None] = ti.Vector([0.0, 0.0])
         
-        # D2Q9 lattice constants
-        self.c = ti.Vector.field(2, dtype=ti.i32, shape=9)
-        self.w = ti.field(dtype=ti.f32, shape=9)
-        
         self.initialize_lattice()
         self.initialize_fields()
 
@@ -102,7 +105,7 @@ class CoreLBMSolver:
             for k in ti.static(range(9)):
                 self.f[i, j, k] = self.compute_equilibrium(1.0, ti.Vector([0.0, 0.0]), k)
             
-            if self.config['enable_multiphase']:
+            if ti.static(self.config['enable_multiphase']):
                 # Initialize phase field with a droplet
                 dx = float(i - self.width // 2)
                 dy = float(j - self.height // 2)
@@ -139,6 +142,24 @@ class CoreLBMSolver:
                     feq = self.compute_equilibrium(rho, self.vel[i, j], k)
                     self.f_temp[i, j, k] = self.f[i, j, k] + self.omega * (feq - self.f[i, j, k])
 
+    @ti.kernel
+    def load_velocity(self, src: ti.template(), scale: ti.f32, max_speed: ti.f32):
+        """Impose a velocity field and rebuild populations at equilibrium
+
+        Args:
+            src: Vector field of shape (width, height)
+            scale: Factor converting src velocities to lattice units
+            max_speed: Lattice speed limit keeping the low-Mach assumption valid
+        """
+        for i, j in ti.ndrange(self.width, self.height):
+            u = src[i, j] * scale
+            speed = u.norm()
+            if speed > max_speed:
+                u *= max_speed / speed
+            self.vel[i, j] = u
+            for k in ti.static(range(9)):
+                self.f[i, j, k] = self.compute_equilibrium(self.rho[i, j], u, k)
+
     @ti.kernel
     def stream(self):
         """Streaming step with bounce-back boundary conditions"""
@@ -277,6 +298,11 @@ class CoreLBMSolver:
             print(f"Error in get_state: {str(e)}")
             return {}
 
+    def release(self):
+        """Free the Taichi fields; the solver is unusable afterwards"""
+        self.fields.release()
+        self.physics_solver.release()
+
     def update_config(self, config: Dict):
         """Update solver configuration"""
         self.config.update(config)
@@ -12,19 +12,23 @@ class Cell:
     volume: float
 
 class Mesh:
-    def __init__(self, vertices: np.ndarray, cells: List[List[int]]):
+    def __init__(self, vertices: np.ndarray, cells: List[List[int]],
+                 neighbors: Optional[List[List[int]]] = None):
         """
         Initialize computational mesh
         
         Args:
             vertices: Array of vertex coordinates
             cells: List of cell vertex indices
+            neighbors: Optional face neighbors of each cell; if omitted,
+                cells sharing a vertex are taken as neighbors
         """
         self.vertices = vertices
         self.cells = []
-        self._build_mesh(cells)
+        self._build_mesh(cells, neighbors)
         
-    def _build_mesh(self, cell_vertices: List[List[int]]):
+    def _build_mesh(self, cell_vertices: List[List[int]],
+                    cell_neighbors: Optional[List[List[int]]] = None):
         """Build mesh data structures"""
         for i, vertices in enumerate(cell_vertices):
             # Compute cell center
@@ -43,15 +47,20 @@ class Mesh:
             )
             self.cells.append(cell)
             
-        # Find cell neighbors
-        self._find_neighbors()
+        # Find cell neighbors, unless the connectivity is known
+        if cell_neighbors is None:
+            self._find_neighbors()
+        else:
+            for cell, neighbors in zip(self.cells, cell_neighbors):
+                cell.neighbors = list(neighbors)
         
     def _compute_cell_volume(self, vertex_indices: List[int]) -> float:
         """Compute volume of a cell"""
         # For 2D: compute area
         if self.vertices.shape[1] == 2:
-            points = self.vertices[vertex_indices]
-            return 0.5 * abs(np.sum(np.cross(points[:-1], points[1:])))
+            # Shoelace formula over the closed polygon
+            x, y = self.vertices[vertex_indices].T
+            return 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
         # For 3D: compute volume using tetrahedral decomposition
         else:
             # Simplified volume computation for 3D
@@ -0,0 +1,178 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Tuple
+
+def leaf_cells(levels: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int]:
+    """
+    Leaves of the quadtrees rooted at every cell of a base grid
+
+    A base cell at level l is split into 2^l x 2^l leaves. Leaves are
+    emitted in row-major order of their base cells, and row-major within
+    each base cell; all cells of one level are handled in a single
+    broadcast.
+
+    Args:
+        levels: Refinement level of each base cell (H, W)
+
+    Returns:
+        Leaf origins x and y in units of the finest leaf, leaf levels, base
+        cell (flat index) of each leaf, and the finest subdivision
+        F = 2^max_level of a base cell
+    """
+    levels = np.asarray(levels)
+    flat = levels.ravel().astype(np.int64)
+    if flat.size and flat.min() < 0:
+        raise ValueError("Refinement levels must be non-negative")
+    width = levels.shape[1]
+    finest = 1 << int(flat.max()) if flat.size else 1
+
+    counts = 1 << (2 * flat)
+    offsets = np.zeros(len(flat) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    total = int(offsets[-1])
+    x = np.empty(total, dtype=np.int64)
+    y = np.empty(total, dtype=np.int64)
+    leaf_levels = np.empty(total, dtype=np.int32)
+    base = np.empty(total, dtype=np.int64)
+
+    for level in np.unique(flat):
+        cells = np.flatnonzero(flat == level)
+        k = 1 << int(level)
+        size = finest // k
+        row, col = np.divmod(np.arange(k * k), k)
+        i, j = np.divmod(cells, width)
+
+        index = offsets[cells][:, None] + np.arange(k * k)
+        x[index] = (j * finest)[:, None] + col * size
+        y[index] = (i * finest)[:, None] + row * size
+        leaf_levels[index] = level
+        base[index] = cells[:, None]
+
+    return x, y, leaf_levels, base, finest
+
+def _side_segments(line: np.ndarray, start: np.ndarray, size: np.ndarray, span: int):
+    """Unit segments along leaf sides, keyed by (line, position)"""
+    leaf = np.repeat(np.arange(len(size)), size)
+    first = np.cumsum(size) - size
+    position = np.arange(int(size.sum())) - np.repeat(first - start, size)
+    return np.repeat(line, size) * span + position, leaf
+
+def _face_neighbors(x: np.ndarray, y: np.ndarray, size: np.ndarray,
+                    width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Edge-sharing leaves as CSR arrays
+
+    Every leaf side is cut into unit segments of the finest level. Each
+    unit segment belongs to exactly one leaf's left (bottom) side, so the
+    right (top) sides find their neighbors with one sorted lookup.
+    """
+    n = len(x)
+    pairs = []
+    for low_line, high_line, start, span in ((x, x + size, y, height + 1),
+                                             (y, y + size, x, width + 1)):
+        low_key, low_leaf = _side_segments(low_line, start, size, span)
+        high_key, high_leaf = _side_segments(high_line, start, size, span)
+        order = np.argsort(low_key)
+        low_key, low_leaf = low_key[order], low_leaf[order]
+        position = np.minimum(np.searchsorted(low_key, high_key), len(low_key) - 1)
+        found = low_key[position] == high_key
+        high_leaf, low_leaf = high_leaf[found], low_leaf[position[found]]
+
+        # Segments of a side are consecutive, so repeated pairs are adjacent
+        new = np.ones(len(high_leaf), dtype=bool)
+        new[1:] = (high_leaf[1:] != high_leaf[:-1]) | (low_leaf[1:] != low_leaf[:-1])
+        high_leaf, low_leaf = high_leaf[new], low_leaf[new]
+        pairs += [high_leaf * n + low_leaf, low_leaf * n + high_leaf]
+
+    # Leaves share at most one side, so the pairs are distinct
+    cell, neighbors = np.divmod(np.sort(np.concatenate(pairs)), n)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(cell, minlength=n), out=offsets[1:])
+    return offsets, neighbors
+
+@dataclass
+class QuadtreeMesh:
+    """
+    Leaf cells of a forest of quadtrees over a base grid.
+
+    Cells are quads with counter-clockwise vertex indices (lower left,
+    lower right, upper right, upper left). Vertices are shared between
+    cells; where a coarse cell borders finer ones the finer cells' corner
+    vertices hang on its edge. Face connectivity across levels is stored
+    in CSR form: the neighbors of cell c are
+    neighbors[neighbor_offsets[c]:neighbor_offsets[c + 1]].
+    """
+    vertices: np.ndarray            # (V, 2)
+    cells: np.ndarray               # (C, 4)
+    levels: np.ndarray              # (C,)
+    base_cells: np.ndarray          # (C,) flat index of the base cell
+    neighbor_offsets: np.ndarray    # (C + 1,)
+    neighbors: np.ndarray
+
+    @property
+    def num_cells(self) -> int:
+        return len(self.cells)
+
+    def cell_neighbors(self, cell: int) -> np.ndarray:
+        """Cells sharing an edge (segment) with a cell"""
+        return self.neighbors[self.neighbor_offsets[cell]:self.neighbor_offsets[cell + 1]]
+
+    def cell_centers(self) -> np.ndarray:
+        return 0.5 * (self.vertices[self.cells[:, 0]] + self.vertices[self.cells[:, 2]])
+
+    def to_mesh(self) -> 'Mesh':
+        """General Mesh of the leaf cells with their face neighbors"""
+        from .mesh import Mesh
+        # Vertex sharing would add diagonal cells and miss hanging-edge
+        # neighbors, so the face connectivity is passed on
+        neighbors = np.split(self.neighbors, self.neighbor_offsets[1:-1])
+        return Mesh(self.vertices, self.cells.tolist(), [n.tolist() for n in neighbors])
+
+    def to_amr(self, **kwargs) -> 'AMR':
+        """AMR over the leaf cells, starting from their quadtree levels"""
+        from .amr import AMR
+        amr = AMR(self.to_mesh(), **kwargs)
+        amr.cell_levels = self.levels.astype(int)
+        return amr
+
+def build_quadtree(levels: np.ndarray,
+                   extent: Tuple[float, float] = (1.0, 1.0)) -> QuadtreeMesh:
+    """
+    Quadtree mesh with connectivity from per-cell refinement levels
+
+    Args:
+        levels: Refinement level of each base cell (H, W)
+        extent: Domain size (x, y); base cell (i, j) covers columns j and
+            rows i of a uniform grid over [0, extent]
+
+    Returns:
+        Leaf cells, vertices and face connectivity
+    """
+    height, width = np.asarray(levels).shape
+    x, y, leaf_levels, base, finest = leaf_cells(levels)
+    size = finest >> leaf_levels.astype(np.int64)
+    span_x, span_y = width * finest, height * finest
+
+    # Corner vertices, deduplicated on the integer lattice of the finest level
+    corner_x = np.stack([x, x + size, x + size, x], axis=1)
+    corner_y = np.stack([y, y, y + size, y + size], axis=1)
+    corners = (corner_y * (span_x + 1) + corner_x).ravel()
+    order = np.argsort(corners)
+    keys = corners[order]
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = keys[1:] != keys[:-1]
+    cells = np.empty(len(corners), dtype=np.int64)
+    cells[order] = np.cumsum(first) - 1
+    vy, vx = np.divmod(keys[first], span_x + 1)
+    vertices = np.stack([vx * (extent[0] / span_x), vy * (extent[1] / span_y)], axis=1)
+
+    offsets, neighbors = _face_neighbors(x, y, size, span_x, span_y)
+    return QuadtreeMesh(
+        vertices=vertices,
+        cells=cells.reshape(-1, 4),
+        levels=leaf_levels,
+        base_cells=base,
+        neighbor_offsets=offsets,
+        neighbors=neighbors
+    )
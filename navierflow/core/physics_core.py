@@ -2,6 +2,7 @@ import taichi as ti
 import numpy as np
 from enum import Enum
 from typing import Dict, List, Optional, Tuple
+from .fields import FieldPool
 
 class PhysicsModel(Enum):
     NAVIER_STOKES = "navier_stokes"
@@ -18,34 +19,42 @@ class MultiPhysicsSolver:
         self.height = height
         self.models = models
         
+        # Fields are freed by release(), see FieldPool
+        self.fields = FieldPool()
+        
         # Core fields
-        self.velocity = ti.Vector.field(2, dtype=ti.f32, shape=(width, height))
-        self.pressure = ti.field(dtype=ti.f32, shape=(width, height))
+        self.velocity = self.fields.field(ti.f32, (width, height), n=2)
+        self.pressure = self.fields.field(ti.f32, (width, height))
         
         # Heat transfer fields
-        self.temperature = ti.field(dtype=ti.f32, shape=(width, height))
-        self.thermal_conductivity = ti.field(dtype=ti.f32, shape=(width, height))
+        self.temperature = self.fields.field(ti.f32, (width, height))
+        self.thermal_conductivity = self.fields.field(ti.f32, (width, height))
         
         # Electromagnetic fields
-        self.electric_field = ti.Vector.field(2, dtype=ti.f32, shape=(width, height))
-        self.magnetic_field = ti.field(dtype=ti.f32, shape=(width, height))
+        self.electric_field = self.fields.field(ti.f32, (width, height), n=2)
+        self.magnetic_field = self.fields.field(ti.f32, (width, height))
         
         # Multiphase fields
-        self.phase_field = ti.field(dtype=ti.i32, shape=(width, height))
-        self.surface_tension = ti.field(dtype=ti.f32, shape=(width, height))
+        self.phase_field = self.fields.field(ti.i32, (width, height))
+        self.surface_tension = self.fields.field(ti.f32, (width, height))
         
         # Turbulence modeling
-        self.turbulent_viscosity = ti.field(dtype=ti.f32, shape=(width, height))
-        self.turbulent_kinetic_energy = ti.field(dtype=ti.f32, shape=(width, height))
-        self.dissipation_rate = ti.field(dtype=ti.f32, shape=(width, height))
+        self.turbulent_viscosity = self.fields.field(ti.f32, (width, height))
+        self.turbulent_kinetic_energy = self.fields.field(ti.f32, (width, height))
+        self.dissipation_rate = self.fields.field(ti.f32, (width, height))
 
         # Material properties
-        self.viscosity = ti.field(dtype=ti.f32, shape=(width, height))
-        self.density = ti.field(dtype=ti.f32, shape=(width, height))
+        self.viscosity = self.fields.field(ti.f32, (width, height))
+        self.density = self.fields.field(ti.f32, (width, height))
+        self.fields.finalize()
         
         # Initialize solvers based on selected models
         self._initialize_solvers()
 
+    def release(self):
+        """Free the Taichi fields; the solver is unusable afterwards"""
+        self.fields.release()
+
     def _initialize_solvers(self):
         """Initialize specific solvers based on selected physics models"""
         if PhysicsModel.HEAT_TRANSFER in self.models:
@@ -0,0 +1,269 @@
+import taichi as ti
+import numpy as np
+from typing import Dict
+
+@ti.data_oriented
+class ParticlePool:
+    """
+    Growable pool of 2D particles with contiguous live storage.
+
+    Live particles always occupy slots [0, num_live). Seeding appends
+    through an exclusive prefix sum over candidate flags, so every writer
+    owns a unique, race-free slot. Deactivated particles are removed by
+    periodic stream compaction, and the pool grows geometrically up to a
+    hard capacity limit when seeding needs more room.
+
+    Fields are passed to kernels as template arguments so that kernels are
+    re-specialized automatically after the pool reallocates its storage.
+    """
+    def __init__(self, config: Dict = None):
+        self.config = {
+            'initial_capacity': 1024,
+            'max_capacity': 10000,
+            'growth_factor': 2.0,
+            'compaction_interval': 10,    # Steps between forced compactions
+            'compaction_threshold': 0.25, # Dead fraction that triggers compaction
+            'scan_block_size': 1024
+        }
+        if config:
+            self.config.update(config)
+
+        self.capacity = 0
+        self.num_live = 0
+        self.steps_since_compaction = 0
+        self.stats = {'seeded': 0, 'dropped': 0, 'compactions': 0, 'growths': 0}
+        self._scan_buffers = {}
+
+        capacity = min(self.config['initial_capacity'], self.config['max_capacity'])
+        self.positions, self.strengths, self.active = self._allocate(capacity)
+        self._scratch = self._allocate(capacity)
+        self.capacity = capacity
+        self._clear(self.active)
+
+    @staticmethod
+    def _allocate(capacity: int):
+        """Allocate one set of particle storage fields"""
+        return (ti.Vector.field(2, dtype=ti.f32, shape=capacity),
+                ti.Vector.field(2, dtype=ti.f32, shape=capacity),
+                ti.field(dtype=ti.i32, shape=capacity))
+
+    @ti.kernel
+    def _clear(self, active: ti.template()):
+        for i in active:
+            active[i] = 0
+
+    # Prefix sum ------------------------------------------------------------
+
+    def _scan_storage(self, purpose: str, n: int):
+        """Return (flags, block_sums) scratch fields sized for n entries"""
+        key = (purpose, n)
+        if key not in self._scan_buffers:
+            block = self.config['scan_block_size']
+            self._scan_buffers[key] = (ti.field(dtype=ti.i32, shape=max(n, 1)),
+                                       ti.field(dtype=ti.i32, shape=max((n + block - 1) // block, 1)))
+        return self._scan_buffers[key]
+
+    @ti.kernel
+    def _block_scan(self, data: ti.template(), block_sums: ti.template(),
+                    n: ti.i32, block: ti.i32):
+        """Exclusive scan inside each block; blocks run in parallel"""
+        for b in range(block_sums.shape[0]):
+            acc = 0
+            for k in range(block):
+                i = b * block + k
+                if i < n:
+                    value = data[i]
+                    data[i] = acc
+                    acc += value
+            block_sums[b] = acc
+
+    @ti.kernel
+    def _scan_block_sums(self, block_sums: ti.template()) -> ti.i32:
+        """Serial exclusive scan over the (few) block totals"""
+        acc = 0
+        ti.loop_config(serialize=True)
+        for b in range(block_sums.shape[0]):
+            value = block_sums[b]
+            block_sums[b] = acc
+            acc += value
+        return acc
+
+    @ti.kernel
+    def _add_block_offsets(self, data: ti.template(), block_sums: ti.template(),
+                           n: ti.i32, block: ti.i32):
+        for i in range(n):
+            data[i] += block_sums[i // block]
+
+    def exclusive_scan(self, data: ti.template(), block_sums: ti.template(), n: int) -> int:
+        """
+        In-place exclusive prefix sum of data[:n]
+
+        Returns:
+            Sum of all entries
+        """
+        block = self.config['scan_block_size']
+        self._block_scan(data, block_sums, n, block)
+        total = self._scan_block_sums(block_sums)
+        self._add_block_offsets(data, block_sums, n, block)
+        return total
+
+    # Seeding ---------------------------------------------------------------
+
+    @ti.kernel
+    def _flag_cells(self, vorticity: ti.template(), flags: ti.template(),
+                    threshold: ti.f32):
+        for i, j in vorticity:
+            flags[i * vorticity.shape[1] + j] = ti.select(ti.abs(vorticity[i, j]) > threshold, 1, 0)
+
+    @ti.kernel
+    def _scatter_seeds(self, vorticity: ti.template(), flags: ti.template(),
+                       positions: ti.template(), strengths: ti.template(),
+                       active: ti.template(), threshold: ti.f32,
+                       base: ti.i32, limit: ti.i32):
+        for i, j in vorticity:
+            if ti.abs(vorticity[i, j]) > threshold:
+                dst = base + flags[i * vorticity.shape[1] + j]
+                if dst < limit:
+                    active[dst] = 1
+                    positions[dst] = ti.Vector([float(i), float(j)])
+                    strengths[dst] = ti.Vector([0.0, vorticity[i, j]])
+
+    def seed_from_field(self, vorticity: ti.template(), threshold: float,
+                        append: bool = False) -> int:
+        """
+        Seed one particle per grid cell whose |vorticity| exceeds threshold
+
+        Args:
+            vorticity: Scalar Taichi field of shape (W, H)
+            threshold: Minimum vorticity magnitude
+            append: Keep existing particles instead of resetting the pool
+
+        Returns:
+            Number of particles seeded
+        """
+        if not append:
+            self._clear(self.active)
+            self.num_live = 0
+
+        n = vorticity.shape[0] * vorticity.shape[1]
+        flags, block_sums = self._scan_storage('seed', n)
+        self._flag_cells(vorticity, flags, threshold)
+        requested = self.exclusive_scan(flags, block_sums, n)
+
+        self.reserve(requested)
+        limit = self.capacity
+        self._scatter_seeds(vorticity, flags, self.positions, self.strengths,
+                            self.active, threshold, self.num_live, limit)
+
+        seeded = min(requested, limit - self.num_live)
+        self.num_live += seeded
+        self.stats['seeded'] += seeded
+        self.stats['dropped'] += requested - seeded
+        return seeded
+
+    # Capacity --------------------------------------------------------------
+
+    @ti.kernel
+    def _copy_live(self, src_pos: ti.template(), src_str: ti.template(),
+                   src_act: ti.template(), dst_pos: ti.template(),
+                   dst_str: ti.template(), dst_act: ti.template(), n: ti.i32):
+        for i in dst_act:
+            if i < n:
+                dst_pos[i] = src_pos[i]
+                dst_str[i] = src_str[i]
+                dst_act[i] = src_act[i]
+            else:
+                dst_act[i] = 0
+
+    def reserve(self, extra: int):
+        """Make room for extra particles past the live range, growing geometrically"""
+        if self.num_live + extra <= self.capacity:
+            return
+
+        # Compacting first can avoid the reallocation entirely
+        if self._count_live(self.active, self.num_live) < self.num_live:
+            self.compact()
+        required = self.num_live + extra
+        if required <= self.capacity or self.capacity >= self.config['max_capacity']:
+            return
+        capacity = max(required, int(np.ceil(self.capacity * self.config['growth_factor'])))
+        capacity = min(capacity, self.config['max_capacity'])
+
+        new_fields = self._allocate(capacity)
+        self._copy_live(self.positions, self.strengths, self.active, *new_fields, self.num_live)
+        self.positions, self.strengths, self.active = new_fields
+        self._scratch = self._allocate(capacity)
+        self.capacity = capacity
+        self.stats['growths'] += 1
+
+    # Compaction ------------------------------------------------------------
+
+    @ti.kernel
+    def _flag_live(self, active: ti.template(), flags: ti.template(), n: ti.i32):
+        for i in range(n):
+            flags[i] = active[i]
+
+    @ti.kernel
+    def _scatter_live(self, flags: ti.template(), src_pos: ti.template(),
+                      src_str: ti.template(), src_act: ti.template(),
+                      dst_pos: ti.template(), dst_str: ti.template(),
+                      dst_act: ti.template(), n: ti.i32, live: ti.i32):
+        for i in dst_act:
+            if i < n and src_act[i] == 1:
+                dst = flags[i]
+                dst_pos[dst] = src_pos[i]
+                dst_str[dst] = src_str[i]
+                dst_act[dst] = 1
+            if i >= live:
+                dst_act[i] = 0
+
+    @ti.kernel
+    def _count_live(self, active: ti.template(), n: ti.i32) -> ti.i32:
+        count = 0
+        for i in range(n):
+            count += active[i]
+        return count
+
+    def compact(self):
+        """Stream-compact live particles into [0, num_live)"""
+        n = self.num_live
+        if n == 0:
+            return
+        flags, block_sums = self._scan_storage('compact', self.capacity)
+        self._flag_live(self.active, flags, n)
+        live = self.exclusive_scan(flags, block_sums, n)
+        self._scatter_live(flags, self.positions, self.strengths, self.active,
+                           *self._scratch, n, live)
+
+        # Swap the live and scratch buffers
+        scratch = self._scratch
+        self._scratch = (self.positions, self.strengths, self.active)
+        self.positions, self.strengths, self.active = scratch
+        self.num_live = live
+        self.steps_since_compaction = 0
+        self.stats['compactions'] += 1
+
+    def step(self):
+        """Advance the compaction schedule; compact when due and sparse enough"""
+        self.steps_since_compaction += 1
+        if self.num_live == 0:
+            return
+        due = self.steps_since_compaction >= self.config['compaction_interval']
+        if due:
+            dead_fraction = 1.0 - self._count_live(self.active, self.num_live) / self.num_live
+            if dead_fraction >= self.config['compaction_threshold']:
+                self.compact()
+            else:
+                self.steps_since_compaction = 0
+
+    # Host access -----------------------------------------------------------
+
+    def live_mask(self) -> np.ndarray:
+        """Return the active flags of the live range"""
+        return self.active.to_numpy()[:self.num_live] == 1
+
+    def get_positions(self) -> np.ndarray:
+        return self.positions.to_numpy()[:self.num_live][self.live_mask()]
+
+    def get_strengths(self) -> np.ndarray:
+        return self.strengths.to_numpy()[:self.num_live][self.live_mask()]
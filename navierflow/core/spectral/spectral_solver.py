@@ -1,7 +1,8 @@
 import numpy as np
 import taichi as ti
 from typing import Dict, List, Optional, Tuple
-from scipy.fft import fft2, ifft2
+from .pseudo_spectral import PseudoSpectralEngine
+from ..turbulence.statistics import TurbulenceStatistics, structure_functions
 
 @ti.data_oriented
 class SpectralSolver:
@@ -28,7 +29,12 @@ class SpectralSolver:
             'time_scheme': 'etdrk4',  # 'etdrk4' or 'ab3'
             'enable_rotation': False,
             'enable_stratification': False,
-            'enable_mhd': False  # Magnetohydrodynamics
+            'enable_mhd': False,  # Magnetohydrodynamics
+            'fft_backend': 'scipy',  # 'scipy', 'pyfftw', 'torch'
+            'fft_workers': -1,
+            'contour_points': 32,
+            'statistics_interval': 0,  # Steps between accumulated snapshots, 0 to disable
+            'structure_functions': False
         }
         if config:
             self.config.update(config)
@@ -37,14 +43,28 @@ class SpectralSolver:
         self.velocity = ti.Vector.field(2, dtype=ti.f32, shape=(width, height))
         self.vorticity = ti.field(dtype=ti.f32, shape=(width, height))
         
-        # Spectral space fields
-        self.velocity_hat = ti.Vector.field(2, dtype=ti.complex64, shape=(width, height))
-        self.vorticity_hat = ti.field(dtype=ti.complex64, shape=(width, height))
-        
-        # Wavenumbers
-        self.kx = ti.field(dtype=ti.f32, shape=width)
-        self.ky = ti.field(dtype=ti.f32, shape=height)
-        self.k2 = ti.field(dtype=ti.f32, shape=(width, height))
+        # Spectral state lives in rfft2 half-spectrum arrays on the host
+        self.engine = PseudoSpectralEngine(width, height, {
+            'viscosity': self.config['viscosity'],
+            'dt': self.config['dt'],
+            'dealiasing': self.config['dealiasing'],
+            'contour_points': self.config['contour_points'],
+            'fft_backend': self.config['fft_backend'],
+            'fft_workers': self.config['fft_workers']
+        })
+        
+        # Time-averaged turbulence statistics (periodic domain)
+        self.statistics = TurbulenceStatistics((width, height), {
+            'periodic': True,
+            'structure_functions': self.config['structure_functions'],
+            'fft_backend': self.config['fft_backend']
+        })
+        self.step_count = 0
+        
+        # Wavenumbers (half spectrum)
+        self.kx = self.engine.kx
+        self.ky = self.engine.ky
+        self.k2 = self.engine.k2
         
         # Additional physics
         if self.config['enable_rotation']:
@@ -62,119 +82,74 @@ class SpectralSolver:
         
     @ti.kernel
     def initialize_fields(self):
-        """Initialize fields and wavenumbers"""
-        # Initialize wavenumbers
-        for i in range(self.width):
-            self.kx[i] = 2.0 * np.pi * (i - self.width//2) / self.width
-            
-        for j in range(self.height):
-            self.ky[j] = 2.0 * np.pi * (j - self.height//2) / self.height
-            
-        for i, j in self.k2:
-            self.k2[i, j] = self.kx[i]**2 + self.ky[j]**2
-            
-        # Initialize fields
+        """Initialize physical space fields"""
         for i, j in self.velocity:
             self.velocity[i, j] = ti.Vector([0.0, 0.0])
             self.vorticity[i, j] = 0.0
             
-            if self.config['enable_rotation']:
+            if ti.static(self.config['enable_rotation']):
                 self.coriolis[i, j] = 0.0
                 
-            if self.config['enable_stratification']:
+            if ti.static(self.config['enable_stratification']):
                 self.temperature[i, j] = 300.0  # Base temperature
                 self.density[i, j] = 1.0
                 
-            if self.config['enable_mhd']:
+            if ti.static(self.config['enable_mhd']):
                 self.magnetic_field[i, j] = ti.Vector([0.0, 0.0, 0.0])
                 self.current_density[i, j] = ti.Vector([0.0, 0.0, 0.0])
 
+    @property
+    def vorticity_hat(self) -> np.ndarray:
+        """Vorticity in rfft2 half-spectrum layout"""
+        return self.engine.omega_hat
+        
+    @property
+    def velocity_hat(self) -> np.ndarray:
+        """Velocity in rfft2 half-spectrum layout, shape (2, W, H//2 + 1)"""
+        return self.engine.velocity_hat()
+        
     def forward_transform(self, field: np.ndarray) -> np.ndarray:
         """Transform field to spectral space"""
-        return fft2(field)
+        return self.engine.forward(field)
         
     def inverse_transform(self, field_hat: np.ndarray) -> np.ndarray:
         """Transform field back to physical space"""
-        return np.real(ifft2(field_hat))
+        return self.engine.inverse(field_hat)
         
-    @ti.kernel
-    def compute_nonlinear_terms(self):
-        """Compute nonlinear terms using pseudo-spectral method"""
-        # Transform velocity to physical space
-        vel_phys = self.inverse_transform(self.velocity_hat.to_numpy())
+    def set_velocity(self, velocity: np.ndarray):
+        """Set the initial velocity field of shape (W, H, 2)"""
+        self.engine.set_velocity(velocity)
+        self.update_physical_fields()
         
-        # Compute nonlinear terms in physical space
-        for i, j in self.velocity:
-            # Advection term
-            adv = -(vel_phys[i, j].dot(ti.Vector([
-                self.kx[i] * self.velocity_hat[i, j].x,
-                self.ky[j] * self.velocity_hat[i, j].y
-            ])))
-            
-            # Additional physics
-            if self.config['enable_rotation']:
-                adv += self.coriolis[i, j] * ti.Vector([-vel_phys[i, j].y, vel_phys[i, j].x])
-                
-            if self.config['enable_stratification']:
-                adv += ti.Vector([0.0, -9.81 * (self.density[i, j] - 1.0)])
-                
-            if self.config['enable_mhd']:
-                # Lorentz force
-                j = self.current_density[i, j]
-                b = self.magnetic_field[i, j]
-                adv += j.cross(b)
-                
-            # Transform back to spectral space
-            self.velocity_hat[i, j] = self.forward_transform(adv)
+    def set_vorticity(self, vorticity: np.ndarray):
+        """Set the initial vorticity field of shape (W, H)"""
+        self.engine.set_vorticity(vorticity)
+        self.update_physical_fields()
+        
+    def compute_nonlinear_terms(self, omega_hat: Optional[np.ndarray] = None) -> np.ndarray:
+        """Compute dealiased nonlinear terms using pseudo-spectral method"""
+        return self.engine.nonlinear(self.engine.omega_hat if omega_hat is None else omega_hat)
             
     def etdrk4_step(self):
         """Time integration using fourth-order exponential time differencing"""
-        dt = self.config['dt']
-        nu = self.config['viscosity']
-        
-        # Linear operator
-        L = -nu * self.k2
-        E = np.exp(dt * L)
-        E2 = np.exp(dt * L / 2)
-        
-        # Nonlinear terms
-        N = self.compute_nonlinear_terms()
-        
-        # ETDRK4 coefficients
-        f1 = dt * N
-        f2 = dt * self.compute_nonlinear_terms(E2 * self.velocity_hat + f1/2)
-        f3 = dt * self.compute_nonlinear_terms(E2 * self.velocity_hat + f2/2)
-        f4 = dt * self.compute_nonlinear_terms(E * self.velocity_hat + E2 * f3)
-        
-        # Update
-        self.velocity_hat = E * self.velocity_hat + \
-                          E * (f1 + 2 * f2 + 2 * f3 + f4) / 6
-                          
-        # Apply dealiasing if enabled
-        if self.config['dealiasing']:
-            self.apply_dealiasing()
+        self.engine.etdrk4_step(self.config['dt'])
             
     def apply_dealiasing(self):
         """Apply 2/3 rule for dealiasing"""
-        kmax_x = int(2 * self.width / 3)
-        kmax_y = int(2 * self.height / 3)
-        
-        for i, j in self.velocity_hat:
-            if abs(i - self.width/2) > kmax_x or abs(j - self.height/2) > kmax_y:
-                self.velocity_hat[i, j] = ti.Vector([0.0, 0.0])
+        self.engine.omega_hat *= self.engine.dealias_mask
                 
     def compute_energy_spectrum(self) -> np.ndarray:
         """Compute kinetic energy spectrum"""
-        v_hat = self.velocity_hat.to_numpy()
-        E = np.zeros(min(self.width, self.height)//2)
+        return self.engine.energy_spectrum()
+        
+    def compute_structure_functions(self, max_separation: Optional[int] = None) -> Dict:
+        """Compute longitudinal and transverse structure functions of the current state"""
+        return structure_functions(self.engine.velocity(), max_separation, periodic=True)
         
-        for i in range(self.width):
-            for j in range(self.height):
-                k = int(np.sqrt(self.k2[i, j]))
-                if k < len(E):
-                    E[k] += np.abs(v_hat[i, j])**2
-                    
-        return E
+    def accumulate_statistics(self):
+        """Fold the current state into the time-averaged statistics"""
+        velocity = self.engine.velocity() if self.config['structure_functions'] else None
+        self.statistics.add_spectral_snapshot(self.engine.velocity_hat(), velocity)
         
     def compute_enstrophy(self) -> float:
         """Compute total enstrophy"""
@@ -189,8 +164,12 @@ class SpectralSolver:
             pass
             
         # Update physical space fields
-        self.velocity.from_numpy(self.inverse_transform(self.velocity_hat))
-        self.vorticity.from_numpy(self.compute_vorticity())
+        self.update_physical_fields()
+        
+        self.step_count += 1
+        interval = self.config['statistics_interval']
+        if interval > 0 and self.step_count % interval == 0:
+            self.accumulate_statistics()
         
         # Update additional physics
         if self.config['enable_mhd']:
@@ -199,6 +178,11 @@ class SpectralSolver:
         if self.config['enable_stratification']:
             self.update_stratification()
             
+    def update_physical_fields(self):
+        """Copy the spectral state back to the physical space fields"""
+        self.velocity.from_numpy(self.engine.velocity().astype(np.float32))
+        self.vorticity.from_numpy(self.engine.vorticity().astype(np.float32))
+        
     def update_magnetic_field(self):
         """Update magnetic field for MHD simulations"""
         if not self.config['enable_mhd']:
@@ -1,6 +1,8 @@
 import taichi as ti
 import numpy as np
 from typing import Dict, List, Optional, Tuple
+from .particle_velocity import ParticleVelocityEngine
+from .particle_pool import ParticlePool
 
 @ti.data_oriented
 class VortexMethods:
@@ -19,24 +21,42 @@ class VortexMethods:
         # Default configuration
         self.config = {
             'max_vortex_particles': 10000,
+            'initial_particle_capacity': 1024,
+            'particle_growth_factor': 2.0,
+            'compaction_interval': 10,
+            'compaction_threshold': 0.25,
             'particle_strength': 0.1,
             'core_size': 0.1,
             'enable_stretching': True,
             'enable_diffusion': True,
             'enable_reconnection': True,
             'reconnection_threshold': 0.1,
-            'helicity_preservation': True
+            'helicity_preservation': True,
+            'velocity_method': 'grid',  # 'grid', 'direct', 'tree', 'fmm'
+            'expansion_order': 12,
+            'leaf_size': 8,
+            'pse_diffusion': False,
+            'viscosity': 1e-6
         }
         if config:
             self.config.update(config)
             
-        # Vortex particle fields
-        self.particle_positions = ti.Vector.field(2, dtype=ti.f32, 
-                                               shape=self.config['max_vortex_particles'])
-        self.particle_strengths = ti.Vector.field(2, dtype=ti.f32,
-                                               shape=self.config['max_vortex_particles'])
-        self.particle_active = ti.field(dtype=ti.i32,
-                                     shape=self.config['max_vortex_particles'])
+        # Lagrangian velocity evaluation (Biot-Savart) and PSE diffusion
+        self.velocity_engine = ParticleVelocityEngine({
+            'method': self.config['velocity_method'],
+            'expansion_order': self.config['expansion_order'],
+            'leaf_size': self.config['leaf_size'],
+            'core_size': self.config['core_size']
+        })
+            
+        # Vortex particle pool (live particles are kept contiguous)
+        self.particles = ParticlePool({
+            'initial_capacity': self.config['initial_particle_capacity'],
+            'max_capacity': self.config['max_vortex_particles'],
+            'growth_factor': self.config['particle_growth_factor'],
+            'compaction_interval': self.config['compaction_interval'],
+            'compaction_threshold': self.config['compaction_threshold']
+        })
         
         # Vortex filament fields
         self.filament_points = ti.Vector.field(2, dtype=ti.f32,
@@ -60,15 +80,21 @@ class VortexMethods:
         
         self.initialize_fields()
         
+    @property
+    def particle_positions(self):
+        return self.particles.positions
+        
+    @property
+    def particle_strengths(self):
+        return self.particles.strengths
+        
+    @property
+    def particle_active(self):
+        return self.particles.active
+        
     @ti.kernel
     def initialize_fields(self):
         """Initialize vortex fields"""
-        # Initialize vortex particles
-        for i in range(self.config['max_vortex_particles']):
-            self.particle_active[i] = 0
-            self.particle_positions[i] = ti.Vector([0.0, 0.0])
-            self.particle_strengths[i] = ti.Vector([0.0, 0.0])
-            
         # Initialize vortex filaments and sheets
         for i, j in self.filament_points:
             self.filament_points[i, j] = ti.Vector([float(i), float(j)])
@@ -79,49 +105,80 @@ class VortexMethods:
             self.helicity_density[i, j] = 0.0
             self.relative_helicity[i, j] = 0.0
             
-    @ti.kernel
-    def seed_vortex_particles(self, vorticity: ti.template()):
+    def seed_vortex_particles(self, vorticity: ti.template(), threshold: float = 0.1,
+                              append: bool = False) -> int:
         """Seed vortex particles based on vorticity field"""
-        threshold = 0.1  # Minimum vorticity magnitude
-        particle_count = 0
+        return self.particles.seed_from_field(vorticity, threshold, append)
         
-        for i, j in vorticity:
-            if particle_count < self.config['max_vortex_particles']:
-                vort_mag = ti.abs(vorticity[i, j])
-                if vort_mag > threshold:
-                    idx = ti.atomic_add(particle_count, 1)
-                    self.particle_active[idx] = 1
-                    self.particle_positions[idx] = ti.Vector([float(i), float(j)])
-                    self.particle_strengths[idx] = ti.Vector([0.0, vorticity[i, j]])
-                    
-    @ti.kernel
-    def update_vortex_particles(self, velocity: ti.template(), dt: ti.f32):
+    def update_vortex_particles(self, velocity, dt: float):
         """Update vortex particle positions and strengths"""
-        for i in range(self.config['max_vortex_particles']):
-            if self.particle_active[i] == 1:
-                pos = self.particle_positions[i]
+        if self.config['velocity_method'] == 'grid':
+            self.update_vortex_particles_grid(velocity, dt)
+        else:
+            self.update_vortex_particles_biot_savart(dt)
+            
+    def update_vortex_particles_biot_savart(self, dt: float):
+        """Advect particles with their own Biot-Savart velocity"""
+        n = self.particles.num_live
+        positions = self.particle_positions.to_numpy()
+        strengths = self.particle_strengths.to_numpy()
+        active = np.zeros(len(positions), dtype=bool)
+        active[:n] = self.particles.live_mask()
+        
+        # 2D particles carry their circulation in the second strength component
+        pos = positions[active].astype(np.float64)
+        circulation = strengths[active, 1].astype(np.float64)
+        
+        vel = self.velocity_engine.compute_velocity(pos, circulation)
+        positions[active] = pos + vel * dt
+        
+        if self.config['enable_diffusion'] and self.config['pse_diffusion']:
+            rate = self.velocity_engine.compute_pse(
+                pos, circulation, np.ones(len(pos)), self.config['viscosity']
+            )
+            strengths[active, 1] = circulation + rate * dt
+            self.particle_strengths.from_numpy(strengths)
+            
+        self.particle_positions.from_numpy(positions)
+        self.particles.step()
+        
+    def update_vortex_particles_grid(self, velocity: ti.template(), dt: float):
+        """Update vortex particles from an interpolated grid velocity"""
+        self._advect_particles_grid(velocity, self.particle_positions,
+                                    self.particle_strengths, self.particle_active,
+                                    self.particles.num_live, dt)
+        self.particles.step()
+        
+    @ti.kernel
+    def _advect_particles_grid(self, velocity: ti.template(), positions: ti.template(),
+                               strengths: ti.template(), active: ti.template(),
+                               num_live: ti.i32, dt: ti.f32):
+        """Advect live particles with the interpolated grid velocity"""
+        for i in range(num_live):
+            if active[i] == 1:
+                pos = positions[i]
                 
                 # Advection
                 vel = self.interpolate_velocity(velocity, pos)
-                self.particle_positions[i] += vel * dt
+                positions[i] += vel * dt
                 
                 # Stretching
-                if self.config['enable_stretching']:
+                if ti.static(self.config['enable_stretching']):
                     stretch = self.compute_stretching(velocity, pos)
-                    self.particle_strengths[i] += stretch * dt
+                    strengths[i] += stretch * dt
                     
                 # Diffusion
-                if self.config['enable_diffusion']:
-                    self.particle_strengths[i] += self.compute_diffusion(i, dt)
+                if ti.static(self.config['enable_diffusion']):
+                    strengths[i] += self.compute_diffusion(i, dt)
                     
     @ti.func
     def interpolate_velocity(self, velocity: ti.template(),
                            pos: ti.template()) -> ti.Vector:
         """Bilinear interpolation of velocity field"""
-        x = pos.x
-        y = pos.y
-        x0 = ti.floor(x)
-        y0 = ti.floor(y)
+        x = ti.min(ti.max(pos.x, 0.0), self.width - 1.001)
+        y = ti.min(ti.max(pos.y, 0.0), self.height - 1.001)
+        x0 = ti.floor(x, ti.i32)
+        y0 = ti.floor(y, ti.i32)
         x1 = x0 + 1
         y1 = y0 + 1
         
@@ -201,8 +258,8 @@ class VortexMethods:
         sigma = ti.sqrt(2.0 * nu * dt)
         
         return ti.Vector([
-            ti.random.gauss(0.0, sigma),
-            ti.random.gauss(0.0, sigma)
+            ti.randn() * sigma,
+            ti.randn() * sigma
         ])
         
     @ti.func
@@ -238,15 +295,11 @@ class VortexMethods:
         
     def get_particle_positions(self) -> np.ndarray:
         """Return active particle positions"""
-        return self.particle_positions.to_numpy()[
-            self.particle_active.to_numpy() == 1
-        ]
+        return self.particles.get_positions()
         
     def get_particle_strengths(self) -> np.ndarray:
         """Return active particle strengths"""
-        return self.particle_strengths.to_numpy()[
-            self.particle_active.to_numpy() == 1
-        ]
+        return self.particles.get_strengths()
         
     def get_helicity_field(self) -> np.ndarray:
         """Return helicity density field"""
@@ -0,0 +1,138 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Sequence, Tuple
+import torch
+
+@dataclass
+class Stage:
+    """One unit of work in a simulation step"""
+    name: str
+    fn: Callable[[Dict[str, Any]], Any]  # Receives the results of its dependencies
+    depends_on: Tuple[str, ...] = ()
+
+class StageScheduler:
+    """
+    Device-agnostic concurrent execution of simulation stages.
+
+    Stages are submitted to a thread pool as soon as their dependencies
+    have finished, so independent stages overlap. Taichi kernels and torch
+    ops release the GIL, which makes threads effective on CPU. On CUDA each
+    stage additionally runs on its own stream and only synchronizes that
+    stream in its worker thread, so GPU work of independent stages can
+    overlap as well.
+
+    Per-stage wall times, the step time and the overlap efficiency are
+    recorded after every run. The efficiency is 0 for fully serialized
+    stages and 1 when the step takes no longer than its critical path.
+
+    The worker threads stay alive between runs; call shutdown() when done,
+    or use the scheduler as a context manager.
+    """
+    def __init__(self, config: Dict = None):
+        self.config = {
+            'device': 'auto',       # 'auto', 'cpu' or 'cuda'
+            'max_workers': 4
+        }
+        if config:
+            self.config.update(config)
+
+        device = self.config['device']
+        if device == 'auto':
+            device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        self.device = torch.device(device)
+        self._executor = ThreadPoolExecutor(max_workers=self.config['max_workers'],
+                                            thread_name_prefix="stage")
+        self._streams: Dict[str, "torch.cuda.Stream"] = {}
+        self.metrics = {
+            'stage_times': {},          # ms
+            'step_time': 0.0,           # ms
+            'critical_path': 0.0,       # ms
+            'overlap_efficiency': 0.0
+        }
+
+    def _stream(self, name: str) -> "torch.cuda.Stream":
+        if name not in self._streams:
+            self._streams[name] = torch.cuda.Stream(device=self.device)
+        return self._streams[name]
+
+    def _run_stage(self, stage: Stage, inputs: Dict[str, Any]) -> Tuple[Any, float]:
+        start = time.perf_counter()
+        if self.device.type == 'cuda':
+            stream = self._stream(stage.name)
+            with torch.cuda.stream(stream):
+                result = stage.fn(inputs)
+            stream.synchronize()
+        else:
+            result = stage.fn(inputs)
+        return result, (time.perf_counter() - start) * 1000.0
+
+    def run(self, stages: Sequence[Stage]) -> Dict[str, Any]:
+        """
+        Run one step's stages, respecting their dependencies
+
+        Args:
+            stages: Stages to run; dependencies must name other stages
+
+        Returns:
+            Results keyed by stage name
+        """
+        names = {stage.name for stage in stages}
+        for stage in stages:
+            missing = set(stage.depends_on) - names
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages {sorted(missing)}")
+
+        start = time.perf_counter()
+        pending = list(stages)
+        running: Dict[Future, Stage] = {}
+        results: Dict[str, Any] = {}
+        times: Dict[str, float] = {}
+
+        while pending or running:
+            for stage in [s for s in pending if all(d in results for d in s.depends_on)]:
+                inputs = {d: results[d] for d in stage.depends_on}
+                running[self._executor.submit(self._run_stage, stage, inputs)] = stage
+                pending.remove(stage)
+            if not running:
+                raise ValueError("Stage dependencies contain a cycle")
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                results[stage.name], times[stage.name] = future.result()
+
+        self._record(stages, times, (time.perf_counter() - start) * 1000.0)
+        return results
+
+    def _record(self, stages: Sequence[Stage], times: Dict[str, float], step_time: float):
+        # Longest dependency chain; stages are resolved in dependency order
+        finish: Dict[str, float] = {}
+        remaining = list(stages)
+        while remaining:
+            for stage in [s for s in remaining if all(d in finish for d in s.depends_on)]:
+                finish[stage.name] = times[stage.name] + max(
+                    (finish[d] for d in stage.depends_on), default=0.0)
+                remaining.remove(stage)
+        critical = max(finish.values(), default=0.0)
+        serial = sum(times.values())
+
+        if serial - critical > 1e-9:
+            efficiency = (serial - step_time) / (serial - critical)
+        else:
+            efficiency = 1.0
+        self.metrics = {
+            'stage_times': times,
+            'step_time': step_time,
+            'critical_path': critical,
+            'overlap_efficiency': min(max(efficiency, 0.0), 1.0)
+        }
+
+    def shutdown(self):
+        """Stop the worker threads; later calls do nothing"""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
@@ -0,0 +1,422 @@
+import numpy as np
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+from ...utils.fft_backend import get_fft_backend, fftfreq, rfftfreq
+
+@lru_cache(maxsize=32)
+def shell_bins(shape: Tuple[int, int], dx: float = 1.0,
+               n_bins: Optional[int] = None) -> Tuple[np.ndarray, ...]:
+    """
+    Wavenumber-shell binning for an rfft2 half spectrum, cached per grid
+
+    Shell s collects the modes with round(|k| / dk) == s, where dk is the
+    fundamental wavenumber of the shorter side. Modes beyond the last shell
+    are sent to an overflow bin that callers drop.
+
+    Args:
+        shape: Physical grid shape (W, H)
+        dx: Grid spacing
+        n_bins: Number of shells (default min(W, H) // 2)
+
+    Returns:
+        (shell index per half-spectrum mode (flattened), Hermitian weight
+        per mode (flattened), shell wavenumbers, modes per shell)
+    """
+    width, height = shape
+    n_bins = n_bins or min(width, height) // 2
+    kx = 2.0 * np.pi * fftfreq(width, dx)
+    ky = 2.0 * np.pi * rfftfreq(height, dx)
+    dk = 2.0 * np.pi / (min(width, height) * dx)
+    k_mag = np.sqrt(kx[:, None] ** 2 + ky[None, :] ** 2)
+    index = np.minimum(np.rint(k_mag / dk).astype(np.int64), n_bins).ravel()
+
+    # Each interior column of the half spectrum stands for two full-spectrum modes
+    weights = np.full((width, height // 2 + 1), 2.0)
+    weights[:, 0] = 1.0
+    if height % 2 == 0:
+        weights[:, -1] = 1.0
+    weights = weights.ravel()
+
+    counts = np.bincount(index, weights=weights, minlength=n_bins + 1)[:n_bins]
+    k = dk * np.arange(n_bins)
+    for array in (index, weights, k, counts):
+        array.setflags(write=False)
+    return index, weights, k, counts
+
+def spectrum_from_hat(velocity_hat: np.ndarray, shape: Tuple[int, int],
+                      dx: float = 1.0, n_bins: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Shell-summed kinetic energy spectrum from half-spectrum velocity
+
+    Args:
+        velocity_hat: rfft2 velocity of shape (C, W, H//2 + 1)
+        shape: Physical grid shape (W, H)
+        dx: Grid spacing
+        n_bins: Number of shells
+
+    Returns:
+        (k, E(k)); E sums to the mean kinetic energy 0.5 <|u|^2>
+    """
+    index, weights, k, _ = shell_bins(tuple(shape), float(dx), n_bins)
+    energy = 0.5 * np.sum(np.abs(velocity_hat) ** 2, axis=0).ravel() * weights
+    energy /= float(shape[0] * shape[1]) ** 2
+    spectrum = np.bincount(index, weights=energy, minlength=len(k) + 1)[:len(k)]
+    return k, spectrum
+
+def energy_spectrum(velocity: np.ndarray, dx: float = 1.0, n_bins: Optional[int] = None,
+                    backend: str = 'scipy') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Shell-summed kinetic energy spectrum of a physical velocity field
+
+    Args:
+        velocity: Velocity field of shape (W, H, C); the first two
+            components are used
+        dx: Grid spacing
+        n_bins: Number of shells
+        backend: FFT backend name
+
+    Returns:
+        (k, E(k))
+    """
+    components = np.moveaxis(np.asarray(velocity)[..., :2], -1, 0)
+    velocity_hat = get_fft_backend(backend).rfftn(components, axes=(-2, -1))
+    return spectrum_from_hat(velocity_hat, components.shape[1:], dx, n_bins)
+
+def structure_functions(velocity: np.ndarray, max_separation: Optional[int] = None,
+                        orders: Sequence[int] = (2, 3), dx: float = 1.0,
+                        periodic: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Longitudinal and transverse velocity structure functions
+
+    S_p(r) = <(delta u)^p> with delta u the velocity increment over r
+    along x and y, averaged over both directions. Odd orders keep their
+    sign, so S_3 carries the energy-cascade direction.
+
+    Args:
+        velocity: Velocity field of shape (W, H, C)
+        max_separation: Largest separation in cells (default min(W, H) // 4)
+        orders: Moments to evaluate
+        dx: Grid spacing
+        periodic: Wrap increments around the domain
+
+    Returns:
+        Dict with 'r', 'orders', and 'longitudinal' / 'transverse' arrays
+        of shape (len(orders), R)
+    """
+    u = np.asarray(velocity[..., 0], dtype=np.float64)
+    v = np.asarray(velocity[..., 1], dtype=np.float64)
+    max_separation = max_separation or max(min(u.shape) // 4, 1)
+    separations = np.arange(1, max_separation + 1)
+    orders = tuple(orders)
+    longitudinal = np.zeros((len(orders), len(separations)))
+    transverse = np.zeros((len(orders), len(separations)))
+
+    def increments(f, r, axis):
+        if periodic:
+            return np.roll(f, -r, axis=axis) - f
+        ahead = [slice(None)] * f.ndim
+        behind = [slice(None)] * f.ndim
+        ahead[axis] = slice(r, None)
+        behind[axis] = slice(None, -r)
+        return f[tuple(ahead)] - f[tuple(behind)]
+
+    for n, r in enumerate(separations):
+        # Longitudinal: component along the separation; transverse: across it
+        dl = (increments(u, r, 0).ravel(), increments(v, r, 1).ravel())
+        dt = (increments(v, r, 0).ravel(), increments(u, r, 1).ravel())
+        for m, p in enumerate(orders):
+            longitudinal[m, n] = 0.5 * (np.mean(dl[0] ** p) + np.mean(dl[1] ** p))
+            transverse[m, n] = 0.5 * (np.mean(dt[0] ** p) + np.mean(dt[1] ** p))
+
+    return {
+        'r': separations * dx,
+        'orders': np.array(orders),
+        'longitudinal': longitudinal,
+        'transverse': transverse
+    }
+
+class TurbulenceStatistics:
+    """
+    Time-averaged spectra and structure functions over streaming snapshots.
+
+    Snapshots are folded into running sums as they arrive, so arbitrarily
+    long records are averaged without storing the history. Spectral
+    snapshots from a pseudo-spectral solver can be added directly in
+    half-spectrum form to skip the forward transform.
+    """
+    def __init__(self, shape: Tuple[int, int], config: Dict = None):
+        self.shape = tuple(shape)
+        self.config = {
+            'dx': 1.0,
+            'n_bins': None,
+            'max_separation': None,
+            'orders': (2, 3),
+            'periodic': False,
+            'structure_functions': True,
+            'fft_backend': 'scipy'
+        }
+        if config:
+            self.config.update(config)
+        self.reset()
+
+    def reset(self):
+        """Discard all accumulated snapshots"""
+        self.count = 0
+        self.k = None
+        self._spectrum_sum = None
+        self._structure_count = 0
+        self._structure_sum = None
+
+    def _add_spectrum(self, k: np.ndarray, spectrum: np.ndarray):
+        if self._spectrum_sum is None:
+            self.k = k
+            self._spectrum_sum = np.zeros_like(spectrum)
+        self._spectrum_sum += spectrum
+        self.count += 1
+
+    def add_snapshot(self, velocity: np.ndarray):
+        """Accumulate statistics of a physical velocity field (W, H, C)"""
+        self._add_spectrum(*energy_spectrum(velocity, self.config['dx'], self.config['n_bins'],
+                                            self.config['fft_backend']))
+        if self.config['structure_functions']:
+            self._add_structure_functions(velocity)
+
+    def add_spectral_snapshot(self, velocity_hat: np.ndarray,
+                              velocity: Optional[np.ndarray] = None):
+        """
+        Accumulate a half-spectrum velocity snapshot
+
+        Args:
+            velocity_hat: rfft2 velocity of shape (C, W, H//2 + 1)
+            velocity: Optional physical velocity for structure functions
+        """
+        self._add_spectrum(*spectrum_from_hat(velocity_hat, self.shape, self.config['dx'],
+                                              self.config['n_bins']))
+        if velocity is not None and self.config['structure_functions']:
+            self._add_structure_functions(velocity)
+
+    def _add_structure_functions(self, velocity: np.ndarray):
+        result = structure_functions(velocity, self.config['max_separation'],
+                                     self.config['orders'], self.config['dx'],
+                                     self.config['periodic'])
+        if self._structure_sum is None:
+            self._structure_sum = {key: np.zeros_like(result[key])
+                                   for key in ('longitudinal', 'transverse')}
+            self._structure_r = result['r']
+        for key in self._structure_sum:
+            self._structure_sum[key] += result[key]
+        self._structure_count += 1
+
+    def mean_spectrum(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Time-averaged (k, E(k))"""
+        if self.count == 0:
+            raise ValueError("No snapshots accumulated")
+        return self.k, self._spectrum_sum / self.count
+
+    def mean_structure_functions(self) -> Dict[str, np.ndarray]:
+        """Time-averaged structure functions in the structure_functions layout"""
+        if self._structure_count == 0:
+            raise ValueError("No structure-function snapshots accumulated")
+        result = {key: value / self._structure_count for key, value in self._structure_sum.items()}
+        result['r'] = self._structure_r
+        result['orders'] = np.array(self.config['orders'])
+        return result
+
+def pdf_window(snapshots: np.ndarray, components: Sequence[int] = (0, 1),
+               sigmas: float = 5.0) -> Dict:
+    """
+    Joint-PDF settings shared by all runs, from a pilot sample
+
+    Args:
+        snapshots: Pilot velocity history (T, W, H, C)
+        components: Velocity components of the joint PDF
+        sigmas: Half-width of the window in standard deviations of the
+            fluctuations
+
+    Returns:
+        Config entries pdf_reference (per-cell mean of the sample) and
+        pdf_range for FlowStatisticsAccumulator
+    """
+    snapshots = np.asarray(snapshots, dtype=np.float64)
+    reference = snapshots.mean(axis=0)
+    spread = max(float(np.std(snapshots[..., c] - reference[..., c])) for c in components)
+    return {'pdf_reference': reference, 'pdf_range': sigmas * max(spread, 1e-12)}
+
+class FlowStatisticsAccumulator:
+    """
+    Streaming per-cell moments of a velocity field.
+
+    Keeps the running mean, co-moment matrix (covariance and Reynolds
+    stresses) and third and fourth central moments of every component in
+    every cell. Batches are folded in with the pairwise update of Chan et
+    al. (Welford's update for a batch of one), and two accumulators with
+    identical settings merge with the same formulas, so independent runs
+    can be reduced afterwards. The joint PDF of the fluctuations pooled
+    over all cells is binned into a fixed 2D histogram instead of being
+    estimated by a KDE. Its window (pdf_range) and the reference velocity
+    the fluctuations are measured from (pdf_reference) are fixed in the
+    configuration, so the histogram does not depend on the update order
+    and runs sharing the configuration merge by adding counts; see
+    pdf_window. Without a pdf_range no joint PDF is kept.
+    """
+    def __init__(self, config: Dict = None):
+        self.config = {
+            'pdf_bins': 64,
+            'pdf_range': None,      # Half-width of the joint-PDF window (None: no joint PDF)
+            'pdf_reference': 0.0,   # Velocity the fluctuations are measured from: scalar,
+                                    # per component (C,) or per cell (W, H, C)
+            'pdf_components': (0, 1)
+        }
+        if config:
+            self.config.update(config)
+        self.count = 0
+        self.mean = None
+        self.comoment = None   # (..., C, C) sum of outer products of deviations
+        self.m3 = None         # (..., C)
+        self.m4 = None         # (..., C)
+        self.pdf_counts = None
+        self.pdf_edges = None
+        self.pdf_outliers = 0
+        self._pdf_reference = np.asarray(self.config['pdf_reference'], dtype=np.float64)
+        if self.config['pdf_range'] is not None:
+            half_width = float(self.config['pdf_range'])
+            edges = np.linspace(-half_width, half_width, self.config['pdf_bins'] + 1)
+            self.pdf_edges = (edges, edges.copy())
+            self.pdf_counts = np.zeros((self.config['pdf_bins'],) * 2)
+        self._solver = None
+        self._solver_step = None
+
+    def _batch_moments(self, batch: np.ndarray) -> Tuple:
+        n = batch.shape[0]
+        mean = batch.mean(axis=0)
+        d = batch - mean
+        comoment = np.einsum('t...i,t...j->...ij', d, d)
+        return n, mean, comoment, np.sum(d ** 3, axis=0), np.sum(d ** 4, axis=0)
+
+    def _combine(self, nb: int, mean_b: np.ndarray, c_b: np.ndarray,
+                 m3_b: np.ndarray, m4_b: np.ndarray):
+        if self.count == 0:
+            self.count, self.mean, self.comoment, self.m3, self.m4 = nb, mean_b, c_b, m3_b, m4_b
+            return
+        na = self.count
+        n = na + nb
+        delta = mean_b - self.mean
+        m2_a = np.diagonal(self.comoment, axis1=-2, axis2=-1)
+        m2_b = np.diagonal(c_b, axis1=-2, axis2=-1)
+
+        self.m4 = (self.m4 + m4_b
+                   + delta ** 4 * na * nb * (na * na - na * nb + nb * nb) / n ** 3
+                   + 6.0 * delta ** 2 * (na * na * m2_b + nb * nb * m2_a) / n ** 2
+                   + 4.0 * delta * (na * m3_b - nb * self.m3) / n)
+        self.m3 = (self.m3 + m3_b
+                   + delta ** 3 * na * nb * (na - nb) / n ** 2
+                   + 3.0 * delta * (na * m2_b - nb * m2_a) / n)
+        self.comoment = self.comoment + c_b + delta[..., :, None] * delta[..., None, :] * (na * nb / n)
+        self.mean = self.mean + delta * (nb / n)
+        self.count = n
+
+    def update(self, snapshots: np.ndarray, batch: bool = False):
+        """
+        Fold in one snapshot (W, H, C) or, with batch=True, a stack (T, W, H, C)
+        """
+        snapshots = np.asarray(snapshots, dtype=np.float64)
+        if not batch:
+            snapshots = snapshots[None]
+        self._combine(*self._batch_moments(snapshots))
+        self._update_pdf(snapshots)
+
+    def _update_pdf(self, snapshots: np.ndarray):
+        if self.pdf_counts is None:
+            return
+        i, j = self.config['pdf_components']
+        reference = np.broadcast_to(self._pdf_reference, snapshots.shape[1:])
+        fluct_u = (snapshots[..., i] - reference[..., i]).ravel()
+        fluct_v = (snapshots[..., j] - reference[..., j]).ravel()
+        counts, _, _ = np.histogram2d(fluct_u, fluct_v, bins=self.pdf_edges)
+        self.pdf_counts += counts
+        self.pdf_outliers += fluct_u.size - int(counts.sum())
+
+    def merge(self, other: 'FlowStatisticsAccumulator') -> 'FlowStatisticsAccumulator':
+        """Fold another accumulator (e.g. from a parallel run) into this one"""
+        same_pdf = (
+            (self.pdf_counts is None) == (other.pdf_counts is None)
+            and self.config['pdf_components'] == other.config['pdf_components']
+            and np.array_equal(self._pdf_reference, other._pdf_reference)
+            and (self.pdf_edges is None
+                 or all(np.array_equal(a, b) for a, b in zip(self.pdf_edges, other.pdf_edges)))
+        )
+        if not same_pdf:
+            raise ValueError("Cannot merge joint PDFs with different windows or references")
+        if other.count == 0:
+            return self
+        self._combine(other.count, other.mean, other.comoment, other.m3, other.m4)
+        if self.pdf_counts is not None:
+            self.pdf_counts += other.pdf_counts
+            self.pdf_outliers += other.pdf_outliers
+        return self
+
+    # Solver hookup ---------------------------------------------------------
+
+    def observe(self, solver):
+        """Accumulate the current velocity field of a solver"""
+        if hasattr(solver, 'get_velocity_field'):
+            velocity = solver.get_velocity_field()
+        else:
+            velocity = solver.get_state()['velocity']
+        self.update(velocity)
+
+    def attach(self, solver, interval: int = 1):
+        """Wrap solver.step so every interval-th step is accumulated"""
+        self.detach()
+        step = solver.step
+        calls = [0]
+
+        def observed_step(*args, **kwargs):
+            result = step(*args, **kwargs)
+            calls[0] += 1
+            if calls[0] % interval == 0:
+                self.observe(solver)
+            return result
+
+        solver.step = observed_step
+        self._solver, self._solver_step = solver, step
+
+    def detach(self):
+        """Restore the step method of an attached solver"""
+        if self._solver is not None:
+            self._solver.step = self._solver_step
+            self._solver, self._solver_step = None, None
+
+    # Results ---------------------------------------------------------------
+
+    @property
+    def variance(self) -> np.ndarray:
+        return np.diagonal(self.comoment, axis1=-2, axis2=-1) / self.count
+
+    @property
+    def rms(self) -> np.ndarray:
+        return np.sqrt(self.variance)
+
+    @property
+    def covariance(self) -> np.ndarray:
+        """Per-cell covariance (Reynolds stress tensor) of shape (..., C, C)"""
+        return self.comoment / self.count
+
+    @property
+    def skewness(self) -> np.ndarray:
+        variance = self.variance
+        return np.where(variance > 0, self.m3 / self.count / np.maximum(variance, 1e-300) ** 1.5, 0.0)
+
+    @property
+    def flatness(self) -> np.ndarray:
+        variance = self.variance
+        return np.where(variance > 0, self.m4 / self.count / np.maximum(variance, 1e-300) ** 2, 0.0)
+
+    def joint_pdf(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Normalized joint PDF of the fluctuations with its bin edges"""
+        if self.pdf_counts is None:
+            raise ValueError("No joint PDF accumulated; configure a pdf_range (see pdf_window)")
+        x_edges, y_edges = self.pdf_edges
+        area = np.outer(np.diff(x_edges), np.diff(y_edges))
+        total = self.pdf_counts.sum() + self.pdf_outliers
+        return self.pdf_counts / (max(total, 1) * area), x_edges, y_edges
@@ -0,0 +1,169 @@
+import hashlib
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+
+def _block_reduce(data: np.ndarray, factor: int, spatial_dims: int, reduce) -> np.ndarray:
+    """Reduce non-overlapping blocks of `factor` cells along each spatial axis"""
+    pad = [(0, (-n) % factor) for n in data.shape[:spatial_dims]]
+    pad += [(0, 0)] * (data.ndim - spatial_dims)
+    if any(after for _, after in pad):
+        # Edge padding keeps partial blocks at the far boundary well defined
+        data = np.pad(data, pad, mode='edge')
+    shape = []
+    for n in data.shape[:spatial_dims]:
+        shape += [n // factor, factor]
+    blocks = data.reshape(tuple(shape) + data.shape[spatial_dims:])
+    return reduce(blocks, axis=tuple(range(1, 2 * spatial_dims, 2)))
+
+class FieldPyramid:
+    """
+    Multi-resolution pyramid of one field snapshot.
+
+    Level 0 is the field itself; every further level averages blocks of
+    `factor` cells per axis. Min/max pyramids are kept alongside the means
+    so that coarse levels still bound the extrema of the cells they cover
+    (stable color ranges, and isosurface extraction can skip blocks whose
+    range does not contain the isovalue).
+    """
+    def __init__(self, field: np.ndarray, factor: int = 2, min_size: int = 8,
+                 spatial_dims: Optional[int] = None):
+        """
+        Args:
+            field: Scalar field, or vector field with a trailing component axis
+            factor: Reduction factor per axis between levels
+            min_size: Coarsest level keeps at least this many cells on its
+                smallest axis
+            spatial_dims: Number of spatial axes (default: all axes)
+        """
+        field = np.asarray(field)
+        self.spatial_dims = field.ndim if spatial_dims is None else spatial_dims
+        self.factor = factor
+        self.means: List[np.ndarray] = [field]
+        self.minima: List[np.ndarray] = [field]
+        self.maxima: List[np.ndarray] = [field]
+
+        while min(self.means[-1].shape[:self.spatial_dims]) // factor >= min_size:
+            self.means.append(_block_reduce(self.means[-1], factor, self.spatial_dims, np.mean))
+            self.minima.append(_block_reduce(self.minima[-1], factor, self.spatial_dims, np.min))
+            self.maxima.append(_block_reduce(self.maxima[-1], factor, self.spatial_dims, np.max))
+
+    @property
+    def n_levels(self) -> int:
+        return len(self.means)
+
+    def shape(self, level: int) -> Tuple[int, ...]:
+        """Spatial shape of a level"""
+        return self.means[level].shape[:self.spatial_dims]
+
+    def level(self, level: int) -> np.ndarray:
+        """Block-averaged field at a level"""
+        return self.means[level]
+
+    def bounds(self, level: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-cell minimum and maximum of the original field at a level"""
+        return self.minima[level], self.maxima[level]
+
+    @property
+    def value_range(self) -> Tuple[float, float]:
+        """Exact range of the full-resolution field"""
+        return float(self.minima[-1].min()), float(self.maxima[-1].max())
+
+class LODController:
+    """
+    Level-of-detail selection for interactive views of solver snapshots.
+
+    A pyramid is built once per new snapshot. The displayed level follows
+    the viewport size (no more cells per axis than pixels can show) and the
+    interaction state: while the user rotates or zooms a coarser level with
+    a smaller cell budget keeps the view responsive, and the full level is
+    restored once interaction stops. `poll` only reports an update when the
+    snapshot or the chosen level changed, so redraws are throttled to
+    frames with new data.
+    """
+    def __init__(self, config: Dict = None):
+        self.config = {
+            'factor': 2,
+            'min_size': 8,
+            'pixels_per_cell': 1.0,             # Idle: at most one cell per pixel
+            'interactive_pixels_per_cell': 4.0, # Interacting: coarser cells
+            'max_cells': 2 ** 24,               # Idle cell budget
+            'interactive_max_cells': 2 ** 18    # Cell budget while interacting
+        }
+        if config:
+            self.config.update(config)
+
+        self.pyramid: Optional[FieldPyramid] = None
+        self.version = None
+        self._dirty = False
+        self._last_level: Optional[int] = None
+
+    def set_snapshot(self, field: np.ndarray, version=None,
+                     spatial_dims: Optional[int] = None) -> bool:
+        """
+        Provide the current solver snapshot
+
+        Args:
+            field: Field to display
+            version: Snapshot identifier such as the solver step; the field
+                content is hashed when omitted
+            spatial_dims: Number of spatial axes (default: all axes)
+
+        Returns:
+            Whether the snapshot was new and the pyramid rebuilt
+        """
+        field = np.asarray(field)
+        if version is None:
+            version = (field.shape, str(field.dtype), hashlib.blake2b(
+                np.ascontiguousarray(field).data, digest_size=16).hexdigest())
+        if self.pyramid is not None and version == self.version:
+            return False
+        self.pyramid = FieldPyramid(field, self.config['factor'], self.config['min_size'], spatial_dims)
+        self.version = version
+        self._dirty = True
+        return True
+
+    def invalidate(self):
+        """Force the next poll to report an update (e.g. view type changed)"""
+        self._dirty = True
+
+    def select_level(self, viewport: Sequence[int], interacting: bool = False) -> int:
+        """
+        Finest level that fits the viewport resolution and cell budget
+
+        Args:
+            viewport: Viewport size in pixels (width, height)
+            interacting: Whether the user is currently manipulating the view
+        """
+        if self.pyramid is None:
+            return 0
+        if interacting:
+            pixels_per_cell = self.config['interactive_pixels_per_cell']
+            max_cells = self.config['interactive_max_cells']
+        else:
+            pixels_per_cell = self.config['pixels_per_cell']
+            max_cells = self.config['max_cells']
+        max_extent = max(max(viewport) / pixels_per_cell, 1.0)
+
+        for level in range(self.pyramid.n_levels):
+            shape = self.pyramid.shape(level)
+            if max(shape) <= max_extent and np.prod(shape) <= max_cells:
+                return level
+        return self.pyramid.n_levels - 1
+
+    def poll(self, viewport: Sequence[int],
+             interacting: bool = False) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        Level to draw if the display needs refreshing
+
+        Returns:
+            (level, data) when the snapshot or the selected level changed
+            since the last poll, otherwise None
+        """
+        if self.pyramid is None:
+            return None
+        level = self.select_level(viewport, interacting)
+        if not self._dirty and level == self._last_level:
+            return None
+        self._dirty = False
+        self._last_level = level
+        return level, self.pyramid.level(level)
@@ -23,7 +23,7 @@ from PyQt6.QtWidgets import (
     QScrollArea,
     QSplitter
 )
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtCore import Qt, QTimer, QEvent, pyqtSignal
 from PyQt6.QtGui import QImage, QPixmap, QIcon, QAction, QPalette, QColor
 import pyqtgraph as pg
 import pyqtgraph.opengl as gl
@@ -31,6 +31,8 @@ from typing import Optional, Dict, List, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from .lod import LODController
+
 class VisualizationType(Enum):
     """Types of visualizations"""
     SURFACE = "Surface"
@@ -62,6 +64,8 @@ class GUIConfig:
     show_colorbar: bool = True
     animation_fps: int = 30
     animation_duration: float = 10.0
+    use_lod: bool = True
+    lod_idle_delay: int = 300  # ms without input before full detail returns
 
 class MainWindow(QMainWindow):
     def __init__(self, config: Optional[GUIConfig] = None):
@@ -73,6 +77,10 @@ class MainWindow(QMainWindow):
         """
         super().__init__()
         self.config = config or GUIConfig()
+        # Without LOD the pyramid keeps only the full-resolution level
+        self.lod = LODController(None if self.config.use_lod else {'min_size': np.inf})
+        self._interacting = False
+        self._last_viz_type = None
         self.setup_ui()
         self.setup_theme()
         self.setup_connections()
@@ -314,6 +322,12 @@ class MainWindow(QMainWindow):
             # Create 3D visualization
             self.view = gl.GLViewWidget()
             self.view.setCameraPosition(distance=10)
+            self.view.installEventFilter(self)
+            
+            # Full detail returns once the view has been idle for a while
+            self.idle_timer = QTimer()
+            self.idle_timer.setSingleShot(True)
+            self.idle_timer.timeout.connect(self._end_interaction)
             
             # Add grid
             grid = gl.GLGridItem()
@@ -388,81 +402,138 @@ class MainWindow(QMainWindow):
         self.timer.timeout.connect(self._update)
         self.timer.start(self.config.update_interval)
         
+    def set_field(self, field: np.ndarray, version=None):
+        """
+        Provide a new solver snapshot for display
+        
+        Args:
+            field: Scalar field to visualize
+            version: Snapshot identifier such as the solver step; the field
+                content is hashed when omitted
+        """
+        self.lod.set_snapshot(field, version)
+        
+    def eventFilter(self, obj, event):
+        """Track camera manipulation on the 3D view"""
+        if event.type() in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseMove,
+                            QEvent.Type.Wheel):
+            if event.type() != QEvent.Type.MouseMove or event.buttons() != Qt.MouseButton.NoButton:
+                self._interacting = self.config.use_lod
+                self.idle_timer.start(self.config.lod_idle_delay)
+        return super().eventFilter(obj, event)
+        
+    def _end_interaction(self):
+        self._interacting = False
+        
+    def _viewport_size(self) -> Tuple[int, int]:
+        """Viewport size in device pixels"""
+        widget = self.view if self.config.use_3d else self.plot
+        ratio = widget.devicePixelRatioF()
+        return int(widget.width() * ratio), int(widget.height() * ratio)
+        
     def _update(self):
         """Update visualization"""
         # Get current visualization type
         viz_type = VisualizationType(self.type_combo.currentText())
+        if viz_type != self._last_viz_type:
+            self.lod.invalidate()
+            self._last_viz_type = viz_type
+            
+        # Redraw only when the snapshot or the detail level changed
+        update = self.lod.poll(self._viewport_size(), self._interacting)
+        if update is None:
+            return
+        _, data = update
         
         # Update visualization based on type
         if self.config.use_3d:
             if viz_type == VisualizationType.SURFACE:
-                self._update_surface_3d()
+                self._update_surface_3d(data)
             elif viz_type == VisualizationType.VOLUME:
-                self._update_volume_3d()
+                self._update_volume_3d(data)
             elif viz_type == VisualizationType.STREAMLINE:
-                self._update_streamline_3d()
+                self._update_streamline_3d(data)
             elif viz_type == VisualizationType.ISOSURFACE:
-                self._update_isosurface_3d()
+                self._update_isosurface_3d(data)
             elif viz_type == VisualizationType.POINT_CLOUD:
-                self._update_point_cloud_3d()
+                self._update_point_cloud_3d(data)
         else:
             if viz_type == VisualizationType.SURFACE:
-                self._update_surface_2d()
+                self._update_surface_2d(data)
             elif viz_type == VisualizationType.VOLUME:
-                self._update_volume_2d()
+                self._update_volume_2d(data)
             elif viz_type == VisualizationType.STREAMLINE:
-                self._update_streamline_2d()
+                self._update_streamline_2d(data)
             elif viz_type == VisualizationType.ISOSURFACE:
-                self._update_isosurface_2d()
+                self._update_isosurface_2d(data)
             elif viz_type == VisualizationType.POINT_CLOUD:
-                self._update_point_cloud_2d()
+                self._update_point_cloud_2d(data)
                 
-    def _update_surface_3d(self):
+    def _update_surface_3d(self, data: np.ndarray):
         """Update 3D surface visualization"""
-        # TODO: Implement surface update
-        pass
-        
-    def _update_volume_3d(self):
+        if data.ndim != 2:
+            return
+        nx, ny = data.shape
+        x, y = np.meshgrid(np.linspace(-5, 5, nx), np.linspace(-5, 5, ny), indexing="ij")
+        vertexes = np.stack([x.ravel(), y.ravel(), data.ravel()], axis=1)
+        self.surface.setMeshData(vertexes=vertexes, faces=_grid_faces(nx, ny))
+        
+    def _update_volume_3d(self, data: np.ndarray):
         """Update 3D volume visualization"""
-        # TODO: Implement volume update
-        pass
-        
-    def _update_streamline_3d(self):
+        if data.ndim != 3:
+            return
+        lo, hi = self.lod.pyramid.value_range
+        t = np.clip((data - lo) / max(hi - lo, 1e-12), 0.0, 1.0)
+        rgba = np.empty(data.shape + (4,), dtype=np.ubyte)
+        rgba[..., 0] = 255 * t
+        rgba[..., 1] = 64
+        rgba[..., 2] = 255 * (1.0 - t)
+        rgba[..., 3] = 80 * t
+        self.volume.setData(rgba)
+        
+    def _update_streamline_3d(self, data: np.ndarray):
         """Update 3D streamline visualization"""
         # TODO: Implement streamline update
         pass
         
-    def _update_isosurface_3d(self):
+    def _update_isosurface_3d(self, data: np.ndarray):
         """Update 3D isosurface visualization"""
         # TODO: Implement isosurface update
         pass
         
-    def _update_point_cloud_3d(self):
+    def _update_point_cloud_3d(self, data: np.ndarray):
         """Update 3D point cloud visualization"""
-        # TODO: Implement point cloud update
-        pass
-        
-    def _update_surface_2d(self):
+        grid = np.indices(data.shape, dtype=np.float32).reshape(data.ndim, -1).T
+        pos = np.zeros((grid.shape[0], 3), dtype=np.float32)
+        pos[:, :data.ndim] = 10.0 * grid / max(data.shape) - 5.0
+        if data.ndim == 2:
+            pos[:, 2] = data.ravel()
+        lo, hi = self.lod.pyramid.value_range
+        t = np.clip((data.ravel() - lo) / max(hi - lo, 1e-12), 0.0, 1.0)
+        color = np.stack([t, 0.25 * np.ones_like(t), 1.0 - t, np.ones_like(t)], axis=1)
+        self.point_cloud.setData(pos=pos, color=color)
+        
+    def _update_surface_2d(self, data: np.ndarray):
         """Update 2D surface visualization"""
         # TODO: Implement surface update
         pass
         
-    def _update_volume_2d(self):
+    def _update_volume_2d(self, data: np.ndarray):
         """Update 2D volume visualization"""
         # TODO: Implement volume update
         pass
         
-    def _update_streamline_2d(self):
+    def _update_streamline_2d(self, data: np.ndarray):
         """Update 2D streamline visualization"""
         # TODO: Implement streamline update
         pass
         
-    def _update_isosurface_2d(self):
+    def _update_isosurface_2d(self, data: np.ndarray):
         """Update 2D isosurface visualization"""
         # TODO: Implement isosurface update
         pass
         
-    def _update_point_cloud_2d(self):
+    def _update_point_cloud_2d(self, data: np.ndarray):
         """Update 2D point cloud visualization"""
         # TODO: Implement point cloud update
         pass
@@ -472,6 +543,21 @@ class MainWindow(QMainWindow):
         self.timer.stop()
         event.accept()
 
+_grid_faces_cache: Dict[Tuple[int, int], np.ndarray] = {}
+
+def _grid_faces(nx: int, ny: int) -> np.ndarray:
+    """Triangle indices of an nx by ny vertex grid, cached per level shape"""
+    faces = _grid_faces_cache.get((nx, ny))
+    if faces is None:
+        index = np.arange(nx * ny).reshape(nx, ny)
+        a = index[:-1, :-1].ravel()
+        b = index[1:, :-1].ravel()
+        c = index[:-1, 1:].ravel()
+        d = index[1:, 1:].ravel()
+        faces = np.concatenate([np.stack([a, b, d], axis=1), np.stack([a, d, c], axis=1)])
+        _grid_faces_cache[(nx, ny)] = faces
+    return faces
+
 def main():
     """Main function"""
     app = QApplication(sys.argv)
@@ -0,0 +1,88 @@
+"""
+Benchmark exported inference models against eager PyTorch.
+
+For the PINN network, the mesh feature detector and the anomaly
+autoencoder, compares the eager float32 model (as run by predict,
+compute_feature_scores and detect_batch before export) with every
+available runtime of the float32 and int8 exports. Reports the best
+latency, the speedup over eager and the maximum absolute drift of the
+outputs from the eager model.
+
+Usage:
+    python -m navierflow.tests.benchmarks.bench_inference_export --points 4096 --resolution 128 --frames 8
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+import torch
+import torch.nn as nn
+from navierflow.ai.models.anomaly_detector import FlowAutoencoder
+from navierflow.ai.models.export import InferenceModel, available_runtimes, export_model
+from navierflow.ai.models.mesh_optimizer import MeshOptimizer
+from navierflow.ai.models.pinn import FluidPINN
+
+def best_time(fn: Callable[[], torch.Tensor], repeats: int) -> float:
+    fn()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def first_output(outputs) -> torch.Tensor:
+    return outputs[0] if isinstance(outputs, tuple) else outputs
+
+def make_models(args) -> Dict[str, Tuple[nn.Module, torch.Tensor]]:
+    torch.manual_seed(0)
+    generator = torch.Generator().manual_seed(0)
+    return {
+        'pinn': (FluidPINN().network, torch.rand(args.points, 3, generator=generator)),
+        'feature_detector': (
+            MeshOptimizer((args.resolution, args.resolution))._build_feature_detector(),
+            torch.rand(1, 4, args.resolution, args.resolution, generator=generator)
+        ),
+        'autoencoder': (
+            FlowAutoencoder(),
+            torch.rand(args.frames, 4, args.resolution, args.resolution, generator=generator)
+        )
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Exported inference benchmark")
+    parser.add_argument("--points", type=int, default=4096, help="PINN query points")
+    parser.add_argument("--resolution", type=int, default=128, help="Grid size of the CNN inputs")
+    parser.add_argument("--frames", type=int, default=8, help="Autoencoder batch size")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    print(f"{'model':>16} {'variant':>24} {'ms':>9} {'speedup':>9} {'max drift':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, (model, x) in make_models(args).items():
+            model.eval()
+            with torch.no_grad():
+                reference = first_output(model(x))
+                eager_time = best_time(lambda: model(x), args.repeats)
+            print(f"{name:>16} {'eager float32':>24} {eager_time * 1e3:>9.2f} {1.0:>8.2f}x {0.0:>11.2e}")
+
+            # Only linear layers are quantized; CNN int8 exports would be float32
+            has_linear = any(isinstance(module, nn.Linear) for module in model.modules())
+            for quantize in (False, True) if has_linear else (False,):
+                path = Path(directory) / f"{name}_{'int8' if quantize else 'float32'}"
+                export_model(model, x, path, quantize=quantize)
+                for runtime in available_runtimes(path):
+                    exported = InferenceModel(runtime, path)
+                    seconds = exported.time(x, args.repeats)
+                    drift = (first_output(exported(x)) - reference).abs().max().item()
+                    variant = f"{runtime} {'int8' if quantize else 'float32'}"
+                    print(f"{name:>16} {variant:>24} {seconds * 1e3:>9.2f} "
+                          f"{eager_time / seconds:>8.2f}x {drift:>11.2e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark FluidPINN training epochs with different PDE residual paths.
+
+Compares the original residual (a separate autograd pass for every
+derivative column) against the fused autograd path, the torch.func
+forward-over-reverse path and, optionally, its torch.compile version.
+
+Usage:
+    python -m navierflow.tests.benchmarks.bench_pinn_residuals --points 2048 --batches 8 --compile
+"""
+import argparse
+import time
+import types
+from typing import Tuple
+import torch
+from navierflow.ai.models.pinn import FluidPINN
+
+def reference_pde_loss(self, x: torch.Tensor) -> torch.Tensor:
+    """PDE loss as originally implemented: 8 first- and 4 second-derivative passes"""
+    x = x.detach().requires_grad_(True)
+    y = self.forward(x)
+    u, v, p = y[:, 0:1], y[:, 1:2], y[:, 2:3]
+
+    du_dx = torch.autograd.grad(u.sum(), x, create_graph=True)[0][:, 0:1]
+    du_dy = torch.autograd.grad(u.sum(), x, create_graph=True)[0][:, 1:2]
+    du_dt = torch.autograd.grad(u.sum(), x, create_graph=True)[0][:, 2:3]
+    dv_dx = torch.autograd.grad(v.sum(), x, create_graph=True)[0][:, 0:1]
+    dv_dy = torch.autograd.grad(v.sum(), x, create_graph=True)[0][:, 1:2]
+    dv_dt = torch.autograd.grad(v.sum(), x, create_graph=True)[0][:, 2:3]
+    dp_dx = torch.autograd.grad(p.sum(), x, create_graph=True)[0][:, 0:1]
+    dp_dy = torch.autograd.grad(p.sum(), x, create_graph=True)[0][:, 1:2]
+
+    d2u_dx2 = torch.autograd.grad(du_dx.sum(), x, create_graph=True)[0][:, 0:1]
+    d2u_dy2 = torch.autograd.grad(du_dy.sum(), x, create_graph=True)[0][:, 1:2]
+    d2v_dx2 = torch.autograd.grad(dv_dx.sum(), x, create_graph=True)[0][:, 0:1]
+    d2v_dy2 = torch.autograd.grad(dv_dy.sum(), x, create_graph=True)[0][:, 1:2]
+
+    continuity = du_dx + dv_dy
+    momentum_x = du_dt + u * du_dx + v * du_dy + (1/self.rho) * dp_dx - self.nu * (d2u_dx2 + d2u_dy2)
+    momentum_y = dv_dt + u * dv_dx + v * dv_dy + (1/self.rho) * dp_dy - self.nu * (d2v_dx2 + d2v_dy2)
+    return torch.mean(continuity**2 + momentum_x**2 + momentum_y**2)
+
+def make_model(variant: str, seed: int) -> FluidPINN:
+    torch.manual_seed(seed)
+    if variant == "reference":
+        model = FluidPINN()
+        model.compute_pde_loss = types.MethodType(reference_pde_loss, model)
+    elif variant == "compiled":
+        model = FluidPINN(residual_mode="functional", compile_residual=True)
+    else:
+        model = FluidPINN(residual_mode=variant)
+    return model
+
+def run_epoch(model: FluidPINN, batches, x_bc, bc_values) -> Tuple[float, float]:
+    start = time.perf_counter()
+    for x_pde in batches:
+        losses = model.training_step(x_pde, x_bc, bc_values)
+    return time.perf_counter() - start, losses['pde_loss']
+
+def main():
+    parser = argparse.ArgumentParser(description="PINN residual benchmark")
+    parser.add_argument("--points", type=int, default=2048, help="Collocation points per batch")
+    parser.add_argument("--batches", type=int, default=8, help="Batches per epoch")
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--compile", action="store_true", help="Include the torch.compile residual")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    generator = torch.Generator().manual_seed(0)
+    batches = [torch.rand(args.points, 3, generator=generator) for _ in range(args.batches)]
+    x_bc = torch.rand(256, 3, generator=generator)
+    bc_values = torch.zeros(256, 3)
+
+    variants = ["reference", "autograd", "functional"] + (["compiled"] if args.compile else [])
+    reference_time = None
+    print(f"{'variant':>12} {'epoch s':>10} {'speedup':>9} {'warmup s':>10} {'pde loss':>12}")
+    for variant in variants:
+        model = make_model(variant, seed=0)
+        # The first epoch includes tracing/compilation and is reported separately
+        warmup, _ = run_epoch(model, batches, x_bc, bc_values)
+        times = []
+        for _ in range(args.epochs):
+            seconds, pde_loss = run_epoch(model, batches, x_bc, bc_values)
+            times.append(seconds)
+        epoch_time = min(times)
+        reference_time = reference_time or epoch_time
+        print(f"{variant:>12} {epoch_time:>10.3f} {reference_time / epoch_time:>8.2f}x "
+              f"{warmup:>10.2f} {pde_loss:>12.4e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Benchmark vortex particle velocity evaluation.
+
+Compares the grid-interpolation path used by VortexMethods against the
+Barnes-Hut treecode and the FMM Biot-Savart engines.
+
+Usage:
+    python -m navierflow.tests.benchmarks.bench_vortex_particles --particles 10000 100000 1000000
+"""
+import argparse
+from navierflow.core.spectral.particle_velocity import benchmark_velocity_methods
+
+def main():
+    parser = argparse.ArgumentParser(description="Vortex particle velocity benchmark")
+    parser.add_argument("--particles", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--grid-size", type=int, default=256)
+    parser.add_argument("--methods", nargs="+", default=["grid", "tree", "fmm"])
+    parser.add_argument("--order", type=int, default=12)
+    args = parser.parse_args()
+
+    print(f"{'particles':>10} {'method':>8} {'seconds':>10} {'particles/s':>14} {'rel. error':>12}")
+    for n in args.particles:
+        methods = [m for m in args.methods if m != "tree" or n <= 200000]
+        results = benchmark_velocity_methods(
+            n, args.grid_size, tuple(methods), {'expansion_order': args.order}
+        )
+        for method, result in results.items():
+            print(f"{n:>10} {method:>8} {result['seconds']:>10.3f} "
+                  f"{result['particles_per_second']:>14.0f} {result['relative_error']:>12.2e}")
+
+if __name__ == "__main__":
+    main()
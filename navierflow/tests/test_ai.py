@@ -0,0 +1,540 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import h5py
+import numpy as np
+import torch
+from navierflow.ai.models.anomaly_detector import AnomalyDetector
+from navierflow.ai.models.export import available_runtimes, onnxruntime
+from navierflow.ai.models.mesh_optimizer import MeshOptimizer
+from navierflow.ai.models.pinn import FluidPINN
+from navierflow.ai.training.augmentation import BatchAugmentor
+from navierflow.ai.training.collocation import CollocationSampler, sample_boundary
+from navierflow.ai.training.data_loader import PINNDataset, collate_batch, create_dataloader
+from navierflow.ai.training.preprocessing import DataPreprocessor, RunningMoments
+from navierflow.ai.training.sample_cache import SharedSampleCache
+
+try:
+    from navierflow.ai.training.trainer import ModelTrainer
+except ImportError:
+    ModelTrainer = None
+
+class TestCollocationSampler(unittest.TestCase):
+    def setUp(self):
+        """Set up a residual concentrated near x = 0.8"""
+        self.residual = lambda points: np.exp(-50.0 * (points[:, 0] - 0.8) ** 2)
+
+    def test_low_discrepancy_pool(self):
+        """Test that Sobol and LHS pools cover the domain evenly"""
+        for method in ('sobol', 'lhs'):
+            sampler = CollocationSampler({'pool_size': 1024, 'method': method, 'seed': 0})
+            counts = np.histogram(sampler.pool[:, 0], bins=8, range=(0.0, 1.0))[0]
+            self.assertLessEqual(counts.max() - counts.min(), 8)
+
+    def test_rar_adds_high_residual_points(self):
+        """Test that RAR grows the pool where the residual is large"""
+        sampler = CollocationSampler({'pool_size': 1000, 'candidates': 2000,
+                                      'rar_points': 100, 'seed': 0})
+        stats = sampler.refine(self.residual)
+        self.assertEqual(stats['pool_size'], 1100)
+        self.assertAlmostEqual(sampler.pool[-100:, 0].mean(), 0.8, delta=0.05)
+
+    def test_importance_sampling(self):
+        """Test that batches follow the residual after refinement"""
+        sampler = CollocationSampler({'pool_size': 2000, 'adaptive': 'importance', 'seed': 0})
+        uniform_mean = sampler.sample(4000)[:, 0].mean()
+        sampler.refine(self.residual)
+        self.assertGreater(sampler.sample(4000)[:, 0].mean(), uniform_mean + 0.1)
+
+    def test_boundary_sampling(self):
+        """Test vectorized boundary points and values"""
+        x_bc, values = sample_boundary(3000, np.random.default_rng(0))
+        self.assertTrue(np.all(np.isin(x_bc[:, 0], [0.0, 1.0])))
+        self.assertTrue(np.all(values[x_bc[:, 0] == 1.0] == 0.0))
+        self.assertAlmostEqual(values[:, 0].mean(), 1.0 / 3.0, delta=0.03)
+
+class TestPINNDataset(unittest.TestCase):
+    def setUp(self):
+        """Set up a directory of four small simulation samples"""
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        for i in range(4):
+            with h5py.File(root / f'sample_{i}.h5', 'w') as f:
+                f['velocity'] = np.zeros((4, 4, 2))
+                f['pressure'] = np.zeros((4, 4))
+                f['vorticity'] = np.zeros((4, 4))
+        with open(root / 'train_index.json', 'w') as f:
+            json.dump([{'file': f'sample_{i}.h5'} for i in range(4)], f)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_workers_draw_different_points(self):
+        """Test that loader workers and re-created workers draw distinct batches"""
+        dataset = PINNDataset(self.tmp.name, num_pde_points=32, num_bc_points=8,
+                              sampler_config={'pool_size': 1024, 'adaptive': None, 'seed': 0},
+                              cache_bytes=0)
+        loader = create_dataloader(dataset, batch_size=1, shuffle=False, num_workers=2,
+                                   persistent_workers=False, seed=0)
+        batches = [batch for _ in range(2) for batch in loader]
+        for key in ('x_pde', 'x_bc'):
+            points = [batch[key] for batch in batches]
+            for i in range(len(points)):
+                for j in range(i):
+                    self.assertFalse(torch.equal(points[i], points[j]), f"{key} of batches {j} and {i}")
+
+class TestFluidPINN(unittest.TestCase):
+    def setUp(self):
+        """Set up a float64 PINN and collocation points"""
+        torch.manual_seed(0)
+        self.model = FluidPINN(hidden_layers=[16, 16]).double()
+        self.x = torch.rand(8, 3, dtype=torch.float64)
+
+    def reference_derivatives(self):
+        """Per-point outputs, Jacobians and Laplacians from full Hessians"""
+        jacobians, laplacians = [], []
+        for point in self.x:
+            jacobians.append(torch.autograd.functional.jacobian(self.model, point))
+            laplacians.append(torch.stack([
+                torch.autograd.functional.hessian(lambda p: self.model(p)[i], point)[:2, :2].trace()
+                for i in range(2)
+            ]))
+        return self.model(self.x), torch.stack(jacobians), torch.stack(laplacians)
+
+    def test_derivatives_match_reference(self):
+        """Test that both residual modes give the reference first and second derivatives"""
+        reference = self.reference_derivatives()
+        for mode in ("autograd", "functional"):
+            self.model.residual_mode = mode
+            for value, expected in zip(self.model.compute_derivatives(self.x), reference):
+                torch.testing.assert_close(value, expected.detach(), rtol=1e-9, atol=1e-12)
+
+    def test_residual_modes_agree(self):
+        """Test that autograd and torch.func residual losses match"""
+        autograd = self.model.compute_pde_loss(self.x)
+        self.model.residual_mode = "functional"
+        functional = self.model.compute_pde_loss(self.x)
+        self.assertAlmostEqual(autograd.item(), functional.item(), places=12)
+        self.assertEqual(self.model.pointwise_residual(self.x).shape, (8,))
+
+    def test_compiled_residual(self):
+        """Test the compiled PDE loss and its eager fallback"""
+        expected = self.model.compute_pde_loss(self.x).item()
+        self.model.compile_residual = True
+        with mock.patch.object(torch, 'compile', side_effect=lambda fn: fn) as compile_fn:
+            self.assertAlmostEqual(self.model.compute_pde_loss(self.x).item(), expected, places=12)
+            self.model.compute_pde_loss(self.x)
+        compile_fn.assert_called_once()
+        self.assertTrue(self.model.compile_residual)
+
+        def failing(x):
+            raise RuntimeError("double backward is not supported")
+
+        self.model._compiled_pde_loss = None
+        with mock.patch.object(torch, 'compile', return_value=failing), \
+                self.assertLogs(self.model.logger, level='WARNING'):
+            loss = self.model.compute_pde_loss(self.x)
+        self.assertAlmostEqual(loss.item(), expected, places=12)
+        self.assertFalse(self.model.compile_residual)
+
+class TestCollateBatch(unittest.TestCase):
+    def setUp(self):
+        """Set up PINN-style and field-style samples"""
+        self.samples = [
+            {
+                'x_pde': torch.rand(10 + i, 3),
+                'x_bc': torch.rand(4, 3),
+                'bc_values': torch.zeros(4, 3),
+                'velocity': np.full((8, 8, 2), i, dtype=np.float32),
+                'mask': None
+            }
+            for i in range(3)
+        ]
+
+    def test_concatenate_and_stack(self):
+        """Test that point sets are concatenated and fields stacked"""
+        batch = collate_batch(self.samples)
+        self.assertEqual(tuple(batch['x_pde'].shape), (33, 3))
+        self.assertEqual(tuple(batch['x_bc'].shape), (12, 3))
+        self.assertEqual(tuple(batch['velocity'].shape), (3, 8, 8, 2))
+        self.assertTrue(torch.equal(batch['velocity'][2], torch.full((8, 8, 2), 2.0)))
+        self.assertIsNone(batch['mask'])
+
+    def test_dataloader(self):
+        """Test batching of a sample list through a DataLoader"""
+        loader = create_dataloader(self.samples, batch_size=2, shuffle=False, num_workers=0)
+        sizes = [len(batch['velocity']) for batch in loader]
+        self.assertEqual(sizes, [2, 1])
+
+class TestGradientAccumulation(unittest.TestCase):
+    def test_accumulated_step_matches_full_batch(self):
+        """Test that two scaled half-batches give the full-batch update"""
+        generator = torch.Generator().manual_seed(0)
+        x_pde = torch.rand(64, 3, generator=generator)
+        x_bc = torch.rand(16, 3, generator=generator)
+        bc_values = torch.zeros(16, 3)
+
+        torch.manual_seed(0)
+        full = FluidPINN(hidden_layers=[16, 16])
+        torch.manual_seed(0)
+        accumulated = FluidPINN(hidden_layers=[16, 16])
+
+        full.training_step(x_pde, x_bc, bc_values)
+        accumulated.training_step(x_pde[:32], x_bc[:8], bc_values[:8], loss_scale=0.5, step=False)
+        accumulated.training_step(x_pde[32:], x_bc[8:], bc_values[8:], loss_scale=0.5, step=True)
+
+        for a, b in zip(full.parameters(), accumulated.parameters()):
+            self.assertTrue(torch.allclose(a, b, atol=1e-6))
+
+    @unittest.skipUnless(ModelTrainer is not None, "trainer dependencies not available")
+    def test_partial_last_group(self):
+        """Test that a short last accumulation group is averaged over its own size"""
+        generator = torch.Generator().manual_seed(0)
+        batches = [
+            {'x_pde': torch.rand(32, 3, generator=generator),
+             'x_bc': torch.rand(8, 3, generator=generator),
+             'bc_values': torch.zeros(8, 3)}
+            for _ in range(3)
+        ]
+
+        torch.manual_seed(0)
+        trainer = ModelTrainer('pinn', {'hidden_layers': [16, 16], 'gradient_accumulation_steps': 2},
+                               'accumulation', use_wandb=False)
+        torch.manual_seed(0)
+        reference = FluidPINN(hidden_layers=[16, 16])
+
+        trainer._train_pinn_epoch(batches)
+        first = {key: torch.cat([batches[0][key], batches[1][key]]) for key in batches[0]}
+        reference.training_step(first['x_pde'], first['x_bc'], first['bc_values'])
+        reference.training_step(batches[2]['x_pde'], batches[2]['x_bc'], batches[2]['bc_values'])
+
+        for a, b in zip(reference.parameters(), trainer.model.parameters()):
+            self.assertTrue(torch.allclose(a, b, atol=1e-6))
+
+class CachedSquares(torch.utils.data.Dataset):
+    """Dataset that stores its samples in a shared cache"""
+    def __init__(self, cache: SharedSampleCache):
+        self.cache = cache
+
+    def __len__(self) -> int:
+        return 8
+
+    def __getitem__(self, idx: int):
+        sample = self.cache.get(idx)
+        if sample is None:
+            sample = {'value': np.full(4, idx ** 2, dtype=np.float32)}
+            self.cache.put(idx, sample)
+        return sample
+
+class TestSharedSampleCache(unittest.TestCase):
+    def setUp(self):
+        """Set up a cache that holds about three 1 KiB samples"""
+        self.cache = SharedSampleCache({'capacity_bytes': 3600, 'max_entries': 16})
+        self.sample = lambda i: {'data': np.full(128, i, dtype=np.float64)}
+
+    def tearDown(self):
+        self.cache.close()
+
+    def test_lru_eviction(self):
+        """Test that the least recently used sample is evicted first"""
+        for i in range(3):
+            self.assertTrue(self.cache.put(i, self.sample(i)))
+        self.assertEqual(self.cache.get(0)['data'][0], 0)
+        self.cache.put(3, self.sample(3))
+        self.assertIn(0, self.cache)
+        self.assertNotIn(1, self.cache)
+        self.assertLessEqual(self.cache.stats()['bytes_used'], 3600)
+        self.assertFalse(self.cache.put(4, {'data': np.zeros(1000)}))
+
+    def test_counters(self):
+        """Test hit and miss counters"""
+        self.assertIsNone(self.cache.get(0))
+        self.cache.put(0, self.sample(0))
+        self.cache.get(0)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 1, 1))
+
+    def test_shared_across_workers(self):
+        """Test that samples cached by loader workers are visible everywhere"""
+        cache = SharedSampleCache({'capacity_bytes': 2 ** 20})
+        try:
+            loader = create_dataloader(CachedSquares(cache), batch_size=2, shuffle=False,
+                                       num_workers=2, persistent_workers=False)
+            for _ in range(2):
+                values = torch.cat([batch['value'][:, 0] for batch in loader])
+            self.assertEqual(values.tolist(), [float(i ** 2) for i in range(8)])
+            stats = cache.stats()
+            self.assertEqual((stats['misses'], stats['hits'], stats['entries']), (8, 8, 8))
+            self.assertEqual(cache.get(5)['value'][0], 25)
+        finally:
+            cache.close()
+
+class TestRunningMoments(unittest.TestCase):
+    def test_parallel_merge(self):
+        """Test that merged partial moments equal the moments of all data"""
+        rng = np.random.default_rng(0)
+        parts = [rng.normal(3.0, 2.0, (n, 2)) for n in (5, 100, 1, 37)]
+        merged = RunningMoments()
+        for part in parts:
+            partial = RunningMoments()
+            partial.update(part)
+            merged.merge(RunningMoments.from_dict(partial.to_dict()))
+        data = np.concatenate(parts)
+        self.assertEqual(merged.count, len(data))
+        np.testing.assert_allclose(merged.mean, data.mean(axis=0))
+        np.testing.assert_allclose(merged.std, data.std(axis=0))
+
+class TestDataPreprocessor(unittest.TestCase):
+    def setUp(self):
+        """Set up a directory of small simulation files"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.raw = Path(self.tmp.name) / 'raw'
+        self.out = Path(self.tmp.name) / 'processed'
+        self.raw.mkdir()
+        rng = np.random.default_rng(0)
+        self.velocity = []
+        for i in range(10):
+            velocity = rng.normal(i, 1.0, (12, 8, 2))
+            self.velocity.append(velocity)
+            with h5py.File(self.raw / f'sim_{i}.h5', 'w') as f:
+                f['velocity'] = velocity
+                f['pressure'] = rng.random((12, 8))
+                f['vorticity'] = rng.random((12, 8))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def preprocess(self):
+        # Small slabs so every field is read in several chunks
+        preprocessor = DataPreprocessor(self.raw, self.out, config={
+            'num_workers': 2, 'compression': 'lzf', 'chunk_bytes': 256
+        })
+        preprocessor.process_dataset()
+        return preprocessor
+
+    def test_statistics(self):
+        """Test statistics merged from parallel workers"""
+        self.preprocess()
+        velocity = np.concatenate([v.reshape(-1, 2) for v in self.velocity])
+        with np.load(self.out / 'statistics.npz') as stats:
+            np.testing.assert_allclose(stats['velocity_mean'], velocity.mean(axis=0))
+            np.testing.assert_allclose(stats['velocity_std'], velocity.std(axis=0))
+
+    def test_resume(self):
+        """Test that a rerun only processes missing outputs"""
+        self.preprocess()
+        outputs = sorted(self.out.glob('*_sim_*.h5'))
+        self.assertEqual(len(outputs), 10)
+        outputs[0].unlink()
+        mtimes = {path: path.stat().st_mtime_ns for path in outputs[1:]}
+
+        preprocessor = self.preprocess()
+        self.assertTrue(outputs[0].exists())
+        self.assertEqual(mtimes, {path: path.stat().st_mtime_ns for path in outputs[1:]})
+        self.assertEqual(preprocessor.stats['velocity'].count, 10 * 12 * 8)
+
+class TestBatchAugmentor(unittest.TestCase):
+    def setUp(self):
+        """Set up a batch of solid-body rotations (vorticity 2)"""
+        i, j = torch.meshgrid(torch.arange(24.0), torch.arange(32.0), indexing='ij')
+        x, y = j - 15.5, i - 11.5
+        self.inside = (x ** 2 + y ** 2) < 10.0 ** 2
+        self.batch = {
+            'velocity': torch.stack([-y, x], dim=-1).repeat(8, 1, 1, 1),
+            'vorticity': torch.full((8, 24, 32), 2.0),
+            'pressure': (x ** 2 + y ** 2).repeat(8, 1, 1),
+            'x_pde': torch.rand(100, 3)
+        }
+
+    def test_vector_rotation(self):
+        """Test that rotations and flips transform velocity and vorticity consistently"""
+        augmentor = BatchAugmentor({'scale_range': None})
+        out = augmentor(self.batch, epoch=0, step=0)
+        # Rotations leave a solid-body rotation unchanged, reflections reverse it
+        sign = out['vorticity'][:, 12, 16] / 2.0
+        self.assertTrue(torch.allclose(sign.abs(), torch.ones(8), atol=1e-5))
+        expected = self.batch['velocity'] * sign.view(-1, 1, 1, 1)
+        self.assertTrue(torch.allclose(out['velocity'][:, self.inside],
+                                       expected[:, self.inside], atol=1e-3))
+        # Bilinear resampling of r^2 is exact up to 0.5 per cell
+        self.assertTrue(torch.allclose(out['pressure'][:, self.inside],
+                                       self.batch['pressure'][:, self.inside], atol=0.5))
+        self.assertIs(out['x_pde'], self.batch['x_pde'])
+
+    def test_deterministic(self):
+        """Test that batches are reproducible per (seed, epoch, step)"""
+        augmentor = BatchAugmentor({'crop_size': (16, 16), 'seed': 3})
+        first = augmentor(self.batch, epoch=1, step=2)
+        second = augmentor(self.batch, epoch=1, step=2)
+        other = augmentor(self.batch, epoch=2, step=2)
+        self.assertEqual(tuple(first['velocity'].shape), (8, 16, 16, 2))
+        self.assertTrue(torch.equal(first['velocity'], second['velocity']))
+        self.assertFalse(torch.equal(first['velocity'], other['velocity']))
+
+    def test_evaluation(self):
+        """Test that evaluation only center-crops and normalizes"""
+        with tempfile.TemporaryDirectory() as tmp:
+            stats_file = Path(tmp) / 'statistics.npz'
+            np.savez(stats_file, pressure_mean=np.array([1.0]), pressure_std=np.array([2.0]))
+            augmentor = BatchAugmentor({'crop_size': (8, 8), 'stats_file': stats_file})
+        out = augmentor(self.batch, train=False)
+        expected = (self.batch['pressure'][:, 8:16, 12:20] - 1.0) / 2.0
+        self.assertTrue(torch.equal(out['pressure'], expected))
+        self.assertTrue(torch.equal(out['velocity'], self.batch['velocity'][:, 8:16, 12:20]))
+
+class TestAnomalyDetector(unittest.TestCase):
+    def setUp(self):
+        """Set up a detector with fitted scalers and a stack of frames"""
+        torch.manual_seed(0)
+        rng = np.random.default_rng(0)
+        self.frames = {
+            'velocity': rng.normal(1.0, 0.5, (10, 16, 16, 2)),
+            'pressure': rng.normal(0.0, 2.0, (10, 16, 16)),
+            'vorticity': rng.normal(0.0, 1.0, (10, 16, 16))
+        }
+        self.detector = AnomalyDetector((16, 16), history_size=4)
+        self.detector.preprocess_data(
+            self.frames['velocity'][0], self.frames['pressure'][0],
+            self.frames['vorticity'][0], fit_scalers=True
+        )
+        self.detector.anomaly_threshold = 0.5
+
+    def test_batch_matches_single_frames(self):
+        """Test that batched detection matches the scaler-based path"""
+        masks, scores = self.detector.detect_batch(
+            self.frames['velocity'], self.frames['pressure'], self.frames['vorticity'], batch_size=4
+        )
+        for i in (0, 7):
+            x = self.detector.preprocess_data(
+                self.frames['velocity'][i], self.frames['pressure'][i], self.frames['vorticity'][i]
+            )
+            with torch.no_grad():
+                reconstructed, _ = self.detector.autoencoder(x)
+            error = ((reconstructed - x) ** 2).mean(dim=1)[0].numpy()
+            self.assertAlmostEqual(scores[i], error.mean(), places=5)
+            np.testing.assert_array_equal(masks[i], error > 0.5)
+
+    def test_train(self):
+        """Test training on the detector's device and the fitted threshold"""
+        devices = ['cpu'] + (['cuda'] if torch.cuda.is_available() else [])
+        samples = [{key: value[i] for key, value in self.frames.items()} for i in range(4)]
+        for device in devices:
+            detector = AnomalyDetector((16, 16), device=device)
+            detector.train(list(samples), num_epochs=1, batch_size=2)
+            self.assertIsNotNone(detector.anomaly_threshold)
+            masks, _ = detector.detect_batch(*(self.frames[key][:2] for key in
+                                               ('velocity', 'pressure', 'vorticity')))
+            self.assertEqual(masks.shape, (2, 16, 16))
+
+    def test_bounded_history(self):
+        """Test that streaming keeps only the latest frames"""
+        snapshots = ({key: value[i] for key, value in self.frames.items()} for i in range(10))
+        results = list(self.detector.detect_stream(snapshots, batch_size=3))
+        self.assertEqual(len(results), 10)
+        stats = self.detector.get_stats()
+        self.assertEqual(stats['num_frames'], 10)
+        self.assertEqual(stats['anomaly_scores'], [score for _, score in results[-4:]])
+
+class TestMeshOptimizer(unittest.TestCase):
+    def setUp(self):
+        """Set up an optimizer and mixed refinement levels"""
+        self.optimizer = MeshOptimizer((6, 5))
+        self.levels = np.random.default_rng(0).integers(0, 4, (6, 5))
+
+    def test_refined_mesh_matches_loop(self):
+        """Test that vectorized refinement reproduces the per-node points"""
+        height, width = self.levels.shape
+        X, Y = np.meshgrid(np.linspace(0, 1, width), np.linspace(0, 1, height))
+        dx, dy = 1.0 / (width - 1), 1.0 / (height - 1)
+        expected_x, expected_y = [], []
+        for i in range(height):
+            for j in range(width):
+                k = 2 ** self.levels[i, j]
+                x_grid, y_grid = np.meshgrid(X[i, j] + dx * np.arange(k) / k,
+                                             Y[i, j] + dy * np.arange(k) / k)
+                expected_x.extend(x_grid.flatten())
+                expected_y.extend(y_grid.flatten())
+        x, y = self.optimizer.generate_refined_mesh(self.levels)
+        np.testing.assert_allclose(x, expected_x, atol=1e-12)
+        np.testing.assert_allclose(y, expected_y, atol=1e-12)
+
+    def test_quadtree_cells(self):
+        """Test that quadtree leaves tile the domain"""
+        tree = self.optimizer.generate_quadtree(self.levels, extent=(2.0, 1.0))
+        self.assertEqual(tree.num_cells, int((4 ** self.levels).sum()))
+        mesh = tree.to_mesh()
+        self.assertAlmostEqual(sum(cell.volume for cell in mesh.cells), 2.0)
+        amr = tree.to_amr(max_level=3)
+        np.testing.assert_array_equal(amr.cell_levels, tree.levels)
+
+    def test_quadtree_neighbors(self):
+        """Test face neighbors across refinement levels"""
+        tree = self.optimizer.generate_quadtree(np.array([[0, 1]]))
+        # Coarse cell 0 borders the two left leaves of the refined cell
+        np.testing.assert_array_equal(tree.cell_neighbors(0), [1, 3])
+        np.testing.assert_array_equal(tree.cell_neighbors(1), [0, 2, 3])
+        self.assertEqual(len(tree.vertices), 11)
+        for cell in range(tree.num_cells):
+            for neighbor in tree.cell_neighbors(cell):
+                self.assertIn(cell, tree.cell_neighbors(neighbor))
+
+    def test_quadtree_mesh_neighbors(self):
+        """Test that the converted Mesh keeps face neighbors across hanging edges"""
+        tree = self.optimizer.generate_quadtree(np.array([[0, 2]]))
+        mesh = tree.to_mesh()
+        # Leaves 5 and 9 touch the coarse cell only along its edge, not at a vertex
+        self.assertEqual(sorted(mesh.cells[0].neighbors), [1, 5, 9, 13])
+        self.assertIn(0, mesh.cells[5].neighbors)
+        # Leaves 1 and 6 share only a corner
+        self.assertNotIn(6, mesh.cells[1].neighbors)
+        for cell in mesh.cells:
+            self.assertEqual(sorted(cell.neighbors), tree.cell_neighbors(cell.id).tolist())
+
+class TestInferenceExport(unittest.TestCase):
+    def setUp(self):
+        """Set up an export directory"""
+        torch.manual_seed(0)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_pinn_int8_torchscript(self):
+        """Test that the int8 PINN export stays close to the eager network"""
+        model = FluidPINN()
+        x = torch.rand(256, 3)
+        expected = model.predict(x)
+        model.export_inference(self.path, batch_size=64)
+        model.load_inference(self.path, runtime='torchscript')
+        self.assertTrue(model.inference_model.meta['quantized'])
+        np.testing.assert_allclose(model.predict(x.numpy()), expected, atol=0.05)
+
+    def test_feature_detector_auto_runtime(self):
+        """Test that the channels-last CNN export matches the eager scores"""
+        optimizer = MeshOptimizer((16, 16))
+        rng = np.random.default_rng(0)
+        fields = (rng.random((16, 16, 2)), rng.random((16, 16)), rng.random((16, 16)))
+        expected = optimizer.compute_feature_scores(*fields)
+        optimizer.export_inference(self.path)
+        optimizer.load_inference(self.path)
+        self.assertIn(optimizer.inference_model.runtime, available_runtimes(self.path))
+        np.testing.assert_allclose(optimizer.compute_feature_scores(*fields), expected, atol=1e-5)
+
+    @unittest.skipUnless(onnxruntime is not None, "onnxruntime not installed")
+    def test_anomaly_detector_onnxruntime(self):
+        """Test detection through ONNX Runtime"""
+        detector = AnomalyDetector((16, 16))
+        detector.anomaly_threshold = 0.5
+        rng = np.random.default_rng(0)
+        frames = (rng.random((3, 16, 16, 2)), rng.random((3, 16, 16)), rng.random((3, 16, 16)))
+        _, expected = detector.detect_batch(*frames)
+        detector.export_inference(self.path, batch_size=2)
+        detector.load_inference(self.path, runtime='onnxruntime')
+        _, scores = detector.detect_batch(*frames)
+        np.testing.assert_allclose(scores, expected, rtol=1e-4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import numpy as np
+from navierflow.core.immersed.kernels import (
+    peskin_phi_3,
+    peskin_phi_4,
+    spread_forces,
+    interpolate_field
+)
+from navierflow.core.immersed.cut_cell import CutCellGeometry, half_plane_fraction
+
+class TestPeskinKernels(unittest.TestCase):
+    def test_partition_of_unity(self):
+        """Test that both kernels sum to one and have zero first moment"""
+        for phi in (peskin_phi_3, peskin_phi_4):
+            for shift in (0.0, 0.25, 0.5, 0.8):
+                r = np.arange(-4, 5) + shift
+                weights = phi(r)
+                self.assertAlmostEqual(weights.sum(), 1.0, places=12)
+                self.assertAlmostEqual((weights * r).sum(), 0.0, places=12)
+
+    def test_spreading_conserves_force(self):
+        """Test that spreading preserves the total force"""
+        rng = np.random.default_rng(0)
+        points = rng.uniform(4.0, 28.0, size=(64, 2))
+        forces = rng.normal(size=(64, 2))
+
+        fluid_force = np.zeros((32, 32, 2))
+        spread_forces(points, forces, fluid_force)
+
+        np.testing.assert_allclose(fluid_force.sum(axis=(0, 1)), forces.sum(axis=0))
+
+    def test_interpolation_of_linear_field(self):
+        """Test that interpolation reproduces a linear field exactly"""
+        ii, jj = np.meshgrid(np.arange(32) + 0.5, np.arange(32) + 0.5, indexing='ij')
+        field = 2.0 * ii - jj
+        points = np.array([[10.3, 12.7], [15.5, 15.5], [20.1, 8.9]])
+
+        values = interpolate_field(field, points)
+
+        np.testing.assert_allclose(values, 2.0 * points[:, 0] - points[:, 1])
+
+class TestCutCellGeometry(unittest.TestCase):
+    def setUp(self):
+        """Set up a circular boundary"""
+        theta = np.linspace(0.0, 2.0 * np.pi, 400, endpoint=False)
+        self.normals = np.stack([np.cos(theta), np.sin(theta)], axis=1)
+        self.points = np.array([16.0, 16.0]) + 6.0 * self.normals
+
+    def test_half_plane_fraction(self):
+        """Test exact volume fractions for straight interfaces"""
+        normals = np.array([[1.0, 0.0], [0.6, 0.8], [0.6, 0.8]])
+        distance = np.array([0.25, 0.0, -2.0])
+
+        np.testing.assert_allclose(half_plane_fraction(normals, distance), [0.75, 0.5, 0.0])
+
+    def test_solid_area(self):
+        """Test that the cut cells recover the enclosed area"""
+        geometry = CutCellGeometry(32, 32)
+        geometry.set_boundary(self.points, self.normals)
+
+        solid_area = (1.0 - geometry.volume_fraction).sum()
+        self.assertAlmostEqual(solid_area, np.pi * 36.0, delta=1.0)
+
+    def test_partial_update_matches_full_rebuild(self):
+        """Test that invalidating moved markers matches a full recompute"""
+        geometry = CutCellGeometry(32, 32)
+        geometry.set_boundary(self.points, self.normals)
+
+        moved = self.points.copy()
+        moved[:20] += 0.3
+        geometry.sync(moved, self.normals)
+        recomputed = geometry.update()
+
+        reference = CutCellGeometry(32, 32)
+        reference.set_boundary(moved, self.normals)
+
+        self.assertLess(recomputed, 32 * 32)
+        np.testing.assert_allclose(geometry.volume_fraction, reference.volume_fraction)
+        np.testing.assert_allclose(geometry.face_apertures, reference.face_apertures)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,254 @@
+import unittest
+import numpy as np
+import taichi as ti
+from navierflow.core.spectral.particle_velocity import ParticleVelocityEngine
+from navierflow.core.spectral.particle_pool import ParticlePool
+from navierflow.core.spectral.pseudo_spectral import PseudoSpectralEngine
+from navierflow.core.turbulence.statistics import (
+    energy_spectrum,
+    structure_functions,
+    TurbulenceStatistics,
+    FlowStatisticsAccumulator,
+    pdf_window
+)
+
+class TestParticleVelocityEngine(unittest.TestCase):
+    def setUp(self):
+        """Set up a random vortex blob"""
+        rng = np.random.default_rng(0)
+        self.positions = rng.normal(64.0, 12.0, size=(3000, 2))
+        self.circulation = rng.normal(size=3000)
+
+    def test_fast_methods_match_direct_sum(self):
+        """Test that the treecode and FMM reproduce the direct Biot-Savart sum"""
+        reference = ParticleVelocityEngine({'method': 'direct'}).compute_velocity(
+            self.positions, self.circulation)
+
+        for method in ('tree', 'fmm'):
+            velocity = ParticleVelocityEngine({'method': method}).compute_velocity(
+                self.positions, self.circulation)
+            error = np.linalg.norm(velocity - reference) / np.linalg.norm(reference)
+            self.assertLess(error, 1e-4, method)
+
+    def test_pse_conserves_circulation(self):
+        """Test that particle strength exchange conserves total circulation"""
+        engine = ParticleVelocityEngine({'core_size': 2.0})
+        rate = engine.compute_pse(self.positions, self.circulation,
+                                  np.ones(len(self.positions)), viscosity=0.01)
+
+        self.assertAlmostEqual(rate.sum(), 0.0, places=10)
+        self.assertGreater(np.abs(rate).max(), 0.0)
+
+class TestParticlePool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Initialize Taichi"""
+        ti.init(arch=ti.cpu)
+
+    def setUp(self):
+        """Set up a random vorticity field"""
+        rng = np.random.default_rng(0)
+        self.values = rng.normal(size=(64, 64)).astype(np.float32)
+        self.vorticity = ti.field(dtype=ti.f32, shape=(64, 64))
+        self.vorticity.from_numpy(self.values)
+
+    def test_seeding_is_exact_and_grows(self):
+        """Test that prefix-sum seeding places one particle per flagged cell"""
+        pool = ParticlePool({'initial_capacity': 128, 'max_capacity': 10000})
+        seeded = pool.seed_from_field(self.vorticity, 1.0)
+
+        expected = np.argwhere(np.abs(self.values) > 1.0)
+        self.assertEqual(seeded, len(expected))
+        self.assertGreaterEqual(pool.capacity, seeded)
+        self.assertEqual(sorted(map(tuple, pool.get_positions().astype(int))),
+                         sorted(map(tuple, expected)))
+
+    def test_capacity_limit_drops_excess(self):
+        """Test that seeding never writes past the hard capacity"""
+        pool = ParticlePool({'initial_capacity': 64, 'max_capacity': 100})
+        seeded = pool.seed_from_field(self.vorticity, 0.0)
+
+        self.assertEqual(seeded, 100)
+        self.assertEqual(pool.stats['dropped'], 64 * 64 - 100)
+
+    def test_compaction_keeps_live_particles_contiguous(self):
+        """Test that compaction removes dead particles and preserves the rest"""
+        pool = ParticlePool({'initial_capacity': 4096, 'max_capacity': 4096})
+        seeded = pool.seed_from_field(self.vorticity, 1.0)
+
+        active = pool.active.to_numpy()
+        active[:seeded:2] = 0
+        pool.active.from_numpy(active)
+        expected = np.sort(pool.get_strengths()[:, 1])
+
+        pool.compact()
+
+        self.assertEqual(pool.num_live, seeded // 2)
+        self.assertTrue(pool.live_mask().all())
+        np.testing.assert_allclose(np.sort(pool.get_strengths()[:, 1]), expected)
+
+class TestPseudoSpectralEngine(unittest.TestCase):
+    def setUp(self):
+        """Set up a smooth random vorticity field"""
+        n = 64
+        rng = np.random.default_rng(0)
+        k = np.hypot(*np.meshgrid(np.fft.fftfreq(n), np.fft.fftfreq(n), indexing='ij'))
+        self.vorticity = np.real(np.fft.ifft2(np.fft.fft2(rng.normal(size=(n, n))) * (k < 0.1)))
+        self.vorticity -= self.vorticity.mean()
+
+    def test_taylor_green_decay(self):
+        """Test exact viscous decay of a steady Taylor-Green vortex"""
+        n, nu, dt = 64, 0.5, 0.5
+        engine = PseudoSpectralEngine(n, n, {'viscosity': nu, 'dt': dt})
+        x = np.arange(n)
+        X, Y = np.meshgrid(x, x, indexing='ij')
+        k = 2.0 * np.pi * 2 / n
+        initial = np.sin(k * X) * np.sin(k * Y)
+        engine.set_vorticity(initial)
+
+        for _ in range(20):
+            engine.etdrk4_step()
+
+        expected = initial * np.exp(-2.0 * nu * k * k * 20 * dt)
+        np.testing.assert_allclose(engine.vorticity(), expected, atol=1e-12)
+
+    def test_velocity_roundtrip(self):
+        """Test that setting the velocity recovers the same vorticity"""
+        engine = PseudoSpectralEngine(64, 64)
+        engine.set_vorticity(self.vorticity)
+
+        other = PseudoSpectralEngine(64, 64)
+        other.set_velocity(engine.velocity())
+
+        np.testing.assert_allclose(other.vorticity(), engine.vorticity(), atol=1e-12)
+
+    def test_etdrk4_is_fourth_order(self):
+        """Test temporal convergence on a nonlinear flow"""
+        results = {}
+        for dt in (0.8, 0.4, 0.1):
+            engine = PseudoSpectralEngine(64, 64, {'viscosity': 1e-2})
+            engine.set_vorticity(self.vorticity)
+            for _ in range(int(round(8.0 / dt))):
+                engine.etdrk4_step(dt)
+            results[dt] = engine.vorticity()
+
+        coarse = np.abs(results[0.8] - results[0.1]).max()
+        fine = np.abs(results[0.4] - results[0.1]).max()
+        self.assertGreater(coarse / fine, 8.0)
+
+class TestTurbulenceStatistics(unittest.TestCase):
+    def setUp(self):
+        """Set up a random velocity field on a non-square grid"""
+        self.velocity = np.random.default_rng(3).normal(size=(48, 40, 2))
+
+    def test_spectrum_matches_full_fft_binning(self):
+        """Test rfft2 shell binning against full-spectrum masks"""
+        k, spectrum = energy_spectrum(self.velocity)
+
+        u_hat = np.fft.fft2(self.velocity[..., 0])
+        v_hat = np.fft.fft2(self.velocity[..., 1])
+        density = 0.5 * (np.abs(u_hat) ** 2 + np.abs(v_hat) ** 2) / (48 * 40) ** 2
+        kx = 2 * np.pi * np.fft.fftfreq(48)[:, None]
+        ky = 2 * np.pi * np.fft.fftfreq(40)[None, :]
+        shells = np.rint(np.sqrt(kx ** 2 + ky ** 2) / (2 * np.pi / 40))
+        expected = [density[shells == s].sum() for s in range(len(k))]
+
+        np.testing.assert_allclose(spectrum, expected, rtol=1e-10)
+
+    def test_structure_functions_of_linear_field(self):
+        """Test that a uniform strain gives S_p(r) = (a r)^p"""
+        x, y = np.meshgrid(np.arange(32.0), np.arange(32.0), indexing='ij')
+        velocity = np.stack([0.5 * x, 0.5 * y], axis=-1)
+
+        result = structure_functions(velocity, max_separation=4, orders=(2, 3))
+
+        r = result['r']
+        np.testing.assert_allclose(result['longitudinal'], [(0.5 * r) ** 2, (0.5 * r) ** 3])
+        np.testing.assert_allclose(result['transverse'], 0.0)
+
+    def test_time_average(self):
+        """Test that streamed snapshots average to the mean spectrum"""
+        statistics = TurbulenceStatistics((48, 40))
+        statistics.add_snapshot(self.velocity)
+        statistics.add_snapshot(2.0 * self.velocity)
+
+        k, mean = statistics.mean_spectrum()
+        np.testing.assert_allclose(mean, 2.5 * energy_spectrum(self.velocity)[1])
+        self.assertEqual(statistics.mean_structure_functions()['longitudinal'].shape, (2, 10))
+
+class TestFlowStatisticsAccumulator(unittest.TestCase):
+    def setUp(self):
+        """Set up a skewed random velocity history"""
+        rng = np.random.default_rng(4)
+        self.history = rng.gamma(2.0, size=(40, 8, 6, 2)) + np.array([1.0, -0.5])
+
+    def test_streaming_moments(self):
+        """Test one-at-a-time updates against moments of the full history"""
+        statistics = FlowStatisticsAccumulator()
+        for snapshot in self.history:
+            statistics.update(snapshot)
+
+        fluctuations = self.history - self.history.mean(axis=0)
+        variance = fluctuations.var(axis=0)
+        np.testing.assert_allclose(statistics.mean, self.history.mean(axis=0))
+        np.testing.assert_allclose(statistics.variance, variance)
+        np.testing.assert_allclose(statistics.covariance[..., 0, 1],
+                                   np.mean(fluctuations[..., 0] * fluctuations[..., 1], axis=0))
+        np.testing.assert_allclose(statistics.skewness,
+                                   np.mean(fluctuations ** 3, axis=0) / variance ** 1.5)
+        np.testing.assert_allclose(statistics.flatness,
+                                   np.mean(fluctuations ** 4, axis=0) / variance ** 2)
+
+    def test_merge_parallel_runs(self):
+        """Test that merging two partial accumulators equals one pass"""
+        history = np.concatenate([self.history[:10], 1.3 * self.history[10:]])
+        for config in (None, pdf_window(self.history[:5])):
+            full = FlowStatisticsAccumulator(config)
+            full.update(history, batch=True)
+            first = FlowStatisticsAccumulator(config)
+            first.update(history[:10], batch=True)
+            second = FlowStatisticsAccumulator(config)
+            second.update(history[10:], batch=True)
+
+            merged = first.merge(second)
+
+            for name in ('mean', 'covariance', 'skewness', 'flatness'):
+                np.testing.assert_allclose(getattr(merged, name), getattr(full, name))
+            if config is None:
+                self.assertIsNone(merged.pdf_counts)
+                with self.assertRaises(ValueError):
+                    merged.joint_pdf()
+            else:
+                np.testing.assert_array_equal(merged.pdf_counts, full.pdf_counts)
+                self.assertEqual(merged.pdf_outliers, full.pdf_outliers)
+                pdf, u_edges, v_edges = merged.joint_pdf()
+                # Samples outside the window count towards the normalization
+                inside = 1.0 - merged.pdf_outliers / history[..., 0].size
+                self.assertAlmostEqual((pdf * np.outer(np.diff(u_edges), np.diff(v_edges))).sum(), inside)
+
+        with self.assertRaises(ValueError):
+            FlowStatisticsAccumulator({'pdf_range': 1.0}).merge(FlowStatisticsAccumulator({'pdf_range': 2.0}))
+
+    def test_joint_pdf_independent_of_update_order(self):
+        """Test that the joint PDF bins against the fixed reference, not the running mean"""
+        config = pdf_window(self.history)
+        forward = FlowStatisticsAccumulator(config)
+        for snapshot in self.history:
+            forward.update(snapshot)
+        backward = FlowStatisticsAccumulator(config)
+        for snapshot in self.history[::-1]:
+            backward.update(snapshot)
+
+        np.testing.assert_array_equal(forward.pdf_counts, backward.pdf_counts)
+        # A single snapshot is spread over the window, not collapsed to the centre bin
+        single = FlowStatisticsAccumulator(config)
+        single.update(self.history[0])
+        self.assertGreater(np.count_nonzero(single.pdf_counts), 4)
+
+        fluctuations = self.history - self.history.mean(axis=0)
+        expected, _, _ = np.histogram2d(fluctuations[..., 0].ravel(), fluctuations[..., 1].ravel(),
+                                        bins=forward.pdf_edges)
+        np.testing.assert_array_equal(forward.pdf_counts, expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import threading
+import unittest
+import numpy as np
+import torch
+from navierflow.core.hybrid_engine import HybridPhysicsEngine
+from navierflow.core.stage_scheduler import Stage, StageScheduler
+
+class TestStageScheduler(unittest.TestCase):
+    def setUp(self):
+        """Set up a CPU scheduler"""
+        self.scheduler = StageScheduler({'device': 'cpu'})
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+
+    def test_independent_stages_overlap(self):
+        """Test that independent stages run concurrently"""
+        # Each stage waits for the others; serialized stages would break the barrier
+        barrier = threading.Barrier(3, timeout=10.0)
+
+        def stage(name):
+            return Stage(name, lambda inputs: barrier.wait())
+
+        results = self.scheduler.run([stage('a'), stage('b'), stage('c')])
+        self.assertEqual(sorted(results.values()), [0, 1, 2])
+
+    def test_dependencies_are_respected(self):
+        """Test that a dependent stage receives its inputs after they finish"""
+        ml_started = threading.Event()
+
+        def fluid(inputs):
+            # An early ML stage would set the event while fluid is still running
+            return {'ml_started_early': ml_started.wait(timeout=0.2)}
+
+        def ml(inputs):
+            ml_started.set()
+            return inputs
+
+        results = self.scheduler.run([Stage('fluid', fluid), Stage('ml', ml, depends_on=('fluid',))])
+        self.assertFalse(results['fluid']['ml_started_early'])
+        self.assertEqual(results['ml'], {'fluid': results['fluid']})
+        with self.assertRaises(ValueError):
+            self.scheduler.run([Stage('ml', ml, depends_on=('missing',))])
+
+    def test_overlap_efficiency(self):
+        """Test the efficiency of serialized and fully overlapped steps"""
+        stages = [Stage('a', None), Stage('b', None), Stage('c', None, depends_on=('a',))]
+        times = {'a': 10.0, 'b': 20.0, 'c': 5.0}
+        self.scheduler._record(stages, times, 35.0)
+        self.assertEqual(self.scheduler.metrics['critical_path'], 20.0)
+        self.assertEqual(self.scheduler.metrics['overlap_efficiency'], 0.0)
+        self.scheduler._record(stages, times, 20.0)
+        self.assertEqual(self.scheduler.metrics['overlap_efficiency'], 1.0)
+
+    def test_context_manager_stops_workers(self):
+        """Test that leaving the context shuts the thread pool down"""
+        with StageScheduler({'device': 'cpu'}) as scheduler:
+            scheduler.run([Stage('a', lambda inputs: 1)])
+        with self.assertRaises(RuntimeError):
+            scheduler.run([Stage('a', lambda inputs: 1)])
+
+class FakeFluidSolver:
+    """Fluid solver whose velocity is the number of steps taken"""
+    def __init__(self, barrier=None):
+        self.steps = 0
+        self.barrier = barrier
+
+    def step(self):
+        if self.barrier is not None:
+            self.barrier.wait()
+        self.steps += 1
+
+    def get_visualization_data(self):
+        return {'velocity': np.full((4, 4, 2), float(self.steps))}
+
+class FakeMLSolver:
+    """Surrogate recording the fluid states it is conditioned on"""
+    def __init__(self, barrier=None):
+        self.states = []
+        self.barrier = barrier
+
+    def forward(self, dt, fluid_state):
+        if self.barrier is not None:
+            self.barrier.wait()
+        self.states.append(fluid_state)
+        return {'velocity': torch.zeros(4, 4, 2), 'pressure': torch.zeros(4, 4)}
+
+class CPUEngine(HybridPhysicsEngine):
+    """Hybrid engine with in-memory solvers"""
+    def _initialize_solvers(self):
+        barrier = threading.Barrier(2, timeout=10.0) if self.config['ml_lag'] else None
+        self.taichi_solver = FakeFluidSolver(barrier)
+        self.modulus_solver = FakeMLSolver(barrier)
+
+class TestHybridPhysicsEngine(unittest.TestCase):
+    def test_ml_lag_uses_previous_fluid_state(self):
+        """Test that with ml_lag the ML stage overlaps fluid and reads the previous step"""
+        with CPUEngine(4, 4, config={'device': 'cpu', 'ml_lag': True}) as engine:
+            # The fake solvers meet at a barrier, so the stages must overlap
+            first = engine.step(0.1)
+            second = engine.step(0.1)
+
+        self.assertEqual(engine.modulus_solver.states[0], {})
+        self.assertEqual(first['ml_state_step'], -1)
+        np.testing.assert_array_equal(engine.modulus_solver.states[1]['velocity'], 1.0)
+        self.assertEqual(second['ml_state_step'], 0)
+        np.testing.assert_array_equal(second['velocity'], 2.0)
+        self.assertEqual(second['ml_velocity'].shape, (4, 4, 2))
+
+    def test_without_ml_lag_ml_waits_for_fluid(self):
+        """Test that without ml_lag the ML stage reads the current step's fluid state"""
+        with CPUEngine(4, 4, config={'device': 'cpu', 'ml_lag': False}) as engine:
+            first = engine.step(0.1)
+            second = engine.step(0.1)
+
+        np.testing.assert_array_equal(engine.modulus_solver.states[0]['velocity'], 1.0)
+        np.testing.assert_array_equal(engine.modulus_solver.states[1]['velocity'], 2.0)
+        self.assertEqual([first['ml_state_step'], second['ml_state_step']], [0, 1])
+        metrics = engine.get_performance_metrics()
+        self.assertGreaterEqual(metrics['step_time'], 0.0)
+        self.assertIn('ml_inference_time', metrics)
+
+if __name__ == "__main__":
+    unittest.main()
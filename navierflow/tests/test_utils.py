@@ -0,0 +1,110 @@
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from navierflow.utils.fft_backend import FFTConfig, ScipyFFTBackend, get_fft_backend
+
+try:
+    from navierflow.utils.fft_backend import PyFFTWBackend
+    import pyfftw
+except ImportError:
+    pyfftw = None
+
+class TestFFTBackend(unittest.TestCase):
+    def setUp(self):
+        """Set up a batch of real fields"""
+        rng = np.random.default_rng(0)
+        self.fields = rng.normal(size=(3, 32, 30))
+
+    def test_batched_transforms_match_numpy(self):
+        """Test batched forward and inverse transforms against numpy"""
+        for name in ('scipy', 'torch'):
+            backend = get_fft_backend(name)
+            spectrum = backend.rfftn(self.fields)
+
+            np.testing.assert_allclose(spectrum, np.fft.rfft2(self.fields), atol=1e-10)
+            np.testing.assert_allclose(backend.irfftn(spectrum, (32, 30)), self.fields, atol=1e-12)
+            np.testing.assert_allclose(backend.fftn(self.fields), np.fft.fft2(self.fields), atol=1e-10)
+
+    def test_plans_are_cached_per_shape(self):
+        """Test that repeated transforms reuse their plan"""
+        backend = get_fft_backend('scipy', max_cached_plans=2)
+        backend.clear_plans()
+        misses = backend.stats['plan_misses']
+
+        backend.rfftn(self.fields)
+        backend.rfftn(self.fields)
+        backend.rfftn(self.fields[0])
+
+        self.assertEqual(backend.stats['plan_misses'] - misses, 2)
+
+    def test_backends_are_shared(self):
+        """Test that callers with the same configuration share an instance"""
+        self.assertIs(get_fft_backend('scipy'), get_fft_backend())
+
+    def test_plans_are_built_outside_the_cache_lock(self):
+        """Test that a slow plan build neither blocks cache hits nor runs twice"""
+        release = threading.Event()
+        building = threading.Event()
+        builds = []
+        released = []
+
+        class SlowPlanner(ScipyFFTBackend):
+            def _build_plan(self, kind, x, axes, out_shape):
+                builds.append(x.shape)
+                if x.shape == (16, 16):
+                    building.set()
+                    released.append(release.wait(timeout=5.0))
+                return super()._build_plan(kind, x, axes, out_shape)
+
+        backend = SlowPlanner()
+        backend.rfftn(self.fields[0])
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            slow = [executor.submit(backend.rfftn, np.ones((16, 16))) for _ in range(2)]
+            self.assertTrue(building.wait(timeout=10.0))
+            # Cache hits and other plans proceed while (16, 16) is planned
+            np.testing.assert_allclose(backend.rfftn(self.fields[0]), np.fft.rfft2(self.fields[0]))
+            backend.rfftn(self.fields[1:])
+            release.set()
+            for future in slow:
+                np.testing.assert_allclose(future.result(), np.fft.rfft2(np.ones((16, 16))))
+
+        # The build was released by this thread, not by its timeout
+        self.assertEqual(released, [True])
+        self.assertEqual(builds.count((16, 16)), 1)
+        self.assertEqual(backend.stats['plan_hits'], 2)
+
+    @unittest.skipUnless(pyfftw is not None, "pyfftw not installed")
+    def test_shared_plan_is_thread_safe(self):
+        """Test that threads sharing a pyFFTW plan get their own results"""
+        backend = PyFFTWBackend(FFTConfig(planner_effort='FFTW_ESTIMATE', workers=1))
+        fields = np.random.default_rng(1).normal(size=(32, 64, 64))
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            spectra = list(executor.map(lambda field: [backend.rfftn(field) for _ in range(20)], fields))
+        for field, results in zip(fields, spectra):
+            for spectrum in results:
+                np.testing.assert_allclose(spectrum, np.fft.rfft2(field), atol=1e-9)
+
+    @unittest.skipUnless(pyfftw is not None, "pyfftw not installed")
+    def test_wisdom_saved_in_batches(self):
+        """Test that wisdom is written after a batch of new plans, not per plan"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'wisdom.pkl')
+            backend = PyFFTWBackend(FFTConfig(
+                wisdom_file=path, wisdom_save_interval=3, planner_effort='FFTW_ESTIMATE'
+            ))
+            for n in (8, 10):
+                backend.rfftn(np.zeros((n, n)))
+            self.assertFalse(os.path.exists(path))
+
+            backend.rfftn(np.zeros((12, 12)))
+            self.assertTrue(os.path.exists(path))
+
+            backend.rfftn(np.zeros((14, 14)))
+            backend.save_wisdom()
+            self.assertEqual(backend._unsaved_plans, 0)
+
+if __name__ == '__main__':
+    unittest.main()
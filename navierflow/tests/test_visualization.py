@@ -0,0 +1,388 @@
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import taichi as ti
+from navierflow.gui.lod import FieldPyramid, LODController
+from navierflow.ui.visualization.field_renderer import FieldRenderer, build_colormap_lut
+from navierflow.ui.visualization.frame_scheduler import FrameScheduler
+from navierflow.ui.visualization.simulation_interface import SimulationManager
+from navierflow.ui.visualization.video_encoder import StreamingVideoEncoder
+from navierflow.visualization.pod import PODEngine
+from navierflow.visualization.vortex_identification import VortexIdentification
+
+try:
+    import pyvista as pv
+    from navierflow.visualization.offscreen import (
+        BatchRenderer, OffscreenScene, consume_in_order, split_frame_range
+    )
+except ImportError:
+    pv = None
+
+try:
+    from navierflow.visualization.renderer import Renderer, VisualizationConfig, VisualizationType
+except ImportError:
+    Renderer = None
+
+class TestFieldRenderer(unittest.TestCase):
+    def setUp(self):
+        """Set up a renderer and a random scalar field"""
+        ti.init(arch=ti.cpu)
+        self.renderer = FieldRenderer(64, 48)
+        self.values = np.random.default_rng(0).uniform(2.0, 5.0, size=(64, 48)).astype(np.float32)
+        self.field = ti.field(dtype=ti.f32, shape=(64, 48))
+        self.field.from_numpy(self.values)
+
+    def test_colorize_matches_host_normalization(self):
+        """Test that on-device normalization and LUT mapping match NumPy"""
+        self.renderer.load_scalar(self.field)
+        self.renderer.colorize("fire")
+
+        t = (self.values - self.values.min()) / (self.values.max() - self.values.min())
+        expected = np.interp(t, np.linspace(0.0, 1.0, 256), build_colormap_lut("fire")[:, 0])
+        np.testing.assert_allclose(self.renderer.value_range.to_numpy(),
+                                   [self.values.min(), self.values.max()])
+        np.testing.assert_allclose(self.renderer.image.to_numpy()[..., 0], expected, atol=1e-5)
+
+    def test_vector_glyphs(self):
+        """Test that a uniform flow draws shafts of the scaled length"""
+        velocity = ti.Vector.field(2, dtype=ti.f32, shape=(64, 48))
+        data = np.zeros((64, 48, 2), dtype=np.float32)
+        data[..., 0] = 0.2
+        velocity.from_numpy(data)
+
+        self.renderer.load_magnitude(velocity)
+        self.renderer.colorize("grayscale")
+        self.renderer.draw_vectors(velocity)
+
+        image = self.renderer.image.to_numpy()
+        np.testing.assert_array_equal(image[:11, 0], 1.0)
+        self.assertAlmostEqual(self.renderer.mean_magnitude(velocity), 0.2, places=4)
+
+class TestFrameScheduler(unittest.TestCase):
+    def setUp(self):
+        """Set up a simulated clock with fixed step and render costs"""
+        self.now = 0.0
+        self.steps = []
+
+    def step(self, k):
+        self.steps.append(k)
+        self.now += 0.001
+
+    def render(self):
+        self.now += 0.006
+
+    def test_substeps_fill_frame_budget(self):
+        """Test that substeps converge to the budget left after rendering"""
+        scheduler = FrameScheduler({'target_fps': 50.0}, clock=lambda: self.now)
+        for _ in range(50):
+            scheduler.run_frame(self.step, self.render)
+
+        # (20 ms - 6 ms render) / 1 ms per step
+        self.assertIn(scheduler.substeps, (13, 14))
+        self.assertAlmostEqual(scheduler.render_fps, 50.0, delta=5.0)
+        self.assertAlmostEqual(scheduler.sim_steps_per_second, 700.0, delta=60.0)
+
+    def test_fixed_substeps(self):
+        """Test that a fixed schedule runs exactly K substeps per frame"""
+        scheduler = FrameScheduler({'substeps': 3, 'adaptive': False}, clock=lambda: self.now)
+        for _ in range(4):
+            scheduler.run_frame(self.step, self.render)
+
+        self.assertEqual(self.steps, [0, 1, 2] * 4)
+        self.assertEqual(scheduler.total_steps, 12)
+
+class TestSimulationManager(unittest.TestCase):
+    def setUp(self):
+        """Set up a manager with immediate idle release"""
+        ti.init(arch=ti.cpu)
+        self.manager = SimulationManager(32, 32, idle_timeout=0.0)
+
+    def test_lazy_construction_and_transfer(self):
+        """Test that solvers are built on demand and inherit the velocity"""
+        self.assertFalse(self.manager.is_built("eulerian"))
+        velocity = np.zeros((32, 32, 2), dtype=np.float32)
+        velocity[..., 0] = 1.0
+        self.manager.eulerian_solver.velocity.from_numpy(velocity)
+        self.assertFalse(self.manager.is_built("lbm"))
+
+        self.manager.method = "lbm"
+
+        lbm = self.manager.lbm_solver
+        np.testing.assert_allclose(lbm.vel.to_numpy()[..., 0], SimulationManager.LBM_VELOCITY_SCALE)
+        np.testing.assert_allclose(lbm.f.to_numpy().sum(axis=2), 1.0, rtol=1e-6)
+
+        self.manager.update((16.0, 16.0), False)
+        self.assertFalse(self.manager.is_built("eulerian"))
+
+    @unittest.skipUnless(os.path.exists('/proc/self/statm'), "needs /proc to read the resident set size")
+    def test_released_solver_memory_is_returned(self):
+        """Test that rebuilding released solvers does not grow memory"""
+        def resident_bytes():
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+        n = 512
+        manager = SimulationManager(n, n, idle_timeout=0.0)
+        manager.get_solver("eulerian")
+
+        def cycle():
+            manager.method = "lbm"
+            manager.update((16.0, 16.0), False)
+            manager.method = "eulerian"
+            manager.release_idle_solvers()
+            self.assertFalse(manager.is_built("lbm"))
+
+        cycle()
+        start = resident_bytes()
+        for _ in range(3):
+            cycle()
+        # Populations, solid mask and 15 float components of physics fields
+        solver_bytes = n * n * 4 * (2 * 9 + 1 + 15)
+        self.assertLess(resident_bytes() - start, solver_bytes)
+        manager.close()
+
+class RecordingEncoder(StreamingVideoEncoder):
+    """Encoder writing frames to a list instead of a file"""
+    def _select_backend(self):
+        return 'memory'
+
+    def _open_writer(self, backend, width, height):
+        self.written = []
+        return ('memory', self.written, (width, height))
+
+    def _write(self, frame):
+        self._writer[1].append(frame)
+        self.stats['encoded'] += 1
+
+    def _close_writer(self):
+        self._writer = None
+
+class TestStreamingVideoEncoder(unittest.TestCase):
+    def test_frames_are_encoded_in_order(self):
+        """Test that every frame reaches the writer, preprocessed and in order"""
+        encoder = RecordingEncoder('unused.mp4', {'backpressure': 'block', 'queue_size': 2},
+                                   preprocess=lambda frame, gain: frame * gain)
+        buffer = np.zeros((4, 6, 3), dtype=np.uint8)
+        for k in range(10):
+            buffer[:] = k
+            encoder.submit(buffer, 2)
+        stats = encoder.close()
+
+        self.assertEqual(stats['encoded'], 10)
+        self.assertEqual(stats['dropped'], 0)
+        self.assertEqual([int(f[0, 0, 0]) for f in encoder.written], [2 * k for k in range(10)])
+
+    def test_backpressure_bounds_queue(self):
+        """Test that a stalled encoder drops or decimates instead of buffering"""
+        for policy in ('drop', 'decimate'):
+            release = threading.Event()
+            encoder = RecordingEncoder('unused.mp4', {'backpressure': policy, 'queue_size': 4},
+                                       preprocess=lambda frame: release.wait() and frame)
+            for _ in range(100):
+                encoder.submit(np.zeros((4, 4, 3), dtype=np.uint8))
+            release.set()
+            stats = encoder.close()
+
+            self.assertEqual(stats['submitted'], 100)
+            self.assertLessEqual(stats['queued'], 5)
+            self.assertEqual(stats['queued'] + stats['dropped'], 100)
+            self.assertEqual(stats['encoded'], stats['queued'])
+
+if pv is not None:
+    class RecordingBatchRenderer(BatchRenderer):
+        """Batch renderer streaming videos into a RecordingEncoder"""
+        def encoder_class(self, *args):
+            self.encoder = RecordingEncoder(*args)
+            return self.encoder
+
+@unittest.skipUnless(pv is not None, "pyvista not available")
+class TestBatchRenderer(unittest.TestCase):
+    def setUp(self):
+        """Set up a small mesh and frames of constant, increasing values"""
+        self.mesh = pv.ImageData(dimensions=(8, 6, 1))
+        self.n_frames = 7
+        self.frames = np.repeat(np.arange(self.n_frames, dtype=np.float32)[:, None],
+                                self.mesh.n_points, axis=1)
+        self.scene = {
+            'window_size': (32, 24),
+            'colormap': 'gray',
+            'clim': (0.0, self.n_frames - 1.0),
+            'show_edges': False,
+            'show_axes': False,
+            'show_colorbar': False
+        }
+
+    def test_split_frame_range(self):
+        """Test that frame ranges are contiguous, balanced and cover every frame"""
+        for n_frames, parts, start in ((10, 3, 0), (7, 7, 5), (3, 8, 0), (0, 4, 0)):
+            ranges = split_frame_range(n_frames, parts, start)
+            frames = [index for a, b in ranges for index in range(a, b)]
+            self.assertEqual(frames, list(range(start, start + n_frames)))
+            self.assertLessEqual(len(ranges), parts)
+            sizes = [b - a for a, b in ranges]
+            if sizes:
+                self.assertGreater(min(sizes), 0)
+                self.assertLessEqual(max(sizes) - min(sizes), 1)
+
+    def test_color_range(self):
+        """Test that the color range spans all frames, or the first of a generator"""
+        frames = [np.array([1.0, np.nan, 2.0]), np.array([-3.0, 0.0]), np.array([5.0])]
+        renderer = BatchRenderer({'workers': 1})
+        self.assertEqual(renderer._color_range(frames, len(frames)), (-3.0, 5.0))
+        self.assertEqual(renderer._color_range(lambda k: np.arange(3.0) + k, 10), (0.0, 2.0))
+
+    def test_chunks_are_consumed_in_order(self):
+        """Test that out-of-order chunks are consumed in order with bounded submissions"""
+        ranges = split_frame_range(12, 6)
+        max_pending = 3
+        started = [threading.Event() for _ in ranges]
+        finish = [threading.Event() for _ in ranges]
+        consumed = []
+        in_flight = []
+
+        def task(index):
+            started[index].set()
+            finish[index].wait()
+            return ranges[index]
+
+        def release():
+            # Later chunks of each window finish first
+            for index in (2, 1, 0, 5, 4, 3):
+                started[index].wait()
+                finish[index].set()
+
+        with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+            def submit(start, stop):
+                in_flight.append(len(in_flight) + 1 - len(consumed))
+                return executor.submit(task, ranges.index((start, stop)))
+
+            releaser = threading.Thread(target=release)
+            releaser.start()
+            consume_in_order(submit, ranges, max_pending, consumed.append)
+            releaser.join()
+
+        self.assertEqual(consumed, ranges)
+        self.assertLessEqual(max(in_flight), max_pending)
+
+    def test_frame_count(self):
+        """Test that image sequences and videos contain every frame, in order"""
+        for workers in (1, 2):
+            with tempfile.TemporaryDirectory() as directory:
+                config = {'workers': workers, 'chunk_size': 3, 'scene': self.scene}
+                result = BatchRenderer(config).render(self.mesh, self.frames, directory)
+                self.assertEqual(result['frames'], self.n_frames)
+                self.assertEqual(len(os.listdir(directory)), self.n_frames)
+
+            renderer = RecordingBatchRenderer(config)
+            renderer.render(self.mesh, self.frames, 'unused.mp4')
+            written = renderer.encoder.written
+            self.assertEqual(len(written), self.n_frames)
+            # Gray levels grow with the frame index
+            levels = [int(frame[12, 16, 0]) for frame in written]
+            self.assertEqual(levels, sorted(set(levels)))
+        # Frames are copied into the scene, never written to
+        np.testing.assert_array_equal(self.frames[:, 0], np.arange(self.n_frames))
+
+    def test_show_grid(self):
+        """Test that show_grid reaches the offscreen scene"""
+        for show_grid in (False, True):
+            scene = OffscreenScene(self.mesh, dict(self.scene, show_grid=show_grid))
+            scene.update(field=self.frames[0])
+            self.assertEqual(scene.plotter.renderer.cube_axes_actor is not None, show_grid)
+            scene.close()
+
+        if Renderer is not None:
+            config = VisualizationConfig(type=VisualizationType.SURFACE, show_grid=True)
+            self.assertTrue(Renderer(config)._scene_config()['show_grid'])
+
+class TestLODController(unittest.TestCase):
+    def setUp(self):
+        """Set up a field whose sides are not multiples of the reduction factor"""
+        self.field = np.random.default_rng(0).normal(size=(100, 70))
+
+    def test_pyramid_levels(self):
+        """Test block means and that min/max levels bound the full field"""
+        pyramid = FieldPyramid(self.field)
+        self.assertEqual([pyramid.shape(i) for i in range(pyramid.n_levels)],
+                         [(100, 70), (50, 35), (25, 18), (13, 9)])
+        np.testing.assert_allclose(pyramid.level(1)[:10, :10],
+                                   self.field[:20, :20].reshape(10, 2, 10, 2).mean(axis=(1, 3)))
+        lo, hi = pyramid.bounds(pyramid.n_levels - 1)
+        self.assertEqual(lo.min(), self.field.min())
+        self.assertEqual(hi.max(), self.field.max())
+
+    def test_poll_throttles_and_follows_interaction(self):
+        """Test that updates are reported only for new data or a new level"""
+        lod = LODController({'interactive_max_cells': 5000})
+        self.assertTrue(lod.set_snapshot(self.field))
+        self.assertFalse(lod.set_snapshot(self.field.copy()))
+
+        self.assertEqual(lod.poll((800, 600))[0], 0)
+        self.assertIsNone(lod.poll((800, 600)))
+        self.assertEqual(lod.poll((800, 600), interacting=True)[0], 1)
+        self.assertEqual(lod.poll((800, 600))[0], 0)
+        self.assertEqual(lod.select_level((40, 30)), 2)
+
+        lod.set_snapshot(self.field + 1.0)
+        self.assertIsNotNone(lod.poll((800, 600)))
+
+class TestPODEngine(unittest.TestCase):
+    def setUp(self):
+        """Set up snapshots of two travelling waves at 0.3 and 0.7 Hz"""
+        x, y = np.meshgrid(np.linspace(0, 2 * np.pi, 24), np.linspace(0, 2 * np.pi, 20), indexing='ij')
+        shapes = [np.stack([np.sin(x + k) * np.cos(k * y), np.cos(k * x)], axis=-1) for k in range(1, 5)]
+        t = 0.1 * np.arange(60)[:, None, None, None]
+        self.snapshots = (shapes[0] * np.cos(2 * np.pi * 0.3 * t) + shapes[1] * np.sin(2 * np.pi * 0.3 * t) +
+                          0.5 * shapes[2] * np.cos(2 * np.pi * 0.7 * t) +
+                          0.5 * shapes[3] * np.sin(2 * np.pi * 0.7 * t))
+        self.reference = np.linalg.svd(self.snapshots.reshape(60, -1), compute_uv=False)[:4]
+
+    def test_batch_methods_match_svd(self):
+        """Test randomized and method-of-snapshots SVD against the full SVD"""
+        for method in ('randomized', 'snapshots'):
+            pod = PODEngine({'n_modes': 4}).fit(self.snapshots, method=method)
+            np.testing.assert_allclose(pod.singular_values, self.reference, rtol=1e-8)
+
+    def test_streaming_pod_and_dmd(self):
+        """Test that streamed snapshots give the same basis and DMD frequencies"""
+        pod = PODEngine({'n_modes': 4, 'store_coefficients': True, 'dt': 0.1})
+        pod.fit_stream(iter(self.snapshots), batch_size=4)
+
+        np.testing.assert_allclose(pod.singular_values[:4], self.reference, rtol=1e-8)
+        np.testing.assert_allclose(pod.coefficients @ pod.modes,
+                                   self.snapshots.reshape(60, -1), atol=1e-8)
+        for dmd in (pod.dmd(n_modes=4), pod.dmd(self.snapshots, n_modes=4)):
+            np.testing.assert_allclose(np.sort(np.abs(dmd['frequencies'])), [0.3, 0.3, 0.7, 0.7], atol=1e-6)
+
+class TestVortexIdentification(unittest.TestCase):
+    def test_solid_body_rotation(self):
+        """Test all criteria on a rigid rotation with rate 0.5"""
+        y, x = np.meshgrid(np.arange(16.0), np.arange(20.0), indexing='ij')
+        velocity = np.stack([-0.5 * y, 0.5 * x], axis=-1)
+        identification = VortexIdentification()
+
+        result = identification.compute(velocity)
+
+        np.testing.assert_allclose(result['vorticity'], 1.0)
+        np.testing.assert_allclose(result['q_criterion'], 0.25)
+        np.testing.assert_allclose(result['lambda2'], -0.25)
+        np.testing.assert_allclose(result['swirling_strength'], 0.5)
+        self.assertIs(identification.compute(velocity.copy()), result)
+
+    def test_fused_kernel_matches_numpy(self):
+        """Test the fused 3D Taichi kernel against the NumPy tensor path"""
+        ti.init(arch=ti.cpu)
+        velocity = np.random.default_rng(5).normal(size=(12, 10, 8, 3))
+
+        reference = VortexIdentification({'backend': 'numpy'}).compute(velocity, 0.5)
+        fused = VortexIdentification({'backend': 'taichi'}).compute(velocity, 0.5)
+
+        for name in ('q_criterion', 'lambda2', 'delta', 'vorticity'):
+            np.testing.assert_allclose(fused[name], reference[name], rtol=1e-3,
+                                       atol=1e-3 * np.abs(reference[name]).max())
+
+if __name__ == '__main__':
+    unittest.main()
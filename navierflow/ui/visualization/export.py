@@ -3,6 +3,7 @@ import numpy as np
 from typing import Dict, List, Optional, Tuple
 import os
 import json
+import functools
 from datetime import datetime
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
@@ -10,6 +11,7 @@ from PIL import Image
 import io
 import base64
 import cv2
+from .video_encoder import StreamingVideoEncoder
 
 class ExportManager:
     """Manager for exporting simulation results and visualizations"""
@@ -29,13 +31,16 @@ class ExportManager:
         if 'export_manager' not in st.session_state:
             st.session_state.export_manager = {
                 'recording': False,
-                'frames': [],
+                'encoder': None,
+                'output_path': None,
                 'frame_rate': 30,
                 'resolution': (1920, 1080),
                 'quality': 'high',
                 'format': 'MP4',
                 'compression': 0.9,
-                'include_metrics': True
+                'include_metrics': True,
+                'queue_size': 32,
+                'backpressure': 'decimate'  # 'drop', 'decimate', 'block'
             }
 
     def render_export_controls(self):
@@ -141,28 +146,53 @@ class ExportManager:
                 self.export_current_view()
 
     def start_recording(self):
-        """Start recording frames"""
-        st.session_state.export_manager['recording'] = True
-        st.session_state.export_manager['frames'] = []
+        """Start recording; frames are encoded incrementally as they arrive"""
+        state = st.session_state.export_manager
+        if state['encoder'] is not None:
+            state['encoder'].close()
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        format_type = state['format'] if state['format'] in self.supported_formats['video'] else 'MP4'
+        state['output_path'] = os.path.join(self.export_dir, f"simulation_{timestamp}.{format_type.lower()}")
+        state['encoder'] = StreamingVideoEncoder(
+            state['output_path'],
+            {
+                'format': format_type,
+                'fps': state['frame_rate'],
+                'resolution': state['resolution'],
+                'quality': state['quality'],
+                'queue_size': state['queue_size'],
+                'backpressure': state['backpressure']
+            },
+            # Settings are bound now: session state is not reachable from the encoder thread
+            preprocess=functools.partial(
+                self._prepare_frame,
+                resolution=tuple(state['resolution']),
+                include_metrics=state['include_metrics']
+            )
+        )
+        state['encoder'].start()
+        state['recording'] = True
 
     def stop_recording(self):
-        """Stop recording and save video"""
+        """Stop recording and finalize the video"""
         st.session_state.export_manager['recording'] = False
-        if len(st.session_state.export_manager['frames']) > 0:
-            self.save_video()
+        self.save_video()
 
     def add_frame(self, frame: np.ndarray, metrics: Optional[Dict] = None):
-        """Add a frame to the recording buffer"""
-        if st.session_state.export_manager['recording']:
-            # Resize frame
-            target_size = st.session_state.export_manager['resolution']
-            frame = cv2.resize(frame, target_size)
-            
-            # Add metrics overlay if enabled
-            if st.session_state.export_manager['include_metrics'] and metrics is not None:
-                frame = self._add_metrics_overlay(frame, metrics)
-            
-            st.session_state.export_manager['frames'].append(frame)
+        """Hand a frame to the encoder; resizing and overlays run on its thread"""
+        state = st.session_state.export_manager
+        if state['recording'] and state['encoder'] is not None:
+            state['encoder'].submit(frame, metrics)
+
+    def _prepare_frame(self, frame: np.ndarray, metrics: Optional[Dict] = None,
+                       resolution: Tuple[int, int] = (1920, 1080),
+                       include_metrics: bool = True) -> np.ndarray:
+        """Resize a frame and add the metrics overlay"""
+        frame = cv2.resize(frame, resolution)
+        if include_metrics and metrics is not None:
+            frame = self._add_metrics_overlay(frame, metrics)
+        return frame
 
     def export_current_view(self):
         """Export the current view"""
@@ -177,78 +207,24 @@ class ExportManager:
             st.error("Please use the recording feature for video export")
 
     def save_video(self):
-        """Save recorded video"""
+        """Flush the encoder and finalize the recorded video"""
         state = st.session_state.export_manager
-        frames = state['frames']
+        encoder = state['encoder']
         
-        if len(frames) == 0:
+        if encoder is None:
             st.error("No frames to export")
             return
         
-        # Generate filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = os.path.join(self.export_dir, f"simulation_{timestamp}")
-        
-        format_type = state['format']
-        if format_type == 'MP4':
-            self._save_mp4(filename, frames)
-        elif format_type == 'GIF':
-            self._save_gif(filename, frames)
-        elif format_type == 'AVI':
-            self._save_avi(filename, frames)
-        
-        # Clear frame buffer
-        state['frames'] = []
-        
-        st.success(f"Video saved as {filename}.{format_type.lower()}")
-
-    def _save_mp4(self, filename: str, frames: List[np.ndarray]):
-        """Save frames as MP4 video"""
-        fps = st.session_state.export_manager['frame_rate']
-        height, width = frames[0].shape[:2]
-        
-        writer = cv2.VideoWriter(
-            f"{filename}.mp4",
-            cv2.VideoWriter_fourcc(*'mp4v'),
-            fps,
-            (width, height)
-        )
-        
-        for frame in frames:
-            writer.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
-        
-        writer.release()
-
-    def _save_gif(self, filename: str, frames: List[np.ndarray]):
-        """Save frames as GIF"""
-        fps = st.session_state.export_manager['frame_rate']
-        duration = 1000 / fps  # Duration per frame in milliseconds
-        
-        images = [Image.fromarray(frame) for frame in frames]
-        images[0].save(
-            f"{filename}.gif",
-            save_all=True,
-            append_images=images[1:],
-            duration=duration,
-            loop=0
-        )
-
-    def _save_avi(self, filename: str, frames: List[np.ndarray]):
-        """Save frames as AVI video"""
-        fps = st.session_state.export_manager['frame_rate']
-        height, width = frames[0].shape[:2]
-        
-        writer = cv2.VideoWriter(
-            f"{filename}.avi",
-            cv2.VideoWriter_fourcc(*'XVID'),
-            fps,
-            (width, height)
-        )
-        
-        for frame in frames:
-            writer.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+        state['encoder'] = None
+        stats = encoder.close()
+        if stats['encoded'] == 0:
+            st.error("No frames to export")
+            return
         
-        writer.release()
+        message = f"Video saved as {state['output_path']}"
+        if stats['dropped'] > 0:
+            message += f" ({stats['dropped']} frames dropped under load)"
+        st.success(message)
 
     def _export_image(self):
         """Export current view as image"""
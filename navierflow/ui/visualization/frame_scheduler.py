@@ -0,0 +1,116 @@
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+class FrameScheduler:
+    """
+    Paces solver substeps against rendered frames.
+
+    Each frame runs K solver substeps followed by one render. K adapts so
+    that K * (time per substep) + (time per render) stays close to the
+    frame budget of the target FPS: a cheap renderer lets the solver take
+    more steps per frame, an expensive one never starves the display.
+    Step and render costs are tracked as exponential moving averages, and
+    simulation throughput and render rate are reported separately over a
+    sliding window.
+    """
+    def __init__(self, config: Dict = None, clock: Callable[[], float] = time.perf_counter):
+        self.config = {
+            'target_fps': 60.0,
+            'substeps': 1,          # Initial (or fixed) substeps per frame
+            'min_substeps': 1,
+            'max_substeps': 32,
+            'adaptive': True,
+            'smoothing': 0.2,       # EMA weight of the newest timing sample
+            'stats_window': 1.0     # Seconds of history for the reported rates
+        }
+        if config:
+            self.config.update(config)
+
+        self.clock = clock
+        self.substeps = int(self.config['substeps'])
+        self.step_time = None
+        self.render_time = None
+        self.total_steps = 0
+        self.total_frames = 0
+        self._history = deque()
+
+    def run_frame(self, step: Callable[[int], None], render: Callable[[], None],
+                  sync: Optional[Callable[[], None]] = None):
+        """
+        Run one frame: the scheduled solver substeps, then one render
+
+        Args:
+            step: Callable advancing the solver once; receives the substep index
+            render: Callable drawing and presenting one frame
+            sync: Optional device synchronization so asynchronous kernels are
+                timed correctly (e.g. ti.sync)
+        """
+        substeps = self.substeps
+        t0 = self.clock()
+        for k in range(substeps):
+            step(k)
+        if sync is not None:
+            sync()
+        t1 = self.clock()
+        render()
+        t2 = self.clock()
+
+        self._update_timings((t1 - t0) / substeps, t2 - t1)
+        self.total_steps += substeps
+        self.total_frames += 1
+        self._history.append((t2, substeps))
+        window = self.config['stats_window']
+        while len(self._history) > 1 and t2 - self._history[0][0] > window:
+            self._history.popleft()
+
+        if self.config['adaptive']:
+            self.substeps = self._adapt()
+
+    def _update_timings(self, step_time: float, render_time: float):
+        alpha = self.config['smoothing']
+        if self.step_time is None:
+            self.step_time, self.render_time = step_time, render_time
+        else:
+            self.step_time += alpha * (step_time - self.step_time)
+            self.render_time += alpha * (render_time - self.render_time)
+
+    def _adapt(self) -> int:
+        """Substep count that fills the frame budget left after rendering"""
+        budget = 1.0 / self.config['target_fps'] - self.render_time
+        if self.step_time <= 0.0:
+            target = self.config['max_substeps']
+        else:
+            target = int(budget / self.step_time)
+        # Move at most by a factor of two per frame to avoid oscillation
+        target = min(target, 2 * self.substeps)
+        target = max(target, self.substeps // 2)
+        return max(self.config['min_substeps'], min(self.config['max_substeps'], target))
+
+    @property
+    def render_fps(self) -> float:
+        """Rendered frames per second over the stats window"""
+        if len(self._history) < 2:
+            return 0.0
+        elapsed = self._history[-1][0] - self._history[0][0]
+        return (len(self._history) - 1) / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def sim_steps_per_second(self) -> float:
+        """Solver steps per second over the stats window"""
+        if len(self._history) < 2:
+            return 0.0
+        elapsed = self._history[-1][0] - self._history[0][0]
+        steps = sum(n for _, n in list(self._history)[1:])
+        return steps / elapsed if elapsed > 0 else 0.0
+
+    def get_stats(self) -> Dict:
+        return {
+            'render_fps': self.render_fps,
+            'sim_steps_per_second': self.sim_steps_per_second,
+            'substeps': self.substeps,
+            'step_time': self.step_time,
+            'render_time': self.render_time,
+            'total_steps': self.total_steps,
+            'total_frames': self.total_frames
+        }
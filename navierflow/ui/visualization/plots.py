@@ -4,6 +4,11 @@ import numpy as np
 from typing import Dict, Optional, Tuple
 import matplotlib.cm as cm
 from scipy.ndimage import gaussian_filter
+from ...core.turbulence.statistics import energy_spectrum as compute_energy_spectrum
+from ...visualization.vortex_identification import VortexIdentification
+
+# Shared across plots so Q, vorticity, etc. of one snapshot reuse one gradient pass
+_vortex_identification = VortexIdentification()
 
 def create_velocity_plot(
     velocity: np.ndarray,
@@ -190,12 +195,20 @@ def create_temperature_plot(
     return fig
 
 def create_vorticity_plot(
-    vorticity: np.ndarray,
+    vorticity: Optional[np.ndarray] = None,
     colormap: str = "RdBu",
     smoothing: float = 0.5,
-    show_contours: bool = True
+    show_contours: bool = True,
+    velocity: Optional[np.ndarray] = None,
+    dx: float = 1.0
 ) -> go.Figure:
-    """Create vorticity field visualization"""
+    """Create vorticity field visualization
+    
+    The vorticity is taken from the shared gradient analysis of velocity
+    when it is not given directly.
+    """
+    if vorticity is None:
+        vorticity = _vortex_identification.compute(velocity, dx)['vorticity']
     # Apply smoothing
     if smoothing > 0:
         vorticity = gaussian_filter(vorticity, sigma=smoothing)
@@ -252,41 +265,24 @@ def create_energy_spectrum_plot(
     dx: float = 1.0
 ) -> go.Figure:
     """Create energy spectrum plot"""
-    # Compute 2D FFT of velocity field
-    u_fft = np.fft.fft2(velocity[:, :, 0])
-    v_fft = np.fft.fft2(velocity[:, :, 1])
-    
-    # Compute wavenumbers
-    kx = 2 * np.pi * np.fft.fftfreq(velocity.shape[0], dx)
-    ky = 2 * np.pi * np.fft.fftfreq(velocity.shape[1], dx)
-    kx_mesh, ky_mesh = np.meshgrid(kx, ky)
-    k_mag = np.sqrt(kx_mesh**2 + ky_mesh**2)
-    
-    # Compute energy spectrum
-    energy_density = 0.5 * (np.abs(u_fft)**2 + np.abs(v_fft)**2)
-    
-    # Bin the energy density by wavenumber magnitude
-    k_bins = np.linspace(0, np.max(k_mag), 50)
-    energy_spectrum = np.zeros_like(k_bins[:-1])
-    
-    for i in range(len(k_bins)-1):
-        mask = (k_mag >= k_bins[i]) & (k_mag < k_bins[i+1])
-        energy_spectrum[i] = np.mean(energy_density[mask])
+    # Single-pass shell binning of the rfft2 spectrum (mean mode dropped)
+    k, energy_spectrum = compute_energy_spectrum(velocity, dx)
+    k, energy_spectrum = k[1:], energy_spectrum[1:]
     
     # Create plot
     fig = go.Figure()
     
     # Add energy spectrum
     fig.add_trace(go.Scatter(
-        x=k_bins[:-1],
+        x=k,
         y=energy_spectrum,
         mode='lines',
         name='Energy Spectrum'
     ))
     
     # Add k^(-5/3) line for comparison
-    k_range = np.logspace(np.log10(k_bins[1]), np.log10(k_bins[-2]), 100)
-    kolmogorov = k_range**(-5/3) * energy_spectrum[0] / (k_bins[1]**(-5/3))
+    k_range = np.logspace(np.log10(k[0]), np.log10(k[-1]), 100)
+    kolmogorov = k_range**(-5/3) * energy_spectrum[0] / (k[0]**(-5/3))
     
     fig.add_trace(go.Scatter(
         x=k_range,
@@ -315,29 +311,8 @@ def create_q_criterion_plot(
     threshold: float = 0.1
 ) -> go.Figure:
     """Create Q-criterion visualization for vortex identification"""
-    # Compute velocity gradients
-    dudx = np.gradient(velocity[:, :, 0], dx, axis=1)
-    dudy = np.gradient(velocity[:, :, 0], dx, axis=0)
-    dvdx = np.gradient(velocity[:, :, 1], dx, axis=1)
-    dvdy = np.gradient(velocity[:, :, 1], dx, axis=0)
-    
-    # Compute strain rate tensor
-    S11 = dudx
-    S12 = 0.5 * (dudy + dvdx)
-    S21 = S12
-    S22 = dvdy
-    
-    # Compute rotation tensor
-    R11 = 0
-    R12 = 0.5 * (dudy - dvdx)
-    R21 = -R12
-    R22 = 0
-    
-    # Compute Q-criterion
-    Q = -0.5 * (
-        np.sum(S11**2 + S12**2 + S21**2 + S22**2) -
-        np.sum(R11**2 + R12**2 + R21**2 + R22**2)
-    )
+    # Q-criterion field from the shared, cached gradient analysis
+    Q = _vortex_identification.compute(velocity[:, :, :2], dx)['q_criterion']
     
     # Create plot
     fig = go.Figure()
@@ -1,7 +1,10 @@
+import time
 import taichi as ti
 import numpy as np
 from datetime import datetime
 from navierflow.core import CoreEulerianSolver, CoreLBMSolver
+from navierflow.ui.visualization.field_renderer import FieldRenderer
+from navierflow.ui.visualization.frame_scheduler import FrameScheduler
 
 # Metadata
 __author__ = "tafolabi009"
@@ -78,41 +81,130 @@ class StartScreen:
 
 
 class SimulationManager:
-    def __init__(self, width, height, initial_brush_size=20.0):
+    """
+    Owns the solvers behind the interactive view.
+
+    Solvers are built lazily on first use and cached per method, so only
+    the active method pays construction cost. Switching methods carries the
+    velocity field over to the new solver on device, and solvers left idle
+    longer than idle_timeout seconds are released together with their
+    Taichi fields.
+    """
+    # Eulerian velocities (cells per step) to LBM lattice units
+    LBM_VELOCITY_SCALE = 0.01
+    LBM_MAX_SPEED = 0.1
+
+    def __init__(self, width, height, initial_brush_size=20.0, idle_timeout=None):
         self.width = width
         self.height = height
-        self.method = "eulerian"
         self.view_mode = "density"
         self.brush_size = initial_brush_size
+        self.idle_timeout = idle_timeout
 
-        # Initialize solvers with configuration
-        self.eulerian_solver = CoreEulerianSolver(
-            width=width,
-            height=height,
-            config={
+        self.solver_classes = {
+            "eulerian": CoreEulerianSolver,
+            "lbm": CoreLBMSolver
+        }
+        self.solver_configs = {
+            "eulerian": {
                 'force_radius': initial_brush_size,
                 'force_strength': 70.0
-            }
-        )
-        self.lbm_solver = CoreLBMSolver(
-            width=width,
-            height=height,
-            config={
+            },
+            "lbm": {
                 'force_radius': 5.0,
                 'force_magnitude': 0.01
             }
-        )
+        }
+        self._solvers = {}
+        self._last_used = {}
+        self._method = "eulerian"
+
+    @property
+    def method(self):
+        return self._method
+
+    @method.setter
+    def method(self, method):
+        if method not in self.solver_classes:
+            raise ValueError(f"Unknown simulation method: {method}")
+        if method == self._method:
+            return
+        previous = self._solvers.get(self._method)
+        self._method = method
+        if previous is not None:
+            self.transfer_state(previous, self.get_solver(method))
+
+    def get_solver(self, method=None):
+        """Return the solver for method (default: active), building it on first use"""
+        method = method or self._method
+        solver = self._solvers.get(method)
+        if solver is None:
+            solver = self.solver_classes[method](
+                width=self.width,
+                height=self.height,
+                config=dict(self.solver_configs[method])
+            )
+            self._solvers[method] = solver
+        self._last_used[method] = time.monotonic()
+        return solver
+
+    @property
+    def eulerian_solver(self):
+        return self.get_solver("eulerian")
+
+    @property
+    def lbm_solver(self):
+        return self.get_solver("lbm")
+
+    def is_built(self, method):
+        return method in self._solvers
+
+    def transfer_state(self, source, target):
+        """Carry the velocity field from source to target on device
+
+        The Eulerian dye density and the LBM fluid density are different
+        quantities, so only velocity is transferred; the LBM populations are
+        rebuilt at equilibrium with the transferred velocity.
+        """
+        if isinstance(target, CoreLBMSolver):
+            target.load_velocity(source.velocity, self.LBM_VELOCITY_SCALE, self.LBM_MAX_SPEED)
+        elif isinstance(source, CoreLBMSolver):
+            target.load_velocity(source.vel, 1.0 / self.LBM_VELOCITY_SCALE)
+        else:
+            target.load_velocity(source.velocity, 1.0)
+
+    def release_solver(self, method):
+        """Free the fields of a built solver; it is rebuilt on next use"""
+        solver = self._solvers.pop(method, None)
+        self._last_used.pop(method, None)
+        if solver is not None:
+            # Taichi never frees fields with their owner; the solver's own
+            # SNode trees have to be destroyed explicitly
+            solver.release()
+
+    def release_idle_solvers(self):
+        """Free inactive solvers that have been idle longer than idle_timeout"""
+        if self.idle_timeout is None:
+            return
+        now = time.monotonic()
+        for method in list(self._solvers):
+            if method != self._method and now - self._last_used[method] > self.idle_timeout:
+                self.release_solver(method)
+
+    def close(self):
+        """Free the fields of all solvers"""
+        for method in list(self._solvers):
+            self.release_solver(method)
 
     def update_brush_size(self, size):
         self.brush_size = size
-        if self.method == "eulerian":
+        self.solver_configs["eulerian"]['force_radius'] = size
+        if self.is_built("eulerian"):
             self.eulerian_solver.update_config({'force_radius': size})
 
     def update(self, mouse_pos=None, mouse_down=False):
-        if self.method == "eulerian":
-            self.eulerian_solver.step(mouse_pos, mouse_down)
-        else:
-            self.lbm_solver.step(mouse_pos, mouse_down)
+        self.get_solver().step(mouse_pos, mouse_down)
+        self.release_idle_solvers()
 
     def get_display_field(self):
         if self.method == "eulerian":
@@ -133,6 +225,25 @@ class SimulationManager:
             vel_mag = np.sqrt(vel[:, :, 0] ** 2 + vel[:, :, 1] ** 2)
             return 1.0 - np.clip(vel_mag * 0.5 + (rho - 1.0) * 0.2, 0, 1)
 
+    def load_display_field(self, renderer):
+        """Write the current display field into a FieldRenderer on device"""
+        if self.method == "eulerian":
+            solver = self.eulerian_solver
+            if self.view_mode == "density":
+                renderer.load_scalar(solver.density)
+            elif self.view_mode == "pressure":
+                renderer.load_scalar(solver.pressure)
+            else:  # velocity
+                renderer.load_magnitude(solver.velocity)
+        else:  # LBM method
+            renderer.load_smoke(self.lbm_solver.rho, self.lbm_solver.vel)
+
+    def get_velocity_field(self):
+        """Taichi velocity field of the active solver"""
+        if self.method == "eulerian":
+            return self.eulerian_solver.velocity
+        return self.lbm_solver.vel
+
     def get_ball_info(self):
         if self.method == "lbm":
             state = self.lbm_solver.get_state()
@@ -158,8 +269,9 @@ class GUIManager:
         self.current_tutorial_step = 0
         self.color_mode = "blue"  # blue, fire, rainbow, grayscale
         self.show_vectors = False
+        self.renderer = FieldRenderer(width, height)
 
-    def render(self, simulation):
+    def render(self, simulation, scheduler=None):
         # Main control panel
         with self.gui.sub_window("NavierFlow Controls", 0.02, 0.02, 0.2, 0.4):
             # Mode indicator
@@ -236,77 +348,24 @@ class GUIManager:
         if self.show_analytics:
             with self.gui.sub_window("Analytics", 0.75, 0.02, 0.23, 0.3):
                 self.gui.text("Simulation Analytics")
+                if scheduler is not None:
+                    self.gui.text(f"Render FPS: {scheduler.render_fps:.1f}")
+                    self.gui.text(f"Sim Steps/s: {scheduler.sim_steps_per_second:.1f}")
+                    self.gui.text(f"Substeps/Frame: {scheduler.substeps}")
                 if simulation.method == "eulerian":
-                    vel = simulation.eulerian_solver.velocity.to_numpy()
-                    avg_vel = np.mean(np.sqrt(vel[:, :, 0]**2 + vel[:, :, 1]**2))
+                    avg_vel = self.renderer.mean_magnitude(simulation.eulerian_solver.velocity)
                     self.gui.text(f"Average Velocity: {avg_vel:.4f}")
                     self.gui.text(f"Iterations: {simulation.eulerian_solver.num_iterations}")
 
-        # Display simulation field with enhanced visualization
-        field = simulation.get_display_field()
-        if field is not None:
-            # Normalize field
-            field_min = np.min(field)
-            field_max = np.max(field)
-            if field_max > field_min:
-                field = (field - field_min) / (field_max - field_min)
-            else:
-                field = np.zeros_like(field)
-
-            # Apply color scheme
-            img = np.zeros((self.height, self.width, 3), dtype=np.float32)
-            if self.color_mode == "blue":
-                img[:, :, 2] = field
-            elif self.color_mode == "fire":
-                img[:, :, 0] = field
-                img[:, :, 1] = field * 0.5
-            elif self.color_mode == "rainbow":
-                for i in range(3):
-                    img[:, :, i] = np.sin(field * np.pi * (i + 1) / 2)
-            else:  # grayscale
-                img[:, :] = field[:, :, np.newaxis]
-
-            # Draw velocity vectors if enabled
-            if self.show_vectors and simulation.method == "eulerian":
-                vel = simulation.eulerian_solver.velocity.to_numpy()
-                step = 20  # Vector field resolution
-                scale = 50.0  # Vector length scale
-                for i in range(0, self.height, step):
-                    for j in range(0, self.width, step):
-                        vx = vel[i, j, 0] * scale
-                        vy = vel[i, j, 1] * scale
-                        self.draw_line(img, j, i, j + int(vx), i + int(vy), np.array([1.0, 1.0, 1.0]))
-
-            self.canvas.set_image(img)
-        self.window.show()
+        # Display simulation field: normalization, colormapping and vector
+        # glyphs all run on device into the persistent image field
+        simulation.load_display_field(self.renderer)
+        self.renderer.colorize(self.color_mode)
+        if self.show_vectors and simulation.method == "eulerian":
+            self.renderer.draw_vectors(simulation.get_velocity_field())
 
-    def draw_line(self, img, x0, y0, x1, y1, color):
-        dx = abs(x1 - x0)
-        dy = abs(y1 - y0)
-        x, y = x0, y0
-        sx = 1 if x1 > x0 else -1
-        sy = 1 if y1 > y0 else -1
-
-        if dx > dy:
-            err = dx / 2.0
-            while x != x1:
-                if 0 <= x < self.width and 0 <= y < self.height:
-                    img[y, x] = color
-                err -= dy
-                if err < 0:
-                    y += sy
-                    err += dx
-                x += sx
-        else:
-            err = dy / 2.0
-            while y != y1:
-                if 0 <= x < self.width and 0 <= y < self.height:
-                    img[y, x] = color
-                err -= dx
-                if err < 0:
-                    x += sx
-                    err += dy
-                y += sy
+        self.canvas.set_image(self.renderer.image)
+        self.window.show()
 
 
 def main():
@@ -316,6 +375,7 @@ def main():
     gui_manager = GUIManager(width, height)
     start_screen = gui_manager.start_screen
     sim_manager = None
+    scheduler = FrameScheduler()
 
     while gui_manager.window.running:
         if not start_screen.start_simulation:
@@ -330,8 +390,15 @@ def main():
             mouse_pos = (mouse_pos[0] * width, mouse_pos[1] * height)
             mouse_down = gui_manager.window.is_pressed(ti.ui.LMB)
 
-            sim_manager.update(mouse_pos, mouse_down)
-            gui_manager.render(sim_manager)
+            # Mouse forcing is applied once per frame, on the first substep
+            scheduler.run_frame(
+                lambda k: sim_manager.update(mouse_pos, mouse_down and k == 0),
+                lambda: gui_manager.render(sim_manager, scheduler),
+                sync=ti.sync
+            )
+
+    if sim_manager is not None:
+        sim_manager.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,242 @@
+import logging
+import queue
+import shutil
+import subprocess
+import threading
+import numpy as np
+from typing import Callable, Dict, Optional, Tuple
+
+_STOP = object()
+
+class StreamingVideoEncoder:
+    """
+    Incremental video encoder fed from a bounded queue.
+
+    The writer is opened when recording starts and a background thread
+    encodes frames as they arrive, so memory is bounded by the queue length
+    instead of the recording length. Frames are piped as raw RGB to an
+    ffmpeg subprocess when one is available, otherwise written through
+    OpenCV (MP4/AVI) or PIL (GIF). PIL's GIF encoder keeps the quantized
+    frames until the file is finalized, so prefer ffmpeg for long GIFs.
+
+    When the encoder falls behind, the backpressure policy decides what
+    happens to new frames:
+    - 'drop': discard frames that arrive while the queue is full
+    - 'decimate': keep only every k-th frame, doubling k while the queue
+      stays above its high-water mark and halving it once it drains
+    - 'block': wait for space (lossless, but stalls the caller)
+    """
+    def __init__(self, path: str, config: Dict = None,
+                 preprocess: Optional[Callable[..., np.ndarray]] = None):
+        self.path = path
+        self.config = {
+            'format': 'MP4',            # 'MP4', 'AVI', 'GIF'
+            'fps': 30,
+            'resolution': None,         # (width, height), default from the first frame
+            'quality': 'high',          # 'low', 'medium', 'high', 'ultra'
+            'backend': 'auto',          # 'auto', 'ffmpeg', 'opencv', 'pil'
+            'queue_size': 32,
+            'backpressure': 'decimate', # 'drop', 'decimate', 'block'
+            'high_water': 0.75,         # Queue fill fraction that triggers decimation
+            'max_decimation': 8
+        }
+        if config:
+            self.config.update(config)
+        self.format = self.config['format'].upper()
+        self.preprocess = preprocess
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self.config['queue_size'])
+        self._thread: Optional[threading.Thread] = None
+        self._writer = None
+        self._error: Optional[BaseException] = None
+        self._stopped = False
+        self.decimation = 1
+        self._counter = 0
+        self.stats = {'submitted': 0, 'queued': 0, 'encoded': 0, 'dropped': 0}
+
+    # Lifecycle -------------------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the encoding thread; the writer opens on the first frame"""
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="video-encoder", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: Optional[float] = None) -> Dict:
+        """Flush queued frames, finalize the file and return the stats"""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+        if self._error is not None:
+            raise RuntimeError(f"Video encoding failed: {self._error}") from self._error
+        return dict(self.stats)
+
+    # Producer side ---------------------------------------------------------
+
+    def submit(self, frame: np.ndarray, *args, **kwargs) -> bool:
+        """
+        Queue a frame for encoding
+
+        Extra arguments are passed to the preprocess callable, which runs on
+        the encoding thread (e.g. resizing and overlays).
+
+        Returns:
+            Whether the frame was accepted
+        """
+        if not self.running:
+            self.start()
+        self.stats['submitted'] += 1
+        policy = self.config['backpressure']
+
+        if policy == 'decimate':
+            self._update_decimation()
+            self._counter += 1
+            if self._counter % self.decimation != 0:
+                self.stats['dropped'] += 1
+                return False
+
+        # Copy so callers may reuse their frame buffer
+        item = (np.array(frame, copy=True), args, kwargs)
+        try:
+            self._queue.put(item, block=(policy == 'block'))
+        except queue.Full:
+            self.stats['dropped'] += 1
+            return False
+        self.stats['queued'] += 1
+        return True
+
+    def _update_decimation(self):
+        fill = self._queue.qsize() / self._queue.maxsize
+        if fill >= self.config['high_water']:
+            self.decimation = min(self.decimation * 2, self.config['max_decimation'])
+        elif fill == 0.0 and self.decimation > 1:
+            self.decimation //= 2
+
+    # Consumer side ---------------------------------------------------------
+
+    def _frames(self):
+        """Yield prepared frames until the stop sentinel arrives"""
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._stopped = True
+                return
+            frame, args, kwargs = item
+            if self.preprocess is not None:
+                frame = self.preprocess(frame, *args, **kwargs)
+            yield np.ascontiguousarray(frame, dtype=np.uint8)
+
+    def _run(self):
+        try:
+            frames = self._frames()
+            first = next(frames, None)
+            if first is None:
+                return
+            backend = self._select_backend()
+            if backend == 'pil':
+                self._write_gif(first, frames)
+                return
+            self._writer = self._open_writer(backend, first.shape[1], first.shape[0])
+            self._write(first)
+            for frame in frames:
+                self._write(frame)
+        except BaseException as e:
+            self._error = e
+            logging.error(f"Video encoder stopped: {e}")
+            # Keep draining so producers never block on a dead consumer
+            while not self._stopped and self._queue.get() is not _STOP:
+                pass
+        finally:
+            self._close_writer()
+
+    def _select_backend(self) -> str:
+        backend = self.config['backend']
+        if backend == 'auto':
+            if shutil.which('ffmpeg'):
+                return 'ffmpeg'
+            return 'pil' if self.format == 'GIF' else 'opencv'
+        if backend == 'ffmpeg' and not shutil.which('ffmpeg'):
+            logging.warning("ffmpeg not available. Falling back to OpenCV/PIL writers.")
+            return 'pil' if self.format == 'GIF' else 'opencv'
+        return backend
+
+    def _target_size(self, width: int, height: int) -> Tuple[int, int]:
+        size = self.config['resolution'] or (width, height)
+        # Most codecs require even dimensions
+        return int(size[0]) // 2 * 2, int(size[1]) // 2 * 2
+
+    def _open_writer(self, backend: str, width: int, height: int):
+        out_w, out_h = self._target_size(width, height)
+        fps = self.config['fps']
+        if backend == 'ffmpeg':
+            crf = {'low': 32, 'medium': 26, 'high': 20, 'ultra': 16}.get(
+                str(self.config['quality']).lower(), 20)
+            codec = {
+                'MP4': ['-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-crf', str(crf)],
+                'AVI': ['-c:v', 'mpeg4', '-q:v', str(max(1, crf // 6))],
+                # Per-frame palettes keep the filter graph streaming
+                'GIF': ['-filter_complex',
+                        '[0:v]split[a][b];[a]palettegen=stats_mode=single[p];[b][p]paletteuse=new=1']
+            }[self.format]
+            command = ['ffmpeg', '-y', '-loglevel', 'error',
+                       '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+                       '-s', f'{width}x{height}', '-r', str(fps), '-i', '-']
+            if (out_w, out_h) != (width, height) and self.format != 'GIF':
+                codec = ['-vf', f'scale={out_w}:{out_h}'] + codec
+            command += codec + [self.path]
+            process = subprocess.Popen(command, stdin=subprocess.PIPE)
+            return ('ffmpeg', process, (width, height))
+
+        import cv2
+        fourcc = cv2.VideoWriter_fourcc(*('mp4v' if self.format == 'MP4' else 'XVID'))
+        writer = cv2.VideoWriter(self.path, fourcc, fps, (out_w, out_h))
+        return ('opencv', writer, (out_w, out_h))
+
+    def _write(self, frame: np.ndarray):
+        kind, writer, size = self._writer
+        if kind == 'ffmpeg':
+            if (frame.shape[1], frame.shape[0]) != size:
+                import cv2
+                frame = cv2.resize(frame, size)
+            writer.stdin.write(frame[..., :3].tobytes())
+        else:
+            import cv2
+            if (frame.shape[1], frame.shape[0]) != size:
+                frame = cv2.resize(frame, size)
+            writer.write(cv2.cvtColor(frame[..., :3], cv2.COLOR_RGB2BGR))
+        self.stats['encoded'] += 1
+
+    def _write_gif(self, first: np.ndarray, frames):
+        """Stream frames into PIL's GIF encoder one at a time"""
+        from PIL import Image
+
+        def images():
+            for frame in frames:
+                self.stats['encoded'] += 1
+                yield Image.fromarray(frame[..., :3])
+
+        self.stats['encoded'] += 1
+        Image.fromarray(first[..., :3]).save(
+            self.path,
+            save_all=True,
+            append_images=images(),
+            duration=1000 / self.config['fps'],
+            loop=0
+        )
+
+    def _close_writer(self):
+        if self._writer is None:
+            return
+        kind, writer, _ = self._writer
+        if kind == 'ffmpeg':
+            writer.stdin.close()
+            writer.wait()
+        else:
+            writer.release()
+        self._writer = None
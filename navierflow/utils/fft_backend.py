@@ -0,0 +1,275 @@
+from typing import Optional, Dict, Any, Tuple, Callable, Union
+from dataclasses import dataclass
+from collections import OrderedDict
+from concurrent.futures import Future
+from enum import Enum
+import atexit
+import os
+import pickle
+import logging
+import threading
+import numpy as np
+import scipy.fft as sfft
+
+class FFTBackendType(Enum):
+    """FFT library backends"""
+    SCIPY = "scipy"
+    PYFFTW = "pyfftw"
+    TORCH = "torch"
+
+@dataclass
+class FFTConfig:
+    """FFT backend configuration"""
+    backend: FFTBackendType = FFTBackendType.SCIPY
+    workers: int = -1                      # Threads per transform, -1 for all cores
+    max_cached_plans: int = 32
+    planner_effort: str = "FFTW_MEASURE"   # pyFFTW only
+    wisdom_file: Optional[str] = None      # pyFFTW only
+    wisdom_save_interval: int = 16         # pyFFTW only, new plans between wisdom saves
+    device: Optional[str] = None           # torch only, defaults to the input's device
+
+class FFTBackend:
+    """
+    Base class for FFT backends.
+
+    Transforms run over the given axes and are batched over all leading
+    axes, so a stack of fields is transformed in a single call. Plans are
+    cached per (kind, shape, dtype, axes, output shape) with LRU eviction.
+    Plans are built outside the cache lock, so a slow planner only delays
+    callers waiting for that same plan.
+    """
+    name = "base"
+
+    def __init__(self, config: Optional[FFTConfig] = None):
+        self.config = config or FFTConfig()
+        self.workers = self.config.workers if self.config.workers > 0 else (os.cpu_count() or 1)
+        self._plans: "OrderedDict[Tuple, Future]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'plan_hits': 0, 'plan_misses': 0}
+
+    def rfftn(self, x, axes: Tuple[int, ...] = (-2, -1)):
+        """Real-to-complex transform over axes"""
+        return self._get_plan("rfftn", x, axes)(x)
+
+    def irfftn(self, x, shape: Tuple[int, ...], axes: Tuple[int, ...] = (-2, -1)):
+        """Complex-to-real transform over axes with real output sizes shape"""
+        return self._get_plan("irfftn", x, axes, tuple(shape))(x)
+
+    def fftn(self, x, axes: Tuple[int, ...] = (-2, -1)):
+        """Complex transform over axes"""
+        return self._get_plan("fftn", x, axes)(x)
+
+    def ifftn(self, x, axes: Tuple[int, ...] = (-2, -1)):
+        """Inverse complex transform over axes"""
+        return self._get_plan("ifftn", x, axes)(x)
+
+    def _get_plan(self, kind: str, x, axes: Tuple[int, ...],
+                  out_shape: Optional[Tuple[int, ...]] = None) -> Callable:
+        """Return a cached plan for this transform, building it on a miss"""
+        key = (kind, tuple(x.shape), str(x.dtype), tuple(axes), out_shape)
+        with self._lock:
+            entry = self._plans.get(key)
+            build = entry is None
+            if build:
+                # Placeholder; concurrent callers of this key wait on it
+                self.stats['plan_misses'] += 1
+                entry = self._plans[key] = Future()
+                if len(self._plans) > self.config.max_cached_plans:
+                    self._plans.popitem(last=False)
+            else:
+                self._plans.move_to_end(key)
+                self.stats['plan_hits'] += 1
+        if not build:
+            return entry.result()
+
+        try:
+            plan = self._build_plan(kind, x, tuple(axes), out_shape)
+        except BaseException as e:
+            with self._lock:
+                if self._plans.get(key) is entry:
+                    del self._plans[key]
+            entry.set_exception(e)
+            raise
+        entry.set_result(plan)
+        return plan
+
+    def _build_plan(self, kind: str, x, axes: Tuple[int, ...],
+                    out_shape: Optional[Tuple[int, ...]]) -> Callable:
+        raise NotImplementedError
+
+    def clear_plans(self):
+        """Drop all cached plans"""
+        with self._lock:
+            self._plans.clear()
+
+class ScipyFFTBackend(FFTBackend):
+    """scipy.fft (pocketfft) backend with multi-threaded workers"""
+    name = "scipy"
+
+    def _build_plan(self, kind, x, axes, out_shape):
+        workers = self.workers
+        if kind == "rfftn":
+            return lambda a: sfft.rfftn(a, axes=axes, workers=workers)
+        elif kind == "irfftn":
+            return lambda a: sfft.irfftn(a, s=out_shape, axes=axes, workers=workers)
+        elif kind == "fftn":
+            return lambda a: sfft.fftn(a, axes=axes, workers=workers)
+        elif kind == "ifftn":
+            return lambda a: sfft.ifftn(a, axes=axes, workers=workers)
+        raise ValueError(f"Unknown transform: {kind}")
+
+class PyFFTWBackend(FFTBackend):
+    """
+    pyFFTW backend with persistent plans and wisdom caching.
+
+    Wisdom is written after every `wisdom_save_interval` new plans and at
+    interpreter exit, outside the plan lock, so transforms on other threads
+    never wait for the disk.
+    """
+    name = "pyfftw"
+
+    def __init__(self, config: Optional[FFTConfig] = None):
+        super().__init__(config)
+        import pyfftw
+        self.pyfftw = pyfftw
+        pyfftw.interfaces.cache.enable()
+        self._unsaved_plans = 0
+        self._wisdom_lock = threading.Lock()
+        self._load_wisdom()
+        if self.config.wisdom_file:
+            atexit.register(self.save_wisdom)
+
+    def _load_wisdom(self):
+        """Import accumulated planner wisdom, if any"""
+        path = self.config.wisdom_file
+        if path and os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    self.pyfftw.import_wisdom(pickle.load(f))
+            except Exception as e:
+                logging.warning(f"Could not load FFTW wisdom from {path}: {e}")
+
+    def save_wisdom(self):
+        """Persist planner wisdom so later runs skip the measurement phase"""
+        path = self.config.wisdom_file
+        if not path:
+            return
+        # Only the counter is touched under the plan lock; plans built while
+        # writing are counted towards the next save
+        with self._lock:
+            pending, self._unsaved_plans = self._unsaved_plans, 0
+        if pending == 0:
+            return
+        with self._wisdom_lock:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(self.pyfftw.export_wisdom(), f)
+            os.replace(tmp_path, path)
+
+    def _get_plan(self, kind, x, axes, out_shape=None):
+        plan = super()._get_plan(kind, x, axes, out_shape)
+        if self.config.wisdom_file and self._unsaved_plans >= self.config.wisdom_save_interval:
+            self.save_wisdom()
+        return plan
+
+    def _build_plan(self, kind, x, axes, out_shape):
+        builders = self.pyfftw.builders
+        kwargs = dict(axes=axes, threads=self.workers,
+                      planner_effort=self.config.planner_effort,
+                      avoid_copy=False)
+        template = self.pyfftw.empty_aligned(x.shape, dtype=x.dtype)
+        if kind == "rfftn":
+            fftw = builders.rfftn(template, **kwargs)
+        elif kind == "irfftn":
+            fftw = builders.irfftn(template, s=out_shape, **kwargs)
+        elif kind == "fftn":
+            fftw = builders.fftn(template, **kwargs)
+        elif kind == "ifftn":
+            fftw = builders.ifftn(template, **kwargs)
+        else:
+            raise ValueError(f"Unknown transform: {kind}")
+        with self._lock:
+            self._unsaved_plans += 1
+        # FFTW objects reuse their input and output buffers, so threads
+        # sharing a plan take turns; callers get their own copy of the output
+        lock = threading.Lock()
+
+        def plan(a):
+            with lock:
+                return fftw(a).copy()
+        return plan
+
+class TorchFFTBackend(FFTBackend):
+    """torch.fft backend; numpy inputs are returned as numpy arrays"""
+    name = "torch"
+
+    def __init__(self, config: Optional[FFTConfig] = None):
+        super().__init__(config)
+        import torch
+        self.torch = torch
+        if torch.cuda.is_available():
+            torch.backends.cuda.cufft_plan_cache.max_size = self.config.max_cached_plans
+
+    def _build_plan(self, kind, x, axes, out_shape):
+        torch = self.torch
+        device = self.config.device
+        transform = {
+            "rfftn": lambda t: torch.fft.rfftn(t, dim=axes),
+            "irfftn": lambda t: torch.fft.irfftn(t, s=out_shape, dim=axes),
+            "fftn": lambda t: torch.fft.fftn(t, dim=axes),
+            "ifftn": lambda t: torch.fft.ifftn(t, dim=axes),
+        }[kind]
+
+        def plan(a):
+            if isinstance(a, np.ndarray):
+                t = torch.from_numpy(np.ascontiguousarray(a))
+                if device:
+                    t = t.to(device)
+                return transform(t).cpu().numpy()
+            return transform(a.to(device) if device else a)
+        return plan
+
+_BACKENDS = {
+    FFTBackendType.SCIPY: ScipyFFTBackend,
+    FFTBackendType.PYFFTW: PyFFTWBackend,
+    FFTBackendType.TORCH: TorchFFTBackend,
+}
+_instances: Dict[Tuple, FFTBackend] = {}
+_instances_lock = threading.Lock()
+
+def get_fft_backend(backend: Union[str, FFTBackendType, None] = None,
+                    **kwargs: Any) -> FFTBackend:
+    """
+    Return a shared FFT backend instance
+
+    Instances are shared per configuration so that every caller reuses the
+    same plan cache. Unavailable optional backends fall back to scipy.
+
+    Args:
+        backend: 'scipy', 'pyfftw' or 'torch'
+        **kwargs: FFTConfig fields
+
+    Returns:
+        FFT backend
+    """
+    backend_type = FFTBackendType(backend) if backend is not None else FFTBackendType.SCIPY
+    config = FFTConfig(backend=backend_type, **kwargs)
+    key = tuple(sorted(config.__dict__.items(), key=lambda item: item[0]))
+
+    with _instances_lock:
+        if key not in _instances:
+            try:
+                _instances[key] = _BACKENDS[backend_type](config)
+            except ImportError:
+                logging.warning(f"{backend_type.value} not available. Falling back to scipy.fft.")
+                config.backend = FFTBackendType.SCIPY
+                _instances[key] = ScipyFFTBackend(config)
+        return _instances[key]
+
+def fftfreq(n: int, d: float = 1.0) -> np.ndarray:
+    """Sample frequencies of a complex transform"""
+    return sfft.fftfreq(n, d)
+
+def rfftfreq(n: int, d: float = 1.0) -> np.ndarray:
+    """Sample frequencies of a real transform"""
+    return sfft.rfftfreq(n, d)
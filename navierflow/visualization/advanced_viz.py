@@ -3,10 +3,12 @@ import matplotlib.pyplot as plt
 from matplotlib.collections import LineCollection
 from typing import Dict, List, Optional, Tuple, Union
 import seaborn as sns
-from scipy import fft
-from scipy.stats import gaussian_kde
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from ..utils.fft_backend import get_fft_backend, rfftfreq
+from .pod import PODEngine
+from .vortex_identification import VortexIdentification
+from ..core.turbulence.statistics import FlowStatisticsAccumulator, pdf_window
 
 class AdvancedVisualization:
     """
@@ -29,13 +31,19 @@ class AdvancedVisualization:
             'vector_skip': 5,
             'vortex_threshold': 0.1,
             'pod_modes': 10,
+            'pod_method': 'auto',  # 'auto', 'svd', 'randomized', 'snapshots'
             'window_size': 1024,  # For spectral analysis
             'smoothing_factor': 0.5,
+            'statistics_chunk': 64,  # Snapshots per accumulator update
+            'pdf_bins': 64,
             'plot_style': 'dark_background'
         }
         if config:
             self.config.update(config)
             
+        # Shared, cached velocity-gradient analysis for all vortex criteria
+        self.vortex_identification = VortexIdentification()
+        
         # Set plot style
         plt.style.use(self.config['plot_style'])
         
@@ -102,6 +110,8 @@ class AdvancedVisualization:
             criterion = self._compute_lambda2(velocity)
         elif method == 'delta':
             criterion = self._compute_delta_criterion(velocity)
+        elif method == 'swirling_strength':
+            criterion = self.vortex_identification.compute(velocity)['swirling_strength']
         else:
             raise ValueError(f"Unknown vortex identification method: {method}")
             
@@ -135,13 +145,12 @@ class AdvancedVisualization:
         u = velocity[:, point[0], point[1], 0]
         v = velocity[:, point[0], point[1], 1]
         
-        # Compute FFT
+        # Compute FFT of both components in one batched transform
         window = np.hanning(len(u))
-        fu = fft.fft(u * window)
-        fv = fft.fft(v * window)
+        fu, fv = get_fft_backend().rfftn(np.stack([u, v]) * window, axes=(-1,))
         
         # Frequency axis
-        freq = fft.fftfreq(len(u), dt)
+        freq = rfftfreq(len(u), dt)
         
         # Power spectral density
         psd_u = np.abs(fu)**2
@@ -173,23 +182,35 @@ class AdvancedVisualization:
             
         return fig
         
-    def plot_pod_analysis(self, velocity: np.ndarray,
+    def create_pod_engine(self, **config) -> PODEngine:
+        """Create a POD engine, e.g. for streaming snapshots from a running solver"""
+        return PODEngine({'n_modes': self.config['pod_modes'],
+                          'method': self.config['pod_method'], **config})
+        
+    def plot_pod_analysis(self, velocity: Optional[np.ndarray] = None,
                          n_modes: Optional[int] = None,
-                         save_path: Optional[str] = None):
-        """Plot Proper Orthogonal Decomposition analysis"""
+                         save_path: Optional[str] = None,
+                         pod: Optional[PODEngine] = None):
+        """Plot Proper Orthogonal Decomposition analysis
+        
+        Args:
+            velocity: Snapshots of shape (T, W, H, 2); optional when pod is
+                an already fitted (e.g. streaming) engine
+            n_modes: Number of modes to show
+            save_path: Optional output path
+            pod: POD engine to fit or to plot from
+        """
         if n_modes is None:
             n_modes = self.config['pod_modes']
             
-        # Reshape velocity field for POD
-        n_snapshots = len(velocity)
-        n_points = velocity.shape[1] * velocity.shape[2]
-        X = velocity.reshape(n_snapshots, -1)
-        
-        # Compute POD
-        U, S, Vh = np.linalg.svd(X, full_matrices=False)
+        if pod is None:
+            pod = self.create_pod_engine(n_modes=n_modes)
+        if velocity is not None:
+            pod.fit(velocity, n_modes)
         
         # Energy content
-        energy = S**2 / np.sum(S**2)
+        S = pod.singular_values
+        energy = pod.energy_fractions()
         cumulative_energy = np.cumsum(energy)
         
         fig = plt.figure(figsize=(15, 10))
@@ -213,7 +234,7 @@ class AdvancedVisualization:
         
         # Mode shapes
         ax3 = fig.add_subplot(gs[1, :])
-        mode_shape = Vh[0].reshape(velocity.shape[1:])
+        mode_shape = pod.get_mode(0)
         magnitude = np.sqrt(mode_shape[..., 0]**2 + mode_shape[..., 1]**2)
         im = ax3.contourf(magnitude, levels=self.config['contour_levels'],
                         cmap=self.config['colormap'])
@@ -226,22 +247,40 @@ class AdvancedVisualization:
         if save_path:
             plt.savefig(save_path, dpi=300, bbox_inches='tight')
             
-        return fig, (U, S, Vh)
+        U = pod.coefficients / S if pod.coefficients is not None else None
+        return fig, (U, S, pod.modes)
+        
+    def create_statistics_accumulator(self, **config) -> FlowStatisticsAccumulator:
+        """Create a streaming statistics accumulator, e.g. to attach to a solver"""
+        return FlowStatisticsAccumulator({'pdf_bins': self.config['pdf_bins'], **config})
+        
+    def plot_turbulence_statistics(self, velocity: Optional[np.ndarray] = None,
+                                 save_path: Optional[str] = None,
+                                 statistics: Optional[FlowStatisticsAccumulator] = None):
+        """Plot turbulence statistics
+        
+        Args:
+            velocity: Snapshots of shape (T, W, H, 2); optional when
+                statistics were accumulated while the solver ran
+            save_path: Optional output path
+            statistics: Accumulator to update or to plot from; the joint
+                PDF is only drawn when it was configured with a pdf_range
+        """
+        if statistics is None:
+            # Fluctuations are binned about the time mean of the given snapshots
+            settings = pdf_window(velocity) if velocity is not None else {}
+            statistics = self.create_statistics_accumulator(**settings)
+        if velocity is not None:
+            chunk = self.config['statistics_chunk']
+            for start in range(0, len(velocity), chunk):
+                statistics.update(velocity[start:start + chunk], batch=True)
         
-    def plot_turbulence_statistics(self, velocity: np.ndarray,
-                                 save_path: Optional[str] = None):
-        """Plot turbulence statistics"""
         # Compute statistics
-        mean_u = np.mean(velocity[..., 0], axis=0)
-        mean_v = np.mean(velocity[..., 1], axis=0)
-        
-        fluctuations_u = velocity[..., 0] - mean_u
-        fluctuations_v = velocity[..., 1] - mean_v
-        
-        rms_u = np.sqrt(np.mean(fluctuations_u**2, axis=0))
-        rms_v = np.sqrt(np.mean(fluctuations_v**2, axis=0))
-        
-        reynolds_stress = np.mean(fluctuations_u * fluctuations_v, axis=0)
+        mean_u = statistics.mean[..., 0]
+        mean_v = statistics.mean[..., 1]
+        rms_u = statistics.rms[..., 0]
+        rms_v = statistics.rms[..., 1]
+        reynolds_stress = statistics.covariance[..., 0, 1]
         
         fig = plt.figure(figsize=(15, 10))
         gs = plt.GridSpec(2, 2)
@@ -273,13 +312,13 @@ class AdvancedVisualization:
         
         # Joint PDF of velocity fluctuations
         ax4 = fig.add_subplot(gs[1, 1])
-        xy = np.vstack([fluctuations_u.flatten(), fluctuations_v.flatten()])
-        z = gaussian_kde(xy)(xy)
-        
-        scatter = ax4.scatter(fluctuations_u.flatten(),
-                           fluctuations_v.flatten(),
-                           c=z, s=1, cmap='viridis')
-        plt.colorbar(scatter, ax=ax4, label='Density')
+        if statistics.pdf_counts is not None:
+            pdf, u_edges, v_edges = statistics.joint_pdf()
+            mesh = ax4.pcolormesh(u_edges, v_edges, pdf.T, cmap='viridis', shading='flat')
+            plt.colorbar(mesh, ax=ax4, label='Density')
+        else:
+            ax4.text(0.5, 0.5, 'No PDF window configured', ha='center', va='center',
+                     transform=ax4.transAxes)
         ax4.set_xlabel("u'")
         ax4.set_ylabel("v'")
         ax4.set_title('Joint PDF of Velocity Fluctuations')
@@ -360,73 +399,12 @@ class AdvancedVisualization:
                  
     def _compute_q_criterion(self, velocity: np.ndarray) -> np.ndarray:
         """Compute Q-criterion"""
-        dudx = np.gradient(velocity[..., 0], axis=1)
-        dudy = np.gradient(velocity[..., 0], axis=0)
-        dvdx = np.gradient(velocity[..., 1], axis=1)
-        dvdy = np.gradient(velocity[..., 1], axis=0)
-        
-        # Compute rate-of-strain and vorticity tensors
-        S11 = dudx
-        S12 = 0.5 * (dudy + dvdx)
-        S21 = S12
-        S22 = dvdy
-        
-        O11 = 0
-        O12 = 0.5 * (dudy - dvdx)
-        O21 = -O12
-        O22 = 0
-        
-        # Compute Q-criterion
-        Q = -0.5 * (
-            (S11**2 + S12**2 + S21**2 + S22**2) -
-            (O11**2 + O12**2 + O21**2 + O22**2)
-        )
-        
-        return Q
+        return self.vortex_identification.compute(velocity)['q_criterion']
         
     def _compute_lambda2(self, velocity: np.ndarray) -> np.ndarray:
         """Compute lambda2 criterion"""
-        dudx = np.gradient(velocity[..., 0], axis=1)
-        dudy = np.gradient(velocity[..., 0], axis=0)
-        dvdx = np.gradient(velocity[..., 1], axis=1)
-        dvdy = np.gradient(velocity[..., 1], axis=0)
-        
-        # Compute S^2 + Ω^2
-        S11 = dudx
-        S12 = 0.5 * (dudy + dvdx)
-        S21 = S12
-        S22 = dvdy
-        
-        O11 = 0
-        O12 = 0.5 * (dudy - dvdx)
-        O21 = -O12
-        O22 = 0
-        
-        # Compute eigenvalues
-        a = 1
-        b = -(S11**2 + 2*S12*S21 + S22**2 +
-             O11**2 + 2*O12*O21 + O22**2)
-        c = (S11*S22 - S12*S21)**2 + \
-            (O11*O22 - O12*O21)**2 + \
-            2*(S11*O22 + S22*O11 - S12*O21 - S21*O12)
-            
-        lambda2 = (-b - np.sqrt(b**2 - 4*a*c))/(2*a)
-        
-        return lambda2
+        return self.vortex_identification.compute(velocity)['lambda2']
         
     def _compute_delta_criterion(self, velocity: np.ndarray) -> np.ndarray:
         """Compute delta criterion"""
-        dudx = np.gradient(velocity[..., 0], axis=1)
-        dudy = np.gradient(velocity[..., 0], axis=0)
-        dvdx = np.gradient(velocity[..., 1], axis=1)
-        dvdy = np.gradient(velocity[..., 1], axis=0)
-        
-        # Compute velocity gradient tensor invariants
-        P = -(dudx + dvdy)
-        Q = dudx*dvdy - dudy*dvdx
-        R = -dudx*dvdy*dvdy + dudy*dvdx*dvdy
-        
-        # Compute discriminant
-        delta = (27/4) * R**2 + P**2 * Q**2 - (4/27) * P**3 * R - 4 * Q**3
-        
-        return delta 
\ No newline at end of file
+        return self.vortex_identification.compute(velocity)['delta']
@@ -0,0 +1,364 @@
+import logging
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import multiprocessing
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+import pyvista as pv
+
+from ..ui.visualization.video_encoder import StreamingVideoEncoder
+
+# A frame source is a .npy path (memory-mapped), an indexable array/sequence
+# of per-frame arrays, or a picklable callable mapping a frame index to an array
+FrameSource = Union[str, np.ndarray, Sequence, Callable[[int], np.ndarray]]
+
+VIDEO_FORMATS = {'.mp4': 'MP4', '.avi': 'AVI', '.gif': 'GIF'}
+
+class OffscreenScene:
+    """
+    Persistent offscreen scene for rendering many frames of one mesh.
+
+    The plotter, actors and mesh are created once; each frame only writes
+    new scalar, vector or point arrays into the existing VTK arrays, so the
+    per-frame cost is the render itself rather than rebuilding the scene
+    graph. The color range and camera are fixed after the first frame so
+    that frames rendered by different processes are consistent.
+    """
+    def __init__(self, mesh: pv.DataSet, config: Dict = None):
+        self.config = {
+            'field_name': 'field',
+            'vector_name': 'vectors',
+            'colormap': 'viridis',
+            'background_color': 'white',
+            'window_size': (800, 600),
+            'show_edges': True,
+            'show_axes': True,
+            'show_grid': False,
+            'show_colorbar': True,
+            'clim': None,               # Fixed color range, default from the first frame
+            'glyph_factor': 0.1,        # Arrow scale for vector frames
+            'camera_position': None     # Default fits the first frame
+        }
+        if config:
+            self.config.update(config)
+
+        self.mesh = mesh.copy()
+        self.plotter = pv.Plotter(off_screen=True, window_size=list(self.config['window_size']))
+        self.plotter.set_background(self.config['background_color'])
+        self._glyphs = None
+        self._built = False
+
+    def update(self,
+               field: Optional[np.ndarray] = None,
+               vectors: Optional[np.ndarray] = None,
+               points: Optional[np.ndarray] = None,
+               mesh: Optional[pv.DataSet] = None):
+        """
+        Write new frame data into the scene in place
+
+        Args:
+            field: Scalars per point or per cell
+            vectors: Vectors per point, drawn as arrow glyphs
+            points: New point coordinates (same topology)
+            mesh: Replacement mesh when the topology changes; copied into
+                the existing dataset so the actors stay attached
+        """
+        if mesh is not None:
+            self.mesh.copy_from(mesh)
+        if points is not None:
+            self.mesh.points[:] = points
+        if field is not None:
+            self._set_array(self.config['field_name'], field)
+        if vectors is not None:
+            self._set_array(self.config['vector_name'], vectors)
+        self.mesh.Modified()
+
+        if not self._built:
+            self._build()
+        elif self._glyphs is not None and (vectors is not None or points is not None or mesh is not None):
+            self._glyphs.copy_from(self._make_glyphs())
+
+    def _set_array(self, name: str, values: np.ndarray):
+        values = np.asarray(values)
+        data = self.mesh.point_data if len(values) == self.mesh.n_points else self.mesh.cell_data
+        if name in data.keys() and data[name].shape == values.shape:
+            data[name][:] = values
+        else:
+            # Copied, since later frames are written into this array in place
+            data[name] = values.copy()
+
+    def _make_glyphs(self) -> pv.PolyData:
+        name = self.config['vector_name']
+        return self.mesh.glyph(orient=name, scale=name, factor=self.config['glyph_factor'])
+
+    def _build(self):
+        """Create the actors on the first frame"""
+        name = self.config['field_name']
+        has_field = name in self.mesh.point_data.keys() or name in self.mesh.cell_data.keys()
+        if has_field:
+            clim = self.config['clim']
+            if clim is None:
+                values = self.mesh[name]
+                clim = (float(np.nanmin(values)), float(np.nanmax(values)))
+            self.plotter.add_mesh(
+                self.mesh,
+                scalars=name,
+                cmap=self.config['colormap'],
+                clim=clim,
+                show_edges=self.config['show_edges'],
+                show_scalar_bar=self.config['show_colorbar'],
+                scalar_bar_args={"title": name}
+            )
+        else:
+            self.plotter.add_mesh(self.mesh, show_edges=self.config['show_edges'])
+
+        if self.config['vector_name'] in self.mesh.point_data.keys():
+            self._glyphs = self._make_glyphs()
+            self.plotter.add_mesh(self._glyphs, color="black")
+
+        if self.config['show_axes']:
+            self.plotter.add_axes()
+        if self.config['show_grid']:
+            self.plotter.show_grid()
+        if self.config['camera_position'] is not None:
+            self.plotter.camera_position = self.config['camera_position']
+        else:
+            self.plotter.reset_camera()
+        self._built = True
+
+    def render(self, filename: Optional[str] = None) -> np.ndarray:
+        """
+        Render the current frame
+
+        Args:
+            filename: Optional image file to write
+
+        Returns:
+            RGB image of shape (height, width, 3)
+        """
+        if not self._built:
+            self._build()
+        # screenshot() would return the previously rendered image
+        self.plotter.render()
+        return self.plotter.screenshot(filename, return_img=True)
+
+    def close(self):
+        self.plotter.close()
+
+def open_frame_source(source: Optional[FrameSource]):
+    """Indexable view of a frame source; .npy files are memory-mapped"""
+    if isinstance(source, (str, os.PathLike)):
+        return np.load(source, mmap_mode='r')
+    return source
+
+def get_frame(source, index: int) -> Optional[np.ndarray]:
+    if source is None:
+        return None
+    if callable(source):
+        return source(index)
+    return np.asarray(source[index])
+
+def split_frame_range(n_frames: int, parts: int, start: int = 0) -> List[Tuple[int, int]]:
+    """Split [start, start + n_frames) into at most `parts` contiguous ranges"""
+    parts = max(1, min(parts, n_frames))
+    bounds = np.linspace(start, start + n_frames, parts + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+def consume_in_order(submit: Callable[[int, int], Future],
+                     ranges: Sequence[Tuple[int, int]],
+                     max_pending: int,
+                     sink: Callable[[Any], None]):
+    """
+    Run one task per frame range and pass the results to sink in range order
+
+    At most max_pending tasks are submitted but not yet consumed, so
+    finished chunks cannot pile up behind a slow one.
+
+    Args:
+        submit: Starts the task of a range and returns its future
+        ranges: Frame ranges (start, stop) in output order
+        max_pending: Bound on tasks in flight
+        sink: Receives each task's result
+    """
+    pending = deque()
+    for start, stop in ranges:
+        pending.append(submit(start, stop))
+        if len(pending) >= max_pending:
+            sink(pending.popleft().result())
+    while pending:
+        sink(pending.popleft().result())
+
+# Per-process state of the rendering workers
+_worker: Dict[str, Any] = {}
+
+def _init_worker(mesh: pv.DataSet, scene_config: Dict, frames: FrameSource,
+                 vectors: Optional[FrameSource]):
+    _worker['scene'] = OffscreenScene(mesh, scene_config)
+    _worker['frames'] = open_frame_source(frames)
+    _worker['vectors'] = open_frame_source(vectors)
+
+def _render_range(start: int, stop: int, pattern: Optional[str] = None) -> Union[int, List[np.ndarray]]:
+    """Render frames [start, stop) with this process's scene"""
+    return _render_frames(_worker, start, stop, pattern)
+
+def _render_frames(state: Dict, start: int, stop: int,
+                   pattern: Optional[str]) -> Union[int, List[np.ndarray]]:
+    """Write frames to `pattern` files and return the count, or return the images"""
+    scene = state['scene']
+    images = []
+    for index in range(start, stop):
+        scene.update(field=get_frame(state['frames'], index),
+                     vectors=get_frame(state['vectors'], index))
+        if pattern is not None:
+            scene.render(pattern.format(index))
+        else:
+            images.append(scene.render())
+    return stop - start if pattern is not None else images
+
+class BatchRenderer:
+    """
+    Offscreen batch rendering of frame sequences on one fixed mesh.
+
+    Every worker process builds a single OffscreenScene and renders a
+    contiguous range of frames with it, updating arrays in place between
+    frames. Image sequences are written by the workers directly; videos are
+    rendered in ordered chunks and streamed into a StreamingVideoEncoder,
+    with at most a few chunks in flight so memory stays bounded.
+    """
+    encoder_class = StreamingVideoEncoder
+
+    def __init__(self, config: Dict = None):
+        self.config = {
+            'workers': os.cpu_count() or 1,
+            'start_method': 'spawn',    # Fresh processes for a clean OpenGL context
+            'chunk_size': 16,           # Frames per task when streaming a video
+            'max_pending': 2,           # Chunks in flight per worker
+            'image_pattern': 'frame_{:06d}.png',
+            'fps': 30,
+            'quality': 'high',
+            'scene': {}                 # OffscreenScene configuration
+        }
+        if config:
+            self.config.update(config)
+
+    def render(self,
+               mesh: pv.DataSet,
+               frames: FrameSource,
+               output: str,
+               n_frames: Optional[int] = None,
+               vectors: Optional[FrameSource] = None) -> Dict:
+        """
+        Render a frame sequence to an image directory or a video file
+
+        Args:
+            mesh: Mesh shared by all frames
+            frames: Scalar field per frame (see FrameSource)
+            output: Directory for an image sequence, or a .mp4/.avi/.gif file
+            n_frames: Number of frames (required for callable sources)
+            vectors: Optional vector field per frame
+
+        Returns:
+            Dictionary with the frame count and output location
+        """
+        source = open_frame_source(frames)
+        if n_frames is None:
+            if callable(source):
+                raise ValueError("n_frames is required for callable frame sources")
+            n_frames = len(source)
+
+        scene_config = dict(self.config['scene'])
+        if scene_config.get('clim') is None and n_frames > 0:
+            scene_config['clim'] = self._color_range(source, n_frames)
+
+        extension = os.path.splitext(output)[1].lower()
+        if extension in VIDEO_FORMATS:
+            written = self._render_video(mesh, scene_config, frames, vectors, n_frames,
+                                         output, VIDEO_FORMATS[extension])
+        else:
+            os.makedirs(output, exist_ok=True)
+            pattern = os.path.join(output, self.config['image_pattern'])
+            written = self._render_images(mesh, scene_config, frames, vectors, n_frames, pattern)
+        return {'frames': written, 'output': output}
+
+    def _color_range(self, source, n_frames: int) -> Tuple[float, float]:
+        """Global color range, so that frames from every worker share one scale"""
+        if callable(source):
+            # Scanning a generated sequence would render it twice; use the first frame
+            first = source(0)
+            return float(np.nanmin(first)), float(np.nanmax(first))
+        lo, hi = np.inf, -np.inf
+        for index in range(n_frames):
+            frame = np.asarray(source[index])
+            lo = min(lo, float(np.nanmin(frame)))
+            hi = max(hi, float(np.nanmax(frame)))
+        return lo, hi
+
+    def _executor(self, mesh, scene_config, frames, vectors) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.config['workers'],
+            mp_context=multiprocessing.get_context(self.config['start_method']),
+            initializer=_init_worker,
+            initargs=(mesh, scene_config, frames, vectors)
+        )
+
+    def _local_state(self, mesh, scene_config, frames, vectors) -> Dict:
+        return {
+            'scene': OffscreenScene(mesh, scene_config),
+            'frames': open_frame_source(frames),
+            'vectors': open_frame_source(vectors)
+        }
+
+    def _render_images(self, mesh, scene_config, frames, vectors,
+                       n_frames: int, pattern: str) -> int:
+        if self.config['workers'] <= 1:
+            state = self._local_state(mesh, scene_config, frames, vectors)
+            try:
+                return _render_frames(state, 0, n_frames, pattern)
+            finally:
+                state['scene'].close()
+
+        ranges = split_frame_range(n_frames, self.config['workers'])
+        with self._executor(mesh, scene_config, frames, vectors) as executor:
+            futures = [executor.submit(_render_range, start, stop, pattern) for start, stop in ranges]
+            return sum(future.result() for future in futures)
+
+    def _render_video(self, mesh, scene_config, frames, vectors, n_frames: int,
+                      output: str, video_format: str) -> int:
+        encoder = self.encoder_class(output, {
+            'format': video_format,
+            'fps': self.config['fps'],
+            'quality': self.config['quality'],
+            'backpressure': 'block'     # Offline rendering must not lose frames
+        })
+        encoder.start()
+        chunk = self.config['chunk_size']
+        ranges = [(start, min(start + chunk, n_frames)) for start in range(0, n_frames, chunk)]
+
+        try:
+            if self.config['workers'] <= 1:
+                state = self._local_state(mesh, scene_config, frames, vectors)
+                try:
+                    for start, stop in ranges:
+                        for image in _render_frames(state, start, stop, None):
+                            encoder.submit(image)
+                finally:
+                    state['scene'].close()
+            else:
+                def encode(images):
+                    for image in images:
+                        encoder.submit(image)
+
+                with self._executor(mesh, scene_config, frames, vectors) as executor:
+                    consume_in_order(
+                        lambda start, stop: executor.submit(_render_range, start, stop),
+                        ranges,
+                        self.config['workers'] * self.config['max_pending'],
+                        encode
+                    )
+        finally:
+            stats = encoder.close()
+
+        if stats['encoded'] != n_frames:
+            logging.warning(f"Encoded {stats['encoded']} of {n_frames} frames to {output}")
+        return stats['encoded']
@@ -0,0 +1,337 @@
+import logging
+import numpy as np
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+def randomized_svd(X: np.ndarray, rank: int, oversampling: int = 10,
+                   power_iterations: int = 2,
+                   rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, ...]:
+    """
+    Truncated SVD by randomized range finding (Halko, Martinsson & Tropp 2011)
+
+    Args:
+        X: Matrix of shape (m, n)
+        rank: Number of singular triplets to return
+        oversampling: Extra sketch columns for accuracy
+        power_iterations: Subspace iterations sharpening the spectrum decay
+        rng: Random generator
+
+    Returns:
+        (U, S, Vh) with U (m, rank), S (rank,), Vh (rank, n)
+    """
+    rng = rng or np.random.default_rng(0)
+    m, n = X.shape
+    k = min(rank + oversampling, m, n)
+    Q, _ = np.linalg.qr(X @ rng.standard_normal((n, k)))
+    for _ in range(power_iterations):
+        Q, _ = np.linalg.qr(X.T @ Q)
+        Q, _ = np.linalg.qr(X @ Q)
+    Ub, S, Vh = np.linalg.svd(Q.T @ X, full_matrices=False)
+    return (Q @ Ub)[:, :rank], S[:rank], Vh[:rank]
+
+def snapshot_svd(X: np.ndarray, rank: Optional[int] = None) -> Tuple[np.ndarray, ...]:
+    """
+    Truncated SVD by the method of snapshots
+
+    Diagonalizes the (m, m) Gram matrix X X^T, which is cheap when there
+    are far fewer snapshots (rows) than grid points (columns).
+
+    Args:
+        X: Snapshot matrix of shape (m, n), m << n
+        rank: Number of modes to return (default all nonzero)
+
+    Returns:
+        (U, S, Vh) with U (m, r), S (r,), Vh (r, n)
+    """
+    eigenvalues, eigenvectors = np.linalg.eigh(X @ X.T)
+    order = np.argsort(eigenvalues)[::-1]
+    eigenvalues = np.clip(eigenvalues[order], 0.0, None)
+    S = np.sqrt(eigenvalues)
+    keep = S > S[0] * np.finfo(X.dtype).eps * max(X.shape) if S[0] > 0 else S > 0
+    r = int(np.count_nonzero(keep)) if rank is None else min(rank, int(np.count_nonzero(keep)))
+    U = eigenvectors[:, order[:r]]
+    S = S[:r]
+    Vh = (U.T @ X) / S[:, None]
+    return U, S, Vh
+
+class PODEngine:
+    """
+    Proper orthogonal decomposition and DMD of flow snapshots.
+
+    Batch decompositions use a full, randomized or method-of-snapshots SVD.
+    Streaming decompositions ingest snapshots (or small batches) one at a
+    time with an incremental SVD (Brand 2006) truncated to max_modes, so
+    memory is bounded by the retained basis rather than the record length.
+    Streaming DMD reuses that basis: the snapshot-pair correlations are
+    accumulated as small matrices in POD coordinates and rotated whenever
+    the basis is updated.
+    """
+    def __init__(self, config: Dict = None):
+        self.config = {
+            'n_modes': 10,
+            'method': 'auto',         # 'auto', 'svd', 'randomized', 'snapshots'
+            'oversampling': 10,
+            'power_iterations': 2,
+            'max_modes': None,        # Streaming basis size, default 2 * n_modes
+            'subtract_mean': False,
+            'track_dmd': True,        # Accumulate streaming DMD correlations
+            'store_coefficients': False,
+            'dt': 1.0,
+            'seed': 0
+        }
+        if config:
+            self.config.update(config)
+        self.reset()
+
+    def reset(self):
+        """Discard the decomposition and all streaming state"""
+        self.modes = None            # (r, n_points), rows are spatial modes
+        self.singular_values = None  # (r,)
+        self.coefficients = None     # (n_snapshots, r) temporal coefficients
+        self.mean = None
+        self.snapshot_shape = None
+        self.n_snapshots = 0
+        self._last = None
+        self._Axx = None
+        self._Ayx = None
+
+    # Batch -----------------------------------------------------------------
+
+    def _as_matrix(self, snapshots: np.ndarray) -> np.ndarray:
+        snapshots = np.asarray(snapshots)
+        self.snapshot_shape = snapshots.shape[1:]
+        return snapshots.reshape(len(snapshots), -1)
+
+    def fit(self, snapshots: np.ndarray, n_modes: Optional[int] = None,
+            method: Optional[str] = None) -> 'PODEngine':
+        """
+        Decompose a stack of snapshots of shape (T, ...)
+
+        Args:
+            snapshots: Snapshot array, first axis is time
+            n_modes: Modes to keep
+            method: 'svd', 'randomized', 'snapshots' or 'auto'
+
+        Returns:
+            self
+        """
+        self.reset()
+        X = self._as_matrix(snapshots).astype(np.float64, copy=False)
+        n_modes = min(n_modes or self.config['n_modes'], *X.shape)
+        if self.config['subtract_mean']:
+            self.mean = X.mean(axis=0)
+            X = X - self.mean
+
+        method = method or self.config['method']
+        if method == 'auto':
+            # Gram matrix when snapshots are few, sketching when the rank is small
+            if X.shape[0] <= 2000 and X.shape[0] < X.shape[1]:
+                method = 'snapshots'
+            elif n_modes < min(X.shape) // 4:
+                method = 'randomized'
+            else:
+                method = 'svd'
+
+        if method == 'svd':
+            U, S, Vh = np.linalg.svd(X, full_matrices=False)
+        elif method == 'randomized':
+            U, S, Vh = randomized_svd(X, n_modes, self.config['oversampling'],
+                                      self.config['power_iterations'],
+                                      np.random.default_rng(self.config['seed']))
+        elif method == 'snapshots':
+            U, S, Vh = snapshot_svd(X, n_modes)
+        else:
+            raise ValueError(f"Unknown POD method: {method}")
+
+        self.modes = Vh[:n_modes]
+        self.singular_values = S[:n_modes]
+        self.coefficients = U[:, :n_modes] * S[:n_modes]
+        self.n_snapshots = X.shape[0]
+        return self
+
+    # Streaming -------------------------------------------------------------
+
+    def add_snapshot(self, snapshot: np.ndarray) -> 'PODEngine':
+        """Update the basis with a single snapshot"""
+        return self.partial_fit(np.asarray(snapshot)[None])
+
+    def partial_fit(self, snapshots: np.ndarray) -> 'PODEngine':
+        """Update the basis with a batch of snapshots of shape (B, ...)"""
+        snapshots = np.asarray(snapshots, dtype=np.float64)
+        if self.snapshot_shape is None:
+            self.snapshot_shape = snapshots.shape[1:]
+        Xb = snapshots.reshape(len(snapshots), -1).T  # (n_points, B)
+        if self.config['subtract_mean'] and self.mean is None:
+            # Streaming runs center on the first batch mean
+            self.mean = Xb.mean(axis=1)
+        if self.mean is not None:
+            Xb = Xb - self.mean[:, None]
+
+        n_points, batch = Xb.shape
+        max_modes = self.config['max_modes'] or 2 * self.config['n_modes']
+        if self.modes is None:
+            U = np.zeros((n_points, 0))
+            S = np.zeros(0)
+        else:
+            U = self.modes.T
+            S = self.singular_values
+
+        # Project onto the current basis and orthonormalize the residual
+        P = U.T @ Xb
+        Q, R = np.linalg.qr(Xb - U @ P)
+        r = len(S)
+        K = np.zeros((r + batch, r + batch))
+        K[:r, :r] = np.diag(S)
+        K[:r, r:] = P
+        K[r:, r:] = R
+        Uk, Sk, Vkh = np.linalg.svd(K)
+
+        keep = min(max_modes, int(np.count_nonzero(Sk > Sk[0] * 1e-12)) if Sk[0] > 0 else 1)
+        rotation = Uk[:, :keep]
+        U_new = np.hstack([U, Q]) @ rotation
+        self.modes = U_new.T
+        self.singular_values = Sk[:keep]
+
+        if self.config['store_coefficients']:
+            # Temporal coefficients of all snapshots in the new basis
+            old = self.coefficients if self.coefficients is not None else np.zeros((0, r))
+            self.coefficients = np.vstack([old @ rotation[:r],
+                                           (Vkh[:keep, r:] * Sk[:keep, None]).T])
+
+        if self.config['track_dmd']:
+            self._update_dmd(rotation[:r], U_new, Xb)
+        self.n_snapshots += batch
+        return self
+
+    def _update_dmd(self, rotation: np.ndarray, U: np.ndarray, Xb: np.ndarray):
+        """Rotate the pair correlations into the new basis and add the new pairs"""
+        keep = U.shape[1]
+        if self._Axx is None:
+            self._Axx = np.zeros((keep, keep))
+            self._Ayx = np.zeros((keep, keep))
+        else:
+            self._Axx = rotation.T @ self._Axx @ rotation
+            self._Ayx = rotation.T @ self._Ayx @ rotation
+        Y = U.T @ Xb
+        if self._last is not None:
+            Y = np.hstack([U.T @ self._last[:, None], Y])
+        self._Axx += Y[:, :-1] @ Y[:, :-1].T
+        self._Ayx += Y[:, 1:] @ Y[:, :-1].T
+        self._last = Xb[:, -1].copy()
+
+    def fit_stream(self, snapshots: Iterable[np.ndarray], batch_size: int = 1) -> 'PODEngine':
+        """
+        Consume snapshots from an iterable (e.g. a running solver)
+
+        Args:
+            snapshots: Iterable yielding snapshot arrays
+            batch_size: Snapshots per incremental update
+        """
+        batch = []
+        for snapshot in snapshots:
+            batch.append(np.asarray(snapshot))
+            if len(batch) == batch_size:
+                self.partial_fit(np.stack(batch))
+                batch = []
+        if batch:
+            self.partial_fit(np.stack(batch))
+        return self
+
+    def fit_file(self, path: Union[str, Path], dataset: str = 'velocity',
+                 batch_size: int = 16) -> 'PODEngine':
+        """
+        Stream a time series from disk without loading it whole
+
+        Supports .npy (memory mapped) and HDF5 files with time on the first
+        axis of the given dataset.
+        """
+        path = Path(path)
+        if path.suffix == '.npy':
+            data = np.load(path, mmap_mode='r')
+            for start in range(0, len(data), batch_size):
+                self.partial_fit(np.asarray(data[start:start + batch_size]))
+        elif path.suffix in ('.h5', '.hdf5'):
+            try:
+                import h5py
+            except ImportError:
+                logging.warning("h5py not available. Cannot read HDF5 time series.")
+                raise
+            with h5py.File(path, 'r') as f:
+                data = f[dataset]
+                for start in range(0, data.shape[0], batch_size):
+                    self.partial_fit(data[start:start + batch_size])
+        else:
+            raise ValueError(f"Unsupported time-series format: {path.suffix}")
+        return self
+
+    # Results ---------------------------------------------------------------
+
+    def energy_fractions(self) -> np.ndarray:
+        """Fraction of the captured energy per mode"""
+        energy = self.singular_values ** 2
+        return energy / np.sum(energy)
+
+    def get_mode(self, index: int) -> np.ndarray:
+        """Spatial mode reshaped to the snapshot shape"""
+        return self.modes[index].reshape(self.snapshot_shape)
+
+    def project(self, snapshot: np.ndarray) -> np.ndarray:
+        """Modal coefficients of a snapshot"""
+        x = np.asarray(snapshot, dtype=np.float64).ravel()
+        if self.mean is not None:
+            x = x - self.mean
+        return self.modes @ x
+
+    def reconstruct(self, coefficients: np.ndarray) -> np.ndarray:
+        """Snapshot from modal coefficients"""
+        x = coefficients @ self.modes[:len(coefficients)]
+        if self.mean is not None:
+            x = x + self.mean
+        return x.reshape(self.snapshot_shape)
+
+    # DMD -------------------------------------------------------------------
+
+    def dmd(self, snapshots: Optional[np.ndarray] = None,
+            n_modes: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Dynamic mode decomposition
+
+        With snapshots, runs exact DMD on the POD basis of the first T-1
+        snapshots. Without, uses the correlations accumulated by
+        partial_fit (streaming DMD in POD coordinates).
+
+        Returns:
+            Dict with 'eigenvalues', 'frequencies', 'growth_rates',
+            'modes' (k, n_points) and 'amplitudes'
+        """
+        dt = self.config['dt']
+        if snapshots is not None:
+            X = self._as_matrix(snapshots).astype(np.float64, copy=False)
+            if self.config['subtract_mean']:
+                X = X - X.mean(axis=0)
+            n_modes = min(n_modes or self.config['n_modes'], X.shape[0] - 1)
+            U, S, Vh = snapshot_svd(X[:-1], n_modes)
+            # A_tilde = Vh X2^T U S^-1 in the POD basis of X1
+            B = X[1:].T @ (U / S)
+            A_tilde = Vh @ B
+            eigenvalues, W = np.linalg.eig(A_tilde)
+            modes = (B @ W).T
+            amplitudes = np.linalg.lstsq(modes.T, X[0].astype(complex), rcond=None)[0]
+        else:
+            if self._Axx is None:
+                raise ValueError("No streaming DMD data; call partial_fit first")
+            r = min(n_modes or self.config['n_modes'], len(self.singular_values))
+            A_tilde = self._Ayx[:r, :r] @ np.linalg.pinv(self._Axx[:r, :r])
+            eigenvalues, W = np.linalg.eig(A_tilde)
+            modes = (self.modes[:r].T @ W).T
+            amplitudes = np.linalg.lstsq(W, (self.modes[:r] @ self._last).astype(complex),
+                                         rcond=None)[0]
+
+        log_eigenvalues = np.log(eigenvalues.astype(complex)) / dt
+        return {
+            'eigenvalues': eigenvalues,
+            'frequencies': log_eigenvalues.imag / (2 * np.pi),
+            'growth_rates': log_eigenvalues.real,
+            'modes': modes,
+            'amplitudes': amplitudes
+        }
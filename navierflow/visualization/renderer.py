@@ -8,6 +8,8 @@ from matplotlib.colors import LinearSegmentedColormap
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from .offscreen import BatchRenderer, FrameSource, OffscreenScene
+
 class VisualizationType(Enum):
     """Visualization types"""
     SURFACE = "surface"
@@ -282,57 +284,86 @@ class Renderer:
         # Show plot
         self.plotter.show()
         
+    def _scene_config(self, **overrides) -> Dict[str, Any]:
+        """Offscreen scene settings derived from the visualization configuration"""
+        config = {
+            "colormap": self.config.colormap,
+            "background_color": self.config.background_color,
+            "window_size": self.config.window_size,
+            "show_axes": self.config.show_axes,
+            "show_grid": self.config.show_grid,
+            "show_colorbar": self.config.show_colorbar
+        }
+        config.update(overrides)
+        return config
+        
     def create_animation(self,
                         frames: List[Tuple[pv.PolyData, Optional[np.ndarray]]],
                         output_file: str):
         """
         Create animation
         
+        A single offscreen scene is reused for all frames; frames with the
+        previous frame's topology only update points and scalars in place.
+        
         Args:
             frames: List of (mesh, field) tuples
             output_file: Output file
         """
-        # Create plotter
-        self.plotter = pv.Plotter(
-            window_size=self.config.window_size,
-            background=self.config.background_color,
-            off_screen=True
-        )
+        scene = None
         
-        # Add axes and grid
-        if self.config.show_axes:
-            self.plotter.add_axes()
-        if self.config.show_grid:
-            self.plotter.show_grid()
-            
-        # Open movie file
-        self.plotter.open_movie(
-            output_file,
-            framerate=self.config.animation_fps
-        )
-        
-        # Write frames
         for mesh, field in frames:
-            self.plotter.clear()
-            
-            if field is not None:
-                self.plotter.add_mesh(
-                    mesh,
-                    scalars=field,
-                    cmap=self.config.colormap,
-                    show_edges=True,
-                    show_scalar_bar=self.config.show_colorbar
+            if scene is None:
+                scene = OffscreenScene(mesh, self._scene_config())
+                self.plotter = scene.plotter
+                self.plotter.open_movie(
+                    output_file,
+                    framerate=self.config.animation_fps
                 )
+                scene.update(field=field)
+            elif mesh.n_points == scene.mesh.n_points and mesh.n_cells == scene.mesh.n_cells:
+                scene.update(field=field, points=mesh.points)
             else:
-                self.plotter.add_mesh(
-                    mesh,
-                    show_edges=True
-                )
+                scene.update(field=field, mesh=mesh)
                 
+            scene.render()
             self.plotter.write_frame()
             
         # Close movie file
-        self.plotter.close()
+        if self.plotter is not None:
+            self.plotter.close()
+            
+    def render_batch(self,
+                    mesh: pv.DataSet,
+                    frames: FrameSource,
+                    output: str,
+                    n_frames: Optional[int] = None,
+                    vectors: Optional[FrameSource] = None,
+                    workers: Optional[int] = None,
+                    clim: Optional[Tuple[float, float]] = None) -> Dict[str, Any]:
+        """
+        Render many timesteps of one mesh offscreen
+        
+        Args:
+            mesh: Mesh shared by all frames
+            frames: Scalar field per frame: a .npy path (memory-mapped),
+                an array of shape (n_frames, n_values) or a picklable callable
+            output: Image directory, or a .mp4/.avi/.gif file to stream into
+            n_frames: Number of frames (required for callable sources)
+            vectors: Optional vector field per frame
+            workers: Number of rendering processes (default: all cores)
+            clim: Fixed color range (default: global range of the frames)
+            
+        Returns:
+            Dictionary with the frame count and output location
+        """
+        config = {
+            "fps": self.config.animation_fps,
+            "scene": self._scene_config(clim=clim)
+        }
+        if workers is not None:
+            config["workers"] = workers
+        return BatchRenderer(config).render(mesh, frames, output, n_frames=n_frames, vectors=vectors)
         
     def create_plot(self,
                    x: np.ndarray,
@@ -30,6 +30,10 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=requirements,
+    extras_require={
+        # Exported models fall back to TorchScript without these
+        "export": ["onnx>=1.14.0", "onnxruntime>=1.16.0"],
+    },
     include_package_data=True,
     package_data={
         "navierflow": ["configs/*.yaml"],